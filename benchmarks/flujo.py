@@ -0,0 +1,192 @@
+# benchmarks/flujo.py
+"""
+Benchmark de extremo a extremo: usuarios por minuto contra el servidor simulado.
+
+Recorre el mismo flujo que main.py (Config -> EjecutorUsuarios o MotorAsync ->
+Ejecuciones: login, ObtenerTurnos, comparación y guardado) para N usuarios
+sintéticos de ServidorSimulado y reporta usuarios/minuto, latencia por usuario
+p50/p95, peticiones y logins por usuario y memoria máxima (RSS).
+Cada tamaño se mide en un proceso aparte (la RSS máxima no se mezcla).
+
+Uso (desde la raíz del repositorio):
+    python -m benchmarks.flujo
+    python -m benchmarks.flujo --usuarios 10 100 1000 --workers 20 --latencia-ms 50 --ciclos 2
+    python -m benchmarks.flujo --motor async --tasa-nosess 0.05
+"""
+from argparse import ArgumentParser
+from contextlib import redirect_stdout
+from json import dumps, loads
+from os import chdir, devnull, environ, getcwd
+from os import path as os_path
+from statistics import quantiles
+from subprocess import run
+from sys import executable, platform
+from tempfile import TemporaryDirectory
+from time import perf_counter
+
+try:
+    from resource import RUSAGE_SELF, getrusage
+except ImportError:  # Windows: sin RSS máxima
+    getrusage = None
+
+RAIZ = os_path.dirname(os_path.dirname(os_path.abspath(__file__)))
+
+
+def parsear_argumentos():
+    """Argumentos del benchmark"""
+    parser = ArgumentParser(description="Benchmark de extremo a extremo contra el servidor simulado")
+    parser.add_argument("--usuarios", type=int, nargs="+", default=[10, 100, 1000], help="Tamaños a medir")
+    parser.add_argument("--motor", choices=("hilos", "async"), default="hilos", help="Motor de ejecución")
+    parser.add_argument("--workers", type=int, default=10, help="MAX_WORKERS")
+    parser.add_argument("--conexiones", type=int, default=10, help="MAX_CONEXIONES_HOST")
+    parser.add_argument("--ciclos", type=int, default=1, help="Ciclos seguidos (del 2º en adelante con sesiones reutilizadas)")
+    parser.add_argument("--latencia-ms", type=float, default=0.0, help="Latencia del servidor simulado")
+    parser.add_argument("--tasa-nosess", type=float, default=0.0, help="Probabilidad de NOSESS del servidor simulado")
+    parser.add_argument("--tasa-bloqueo", type=float, default=0.0, help="Probabilidad de 403 del servidor simulado")
+    parser.add_argument("--limites-reales", action="store_true", help="Respetar LIMITE_*_MINUTO del entorno (por defecto sin límite)")
+    parser.add_argument("--json", action="store_true", help="Imprimir los resultados como JSON")
+    parser.add_argument("--medir", type=int, help=None)  # interno: mide un tamaño en este proceso
+    return parser.parse_args()
+
+
+def rss_maxima_mb() -> float:
+    """Memoria residente máxima del proceso en MB (0 si no se puede medir)"""
+    if not getrusage:
+        return 0.0
+    rss = getrusage(RUSAGE_SELF).ru_maxrss
+    # Linux la da en KB y macOS en bytes
+    return rss / (1024 * 1024) if platform == "darwin" else rss / 1024
+
+
+def percentil(valores: list, p: int) -> float:
+    """Percentil p (1-99) de una lista de valores"""
+    if not valores:
+        return 0.0
+    if len(valores) == 1:
+        return valores[0]
+    return quantiles(valores, n=100, method="inclusive")[p - 1]
+
+
+def medir(argumentos) -> dict:
+    """Levanta el servidor simulado, ejecuta los ciclos y devuelve las métricas de un tamaño"""
+    from controller.ServidorSimulado import ServidorSimulado
+
+    servidor = ServidorSimulado(
+        0,
+        usuarios=argumentos.medir,
+        latencia_ms=argumentos.latencia_ms,
+        tasa_nosess=argumentos.tasa_nosess,
+        tasa_bloqueo=argumentos.tasa_bloqueo
+    )
+    servidor.iniciar()
+
+    environ.update(servidor.credenciales_env())
+    environ.update({
+        "ECO_BASE_URL": servidor.url_base,
+        "MAX_WORKERS": str(argumentos.workers),
+        "MAX_CONEXIONES_HOST": str(argumentos.conexiones),
+        "MAX_LOGINS_SIMULTANEOS": str(max(1, argumentos.workers)),
+        "MAX_SESIONES": str(argumentos.medir),
+        "RETRY_DELAY": "0.1",
+        "TELEGRAM_TOKEN": "",
+        "TELEGRAM_CHAT": "benchmark",
+    })
+    if not argumentos.limites_reales:
+        environ.update({"LIMITE_LOGINS_MINUTO": "1000000", "RAFAGA_LOGINS": "1000000",
+                        "LIMITE_API_MINUTO": "1000000", "RAFAGA_API": "1000000"})
+
+    directorio_original = getcwd()
+    ciclos = []
+    with TemporaryDirectory(prefix="bench_flujo_") as temporal:
+        chdir(temporal)
+        try:
+            with open(devnull, "w") as nulo, redirect_stdout(nulo):
+                from controller.Config import Config
+                from controller.EjecutorUsuarios import EjecutorUsuarios
+                config = Config()
+                motor_async = None
+                if argumentos.motor == "async":
+                    from controller.MotorAsync import MotorAsync
+                    motor_async = MotorAsync(config)
+                    ejecutar_ciclo = motor_async.ejecutar
+                else:
+                    ejecutar_ciclo = EjecutorUsuarios(config).ejecutar
+
+                for _ in range(argumentos.ciclos):
+                    inicio = perf_counter()
+                    resumen = ejecutar_ciclo()
+                    ciclos.append((perf_counter() - inicio, resumen))
+
+                if motor_async:
+                    motor_async.cerrar()
+                config.gestor_sesiones.cerrar_todas()
+                config.transporte_http.cerrar()
+                config.almacen_sesiones.cerrar()
+        finally:
+            chdir(directorio_original)
+            servidor.detener()
+
+    resultados = []
+    for numero, (segundos, resumen) in enumerate(ciclos, 1):
+        total = resumen["total"] or 1
+        latencias = sorted(r.get("duracion_segundos", 0.0) for r in resumen["resultados"].values())
+        resultados.append({
+            "usuarios": resumen["total"],
+            "ciclo": numero,
+            "exitosos": len(resumen["exitosos"]),
+            "segundos": round(segundos, 3),
+            "usuarios_minuto": round(resumen["total"] / segundos * 60, 1) if segundos else 0.0,
+            "p50_s": round(percentil(latencias, 50), 3),
+            "p95_s": round(percentil(latencias, 95), 3),
+            "peticiones_usuario": round(resumen["peticiones_http"] / total, 2),
+            "logins_usuario": round(resumen["logins"] / total, 2),
+        })
+    rss = round(rss_maxima_mb(), 1)
+    for resultado in resultados:
+        resultado["rss_max_mb"] = rss
+    return {"resultados": resultados, "servidor": servidor.contadores}
+
+
+def imprimir_tabla(filas: list):
+    """Tabla de resultados"""
+    columnas = ("usuarios", "ciclo", "exitosos", "segundos", "usuarios_minuto", "p50_s", "p95_s",
+                "peticiones_usuario", "logins_usuario", "rss_max_mb")
+    anchos = [max(len(c), *(len(str(f[c])) for f in filas)) for c in columnas]
+    print("  ".join(c.rjust(a) for c, a in zip(columnas, anchos)))
+    for fila in filas:
+        print("  ".join(str(fila[c]).rjust(a) for c, a in zip(columnas, anchos)))
+
+
+def main():
+    argumentos = parsear_argumentos()
+
+    if argumentos.medir:
+        print(dumps(medir(argumentos)))
+        return
+
+    filas = []
+    for usuarios in argumentos.usuarios:
+        comando = [executable, "-m", "benchmarks.flujo", "--medir", str(usuarios),
+                   "--motor", argumentos.motor, "--workers", str(argumentos.workers),
+                   "--conexiones", str(argumentos.conexiones), "--ciclos", str(argumentos.ciclos),
+                   "--latencia-ms", str(argumentos.latencia_ms), "--tasa-nosess", str(argumentos.tasa_nosess),
+                   "--tasa-bloqueo", str(argumentos.tasa_bloqueo)]
+        if argumentos.limites_reales:
+            comando.append("--limites-reales")
+        if not argumentos.json:
+            print(f"⏱️  Midiendo {usuarios} usuario(s) ({argumentos.motor}, {argumentos.workers} workers)...")
+        proceso = run(comando, cwd=RAIZ, capture_output=True, text=True)
+        if proceso.returncode != 0:
+            print(f"❌ Falló la medición de {usuarios} usuario(s):\n{proceso.stderr[-2000:]}")
+            continue
+        filas.extend(loads(proceso.stdout.strip().splitlines()[-1])["resultados"])
+
+    if argumentos.json:
+        print(dumps(filas, indent=2))
+    elif filas:
+        print()
+        imprimir_tabla(filas)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,265 @@
+# benchmarks/procesamiento.py
+"""
+Micro-benchmarks de las etapas de ExtractorCalendario sobre cargas sintéticas:
+procesar_datos_api -> generar_estructura_compatible -> generar_json_calendario -> _detectar_cambios.
+
+Cada escenario es MESESxUSUARIOS (p. ej. 12x100 = un año de turnos para 100 usuarios).
+Como en extraer_rango, cada mes es una respuesta y un calendario aparte: las etapas se
+ejecutan una vez por usuario y mes, así cada turno generado pasa por todas ellas.
+Por etapa se reporta tiempo por turno (mejor de N repeticiones), tiempo por usuario y pico
+de memoria asignada (tracemalloc, en una pasada aparte para no falsear los tiempos).
+Con --guardar-base se escribe la línea base; con --comparar se compara contra ella y el
+proceso termina con código 1 si alguna etapa empeora más que --tolerancia.
+
+Uso (desde la raíz del repositorio):
+    python -m benchmarks.procesamiento
+    python -m benchmarks.procesamiento --escenarios 1x1 12x100 36x10 --repeticiones 5
+    python -m benchmarks.procesamiento --guardar-base
+    python -m benchmarks.procesamiento --comparar --tolerancia 0.25
+"""
+from argparse import ArgumentParser
+from contextlib import redirect_stdout
+from datetime import datetime, timedelta
+from json import dump, load
+from os import chdir, devnull, getcwd
+from os import path as os_path
+from platform import python_version
+from random import Random
+from sys import exit as sys_exit
+from tempfile import TemporaryDirectory
+from time import perf_counter
+from tracemalloc import get_traced_memory, reset_peak, start as iniciar_tracemalloc, stop as detener_tracemalloc
+from types import SimpleNamespace
+
+from controller.ExtractorCalendario import ExtractorCalendario
+from controller.Log import Log
+
+ESCENARIOS = ["1x1", "1x100", "1x1000", "12x1", "36x1", "12x100"]
+ETAPAS = ("procesar_datos_api", "generar_estructura_compatible", "generar_json_calendario", "_detectar_cambios")
+LINEA_BASE = os_path.join(os_path.dirname(os_path.abspath(__file__)), "linea_base_procesamiento.json")
+ENTRADAS = (6, 7, 8, 9, 10, 12, 14, 16)
+DURACIONES = (4, 6, 8)
+MUESTRA_MINIMA = 0.2
+
+
+def parsear_argumentos():
+    """Argumentos del benchmark"""
+    parser = ArgumentParser(description="Micro-benchmarks de las etapas de ExtractorCalendario")
+    parser.add_argument("--escenarios", nargs="+", default=ESCENARIOS, help="MESESxUSUARIOS a medir")
+    parser.add_argument("--repeticiones", type=int, default=5, help="Repeticiones por etapa (se toma la mejor)")
+    parser.add_argument("--tasa-cambios", type=float, default=0.1, help="Fracción de turnos modificados para _detectar_cambios")
+    parser.add_argument("--linea-base", default=LINEA_BASE, help="Archivo JSON de la línea base")
+    parser.add_argument("--guardar-base", action="store_true", help="Guardar los resultados como nueva línea base")
+    parser.add_argument("--comparar", action="store_true", help="Comparar con la línea base (código 1 si hay regresiones)")
+    parser.add_argument("--tolerancia", type=float, default=0.25, help="Empeoramiento admitido frente a la línea base (0.25 = 25%%)")
+    return parser.parse_args()
+
+
+def parsear_escenario(escenario: str) -> tuple:
+    """'12x100' -> (12, 100)"""
+    meses, usuarios = escenario.lower().split("x")
+    return int(meses), int(usuarios)
+
+
+def payload_sintetico(numero: int, meses: int, semilla: int = 0, tasa_cambios: float = 0.0) -> dict:
+    """
+    Cuerpo de ObtenerTurnos con un turno por día para los `meses` que terminan en el mes
+    actual (mismo formato que devuelve EcoDigital y ServidorSimulado).
+    Con `tasa_cambios` una fracción de los turnos se desplaza una hora.
+    """
+    azar = Random(f"{semilla}|{numero}")
+    cambios = Random(f"cambios|{semilla}|{numero}")
+    hoy = datetime.now().replace(hour=0, minute=0, second=0, microsecond=0)
+    año, mes = hoy.year, hoy.month - meses + 1
+    while mes < 1:
+        año, mes = año - 1, mes + 12
+    fecha = datetime(año, mes, 1)
+    fin = (hoy.replace(day=28) + timedelta(days=4)).replace(day=1)
+    libres = {numero % 7, (numero + 3) % 7}
+
+    turnos = []
+    while fecha < fin:
+        entrada = fecha.replace(hour=azar.choice(ENTRADAS))
+        if tasa_cambios and cambios.random() < tasa_cambios:
+            entrada += timedelta(hours=1)
+        salida = entrada + timedelta(hours=azar.choice(DURACIONES))
+        descanso = entrada + (salida - entrada) / 2
+        turnos.append({
+            "Asesor": {"NombreCompleto": f"Asesor Sintetico {numero}"},
+            "FechaHoraEntradaString": entrada.strftime("%Y-%m-%d %H:%M"),
+            "FechaHoraSalidaString": salida.strftime("%Y-%m-%d %H:%M"),
+            "HoraDescanso1Entrada": f"/Date({int(descanso.timestamp() * 1000)})/",
+            "HoraDescanso1Salida": f"/Date({int((descanso + timedelta(minutes=20)).timestamp() * 1000)})/",
+            "Novedad": {"Codigo": "LIBRE"} if fecha.weekday() in libres else None,
+        })
+        fecha += timedelta(days=1)
+    return {"turnos": turnos, "eventos": []}
+
+
+def payloads_por_mes(payload: dict) -> list:
+    """Divide un payload en uno por mes: [(año, mes, payload_del_mes), ...]"""
+    meses = {}
+    for turno in payload["turnos"]:
+        meses.setdefault(turno["FechaHoraEntradaString"][:7], []).append(turno)
+    return [(int(clave[:4]), int(clave[5:7]), {"turnos": turnos, "eventos": []}) for clave, turnos in meses.items()]
+
+
+def extractor_sintetico(numero: int) -> ExtractorCalendario:
+    """ExtractorCalendario sin sesión ni Config (las etapas medidas no los usan)"""
+    usuario = f"asesor{numero}@eco.local"
+    contexto = SimpleNamespace(usuario=usuario, password=None, ruta_datos=None, log=Log(usuario))
+    return ExtractorCalendario(None, None, contexto)
+
+
+def preparar(meses: int, usuarios: int, tasa_cambios: float) -> list:
+    """Entradas de cada etapa por usuario y mes (se generan fuera de la medición)"""
+    casos = []
+    for numero in range(1, usuarios + 1):
+        extractor = extractor_sintetico(numero)
+        modificados = payloads_por_mes(payload_sintetico(numero, meses, tasa_cambios=tasa_cambios))
+        for (año, mes, payload), (_, _, modificado) in zip(payloads_por_mes(payload_sintetico(numero, meses)), modificados):
+            turnos_por_dia = extractor.procesar_datos_api(payload)
+            estructura = extractor.generar_estructura_compatible(turnos_por_dia, año, mes)
+            antiguo = extractor.generar_json_calendario(estructura)
+            nuevo = extractor.generar_json_calendario(
+                extractor.generar_estructura_compatible(extractor.procesar_datos_api(modificado), año, mes)
+            )
+            casos.append({
+                "extractor": extractor,
+                "turnos": len(payload["turnos"]),
+                "procesar_datos_api": (payload,),
+                "generar_estructura_compatible": (turnos_por_dia, año, mes),
+                "generar_json_calendario": (estructura,),
+                "_detectar_cambios": (antiguo, nuevo),
+            })
+    return casos
+
+
+def ejecutar_etapa(casos: list, etapa: str):
+    """Ejecuta una etapa para todos los usuarios y meses del escenario"""
+    for caso in casos:
+        getattr(caso["extractor"], etapa)(*caso[etapa])
+
+
+def medir_escenario(meses: int, usuarios: int, repeticiones: int, tasa_cambios: float) -> dict:
+    """Tiempo y memoria de cada etapa en un escenario"""
+    casos = preparar(meses, usuarios, tasa_cambios)
+    turnos = sum(caso["turnos"] for caso in casos)
+    resultado = {"meses": meses, "usuarios": usuarios, "turnos": turnos, "etapas": {}}
+
+    for etapa in ETAPAS:
+        # Como timeit.autorange: en escenarios pequeños cada muestra repite la etapa hasta
+        # durar al menos MUESTRA_MINIMA segundos para que el ruido no dispare falsas regresiones
+        vueltas = 1
+        while True:
+            inicio = perf_counter()
+            for _ in range(vueltas):
+                ejecutar_etapa(casos, etapa)
+            if perf_counter() - inicio >= MUESTRA_MINIMA:
+                break
+            vueltas *= 2
+
+        mejor = None
+        for _ in range(max(1, repeticiones)):
+            inicio = perf_counter()
+            for _ in range(vueltas):
+                ejecutar_etapa(casos, etapa)
+            segundos = (perf_counter() - inicio) / vueltas
+            mejor = segundos if mejor is None else min(mejor, segundos)
+
+        iniciar_tracemalloc()
+        try:
+            reset_peak()
+            base, _ = get_traced_memory()
+            ejecutar_etapa(casos, etapa)
+            _, pico = get_traced_memory()
+        finally:
+            detener_tracemalloc()
+
+        resultado["etapas"][etapa] = {
+            "us_turno": round(mejor / turnos * 1e6, 3),
+            "ms_usuario": round(mejor / usuarios * 1e3, 3),
+            "kb_pico": round((pico - base) / 1024, 1),
+        }
+    return resultado
+
+
+def comparar(resultados: list, linea_base: dict, tolerancia: float) -> list:
+    """Añade la variación frente a la línea base y devuelve las regresiones"""
+    regresiones = []
+    for resultado in resultados:
+        escenario = f"{resultado['meses']}x{resultado['usuarios']}"
+        base = linea_base.get("escenarios", {}).get(escenario)
+        if not base:
+            continue
+        for etapa, medida in resultado["etapas"].items():
+            referencia = base["etapas"].get(etapa)
+            if not referencia or not referencia["us_turno"]:
+                continue
+            medida["vs_base"] = round(medida["us_turno"] / referencia["us_turno"], 2)
+            if medida["vs_base"] > 1 + tolerancia:
+                regresiones.append(f"{escenario} {etapa}: {referencia['us_turno']} -> {medida['us_turno']} µs/turno (x{medida['vs_base']})")
+    return regresiones
+
+
+def imprimir_tabla(resultados: list):
+    """Tabla de resultados por escenario y etapa"""
+    print(f"{'escenario':>10}  {'turnos':>8}  {'etapa':<30}  {'µs/turno':>10}  {'ms/usuario':>10}  {'KB pico':>9}  {'vs base':>7}")
+    for resultado in resultados:
+        escenario = f"{resultado['meses']}x{resultado['usuarios']}"
+        for etapa, medida in resultado["etapas"].items():
+            variacion = f"x{medida['vs_base']}" if "vs_base" in medida else "-"
+            print(f"{escenario:>10}  {resultado['turnos']:>8}  {etapa:<30}  {medida['us_turno']:>10}  "
+                  f"{medida['ms_usuario']:>10}  {medida['kb_pico']:>9}  {variacion:>7}")
+
+
+def main():
+    argumentos = parsear_argumentos()
+    ruta_base = os_path.abspath(argumentos.linea_base)
+
+    resultados = []
+    directorio_original = getcwd()
+    # Los Log de los extractores escriben en ./logs: se aíslan en un temporal
+    with TemporaryDirectory(prefix="bench_procesamiento_") as temporal:
+        chdir(temporal)
+        try:
+            for escenario in argumentos.escenarios:
+                meses, usuarios = parsear_escenario(escenario)
+                print(f"⏱️  Midiendo {meses} mes(es) x {usuarios} usuario(s)...")
+                with open(devnull, "w") as nulo, redirect_stdout(nulo):
+                    resultados.append(medir_escenario(meses, usuarios, argumentos.repeticiones, argumentos.tasa_cambios))
+        finally:
+            chdir(directorio_original)
+
+    regresiones = []
+    if argumentos.comparar:
+        if os_path.exists(ruta_base):
+            with open(ruta_base, "r", encoding="utf-8") as f:
+                regresiones = comparar(resultados, load(f), argumentos.tolerancia)
+        else:
+            print(f"⚠️  No existe la línea base {ruta_base} (usa --guardar-base)")
+
+    print()
+    imprimir_tabla(resultados)
+
+    if argumentos.guardar_base:
+        with open(ruta_base, "w", encoding="utf-8") as f:
+            dump({
+                "python": python_version(),
+                "fecha": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+                "repeticiones": argumentos.repeticiones,
+                "escenarios": {f"{r['meses']}x{r['usuarios']}": r for r in resultados},
+            }, f, ensure_ascii=False, indent=2)
+        print(f"\n💾 Línea base guardada en {ruta_base}")
+
+    if regresiones:
+        print(f"\n❌ {len(regresiones)} regresión(es) por encima del {argumentos.tolerancia:.0%}:")
+        for regresion in regresiones:
+            print(f"   - {regresion}")
+        sys_exit(1)
+    elif argumentos.comparar:
+        print("\n✅ Sin regresiones frente a la línea base")
+
+
+if __name__ == "__main__":
+    main()
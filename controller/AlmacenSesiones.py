@@ -0,0 +1,128 @@
+# controller/AlmacenSesiones.py
+from json import dumps, loads, load
+from os import path as os_path, makedirs, remove
+from sqlite3 import connect
+from threading import Lock
+from time import time
+
+class AlmacenSesiones:
+    """
+    Almacén único de cookies/sesiones de todos los usuarios sobre SQLite (modo WAL).
+    Una fila por usuario con sus cookies, el momento de la última validación y la
+    caducidad de la sesión; las escrituras son upserts atómicos, así que varios hilos,
+    procesos o contenedores que comparten el volumen no corrompen los datos.
+    Sustituye a los archivos ./cookies/<usuario>_cookies.json (se migran al arrancar).
+    """
+
+    def __init__(self, ruta: str, espera_bloqueo: float = 10.0):
+        """
+        Constructor
+        Args:
+            ruta: Archivo de la base de datos SQLite
+            espera_bloqueo: Segundos que se espera si otro proceso tiene la base bloqueada
+        """
+        self.ruta = ruta
+        makedirs(os_path.dirname(ruta) or ".", exist_ok=True)
+        self.__lock = Lock()
+        self.__conexion = connect(ruta, timeout=espera_bloqueo, check_same_thread=False, isolation_level=None)
+        self.__conexion.execute("PRAGMA journal_mode=WAL")
+        self.__conexion.execute("PRAGMA synchronous=NORMAL")
+        self.__conexion.execute("""
+            CREATE TABLE IF NOT EXISTS sesiones (
+                usuario TEXT PRIMARY KEY,
+                cookies TEXT NOT NULL,
+                validada_en REAL,
+                expira_en REAL,
+                actualizada_en REAL NOT NULL
+            )
+        """)
+        self.__conexion.execute("CREATE INDEX IF NOT EXISTS idx_sesiones_expira_en ON sesiones (expira_en)")
+
+    @staticmethod
+    def expiracion(cookies: list):
+        """
+        Momento (epoch) en que caduca la sesión: cuando vence la última cookie con fecha.
+        None si alguna cookie es de sesión (sin fecha de caducidad).
+        """
+        fechas = [c.get('expires') for c in cookies]
+        if not fechas or any(f is None for f in fechas):
+            return None
+        return max(fechas)
+
+    def leer(self, usuario: str) -> tuple:
+        """
+        Cookies guardadas del usuario.
+        Retorna: (lista de cookies, momento de la última validación en epoch o None)
+        """
+        with self.__lock:
+            fila = self.__conexion.execute(
+                "SELECT cookies, validada_en FROM sesiones WHERE usuario = ?", (usuario,)
+            ).fetchone()
+        if not fila:
+            return [], None
+        return loads(fila[0]), fila[1]
+
+    def guardar(self, usuario: str, cookies: list, validada_en: float = None):
+        """Inserta o reemplaza (upsert atómico) las cookies del usuario"""
+        with self.__lock:
+            self.__conexion.execute(
+                """
+                INSERT INTO sesiones (usuario, cookies, validada_en, expira_en, actualizada_en)
+                VALUES (?, ?, ?, ?, ?)
+                ON CONFLICT (usuario) DO UPDATE SET
+                    cookies = excluded.cookies,
+                    validada_en = excluded.validada_en,
+                    expira_en = excluded.expira_en,
+                    actualizada_en = excluded.actualizada_en
+                """,
+                (usuario, dumps(cookies), validada_en, self.expiracion(cookies), time())
+            )
+
+    def borrar(self, usuario: str) -> bool:
+        """Elimina la sesión guardada del usuario. Retorna True si existía"""
+        with self.__lock:
+            cursor = self.__conexion.execute("DELETE FROM sesiones WHERE usuario = ?", (usuario,))
+        return cursor.rowcount > 0
+
+    def purgar_caducadas(self) -> int:
+        """Elimina las sesiones cuyas cookies ya vencieron. Retorna cuántas se borraron"""
+        with self.__lock:
+            cursor = self.__conexion.execute(
+                "DELETE FROM sesiones WHERE expira_en IS NOT NULL AND expira_en <= ?", (time(),)
+            )
+        return cursor.rowcount
+
+    def migrar_archivo(self, usuario: str, ruta_json: str) -> bool:
+        """
+        Importa el archivo de cookies antiguo del usuario (lista de cookies o
+        {"validada_en", "cookies"}) si todavía no tiene fila, y elimina el archivo.
+        Retorna True si se migró.
+        """
+        if not os_path.exists(ruta_json):
+            return False
+        try:
+            with open(ruta_json, 'r') as f:
+                contenido = load(f)
+        except ValueError:
+            contenido = None
+        if isinstance(contenido, dict):
+            cookies, validada_en = contenido.get('cookies') or [], contenido.get('validada_en')
+        else:
+            cookies, validada_en = contenido or [], None
+
+        migrado = False
+        if cookies and not self.leer(usuario)[0]:
+            self.guardar(usuario, cookies, validada_en)
+            migrado = True
+        remove(ruta_json)
+        return migrado
+
+    def total(self) -> int:
+        """Número de sesiones guardadas"""
+        with self.__lock:
+            return self.__conexion.execute("SELECT COUNT(*) FROM sesiones").fetchone()[0]
+
+    def cerrar(self):
+        """Cierra la conexión (al terminar el proceso)"""
+        with self.__lock:
+            self.__conexion.close()
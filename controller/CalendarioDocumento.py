@@ -0,0 +1,119 @@
+# controller/CalendarioDocumento.py
+from json import load, dump
+from datetime import datetime
+from shutil import copy2
+from os import path as os_path, makedirs, replace
+
+class CalendarioDocumento:
+    """
+    Documento calendario.json de UN usuario mantenido en memoria.
+    Se lee de disco como máximo una vez, las verificaciones y la detección de cambios
+    trabajan sobre la copia en memoria y solo se escribe al guardar el resultado final.
+    """
+
+    def __init__(self, ruta: str):
+        """
+        Constructor
+        Args:
+            ruta: Ruta del calendario.json del usuario
+        """
+        self.ruta = ruta
+        self.__datos = None
+        self.__cargado = False
+        self.__mtime = None
+        self.descartado = False
+        self.lecturas = 0
+        self.escrituras = 0
+
+    def _cargar(self):
+        """Lee el JSON de disco (una única vez por documento)"""
+        self.__cargado = True
+        if not self.ruta or not os_path.exists(self.ruta):
+            return
+        try:
+            self.lecturas += 1
+            with open(self.ruta, 'r', encoding='utf-8') as f:
+                self.__datos = load(f)
+            self.__mtime = os_path.getmtime(self.ruta)
+        except Exception as e:
+            print(f"⚠️ Error cargando JSON existente: {e}")
+            self.__datos = None
+
+    @property
+    def datos(self):
+        """Contenido actual del calendario (None si no existe o fue descartado)"""
+        if not self.__cargado:
+            self._cargar()
+        return self.__datos
+
+    def sincronizar(self) -> bool:
+        """
+        Para documentos que viven entre ciclos (modo demonio): si el archivo cambió
+        o desapareció desde la última lectura/escritura propia, o se descartó sin llegar
+        a guardarse, se vuelve a leer en el próximo acceso.
+        Retorna: True si se invalidó la copia en memoria
+        """
+        if not self.__cargado:
+            return False
+        mtime = os_path.getmtime(self.ruta) if self.existe_en_disco() else None
+        if mtime == self.__mtime and not self.descartado:
+            return False
+        self.__cargado = False
+        self.__datos = None
+        self.__mtime = None
+        self.descartado = False
+        return True
+
+    def existe(self) -> bool:
+        """True si hay un calendario previo vigente (en disco y no descartado)"""
+        return self.datos is not None
+
+    def existe_en_disco(self) -> bool:
+        """True si el archivo está físicamente en disco"""
+        return bool(self.ruta) and os_path.exists(self.ruta)
+
+    def fecha_modificacion(self) -> datetime:
+        """Fecha de modificación del archivo en disco (sin leerlo)"""
+        return datetime.fromtimestamp(os_path.getmtime(self.ruta))
+
+    def descartar(self):
+        """
+        Descarta el calendario previo en memoria (mes anterior, antigüedad...).
+        El archivo se reemplaza al guardar; no se toca el disco aquí.
+        """
+        self.__cargado = True
+        self.__datos = None
+        self.descartado = True
+
+    def guardar(self, datos: dict, backup: bool = False) -> bool:
+        """
+        Escribe el calendario en disco y lo deja como contenido actual.
+        Args:
+            datos: Calendario completo a persistir
+            backup: Copiar antes el archivo existente como calendario_backup_<timestamp>.json
+        """
+        if not self.ruta:
+            print("No se pudo obtener ruta para guardar JSON")
+            return False
+
+        makedirs(os_path.dirname(self.ruta) or ".", exist_ok=True)
+
+        # Backup SOLO si hay una versión previa vigente en disco
+        if backup and not self.descartado and self.existe_en_disco():
+            timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+            ruta_backup = self.ruta.replace(".json", f"_backup_{timestamp}.json")
+            copy2(self.ruta, ruta_backup)
+            print(f"💾 Backup creado: {os_path.basename(ruta_backup)}")
+
+        # Escritura atómica: archivo temporal + reemplazo
+        ruta_temporal = f"{self.ruta}.tmp"
+        with open(ruta_temporal, 'w', encoding='utf-8') as f:
+            dump(datos, f, ensure_ascii=False, indent=2)
+        replace(ruta_temporal, self.ruta)
+        self.__mtime = os_path.getmtime(self.ruta)
+
+        self.escrituras += 1
+        self.__cargado = True
+        self.__datos = datos
+        self.descartado = False
+        return True
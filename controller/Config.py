@@ -3,13 +3,22 @@ from re import sub
 from dotenv import load_dotenv
 from os import path as pt, makedirs, getenv, remove
 from os import path as os_path, listdir, rmdir, remove
-from typing import List
+from typing import List, Tuple
 from controller.Log import Log
+from controller.LimitadorHost import LimitadorHost
+from controller.PoliticaReintentos import PoliticaReintentos
+from controller.LimitadorTokens import LimitadorTokens
+from controller.TransporteHttp import TransporteHttp
+from controller.GestorSesiones import GestorSesiones
+from controller.AlmacenSesiones import AlmacenSesiones
+from controller.PuertaLogin import PuertaLogin
+from controller.ContextoUsuario import ContextoUsuario
 
 class Config:
     """
     Clase encargada de generar variables globales desde .env para EcoDigital - Versión HTTP
-    SOPORTA LISTAS DE USUARIOS Y USUARIO ACTUAL
+    SOPORTA LISTAS DE USUARIOS. Es de solo lectura tras construirse y se comparte entre
+    hilos: los datos de cada usuario viajan en un ContextoUsuario (ver contexto()).
     """
 
     def __init__(self) -> None:
@@ -17,19 +26,16 @@ class Config:
         load_dotenv()
         self.log = Log()
         
-        # 📋 LISTAS DE TODOS LOS USUARIOS
-        self.users_eco: List[str] = []
-        self.passwds_eco: List[str] = []
-        
-        # 👤 USUARIO ACTUAL (se actualizará en cada iteración)
-        self.user_eco: str = None
-        self.ps_eco: str = None
+        # 📋 LISTAS DE TODOS LOS USUARIOS (tuplas: no se modifican tras cargar)
+        self.users_eco: Tuple[str, ...] = ()
+        self.passwds_eco: Tuple[str, ...] = ()
         
         # Cargar listas de usuarios
         self._cargar_listas_usuarios()
         
         # 🌐 URLs ECODIGITAL
-        self.eco_base_url = "https://ecodigital.emergiacc.com"
+        # ECO_BASE_URL permite apuntar a otro host (p. ej. el servidor simulado: python simulador.py)
+        self.eco_base_url = self._get_env_variable("ECO_BASE_URL", "https://ecodigital.emergiacc.com").rstrip("/")
         self.eco_login_url = f"{self.eco_base_url}/WebEcoPresencia/"
         self.eco_turnos_url = f"{self.eco_login_url}Master#/TurnosAsesor"
         self.eco_api_turnos = f"{self.eco_base_url}/WebEcoPresencia/Asesor/ObtenerTurnos"
@@ -43,10 +49,79 @@ class Config:
         self.max_retries = int(self._get_env_variable("MAX_RETRIES", "3"))
         self.retry_delay = float(self._get_env_variable("RETRY_DELAY", "5.0"))
         self.timeout = int(self._get_env_variable("TIMEOUT", "30"))
+        self.retry_max_delay = float(self._get_env_variable("RETRY_MAX_DELAY", "60"))
+        self.circuito_umbral = int(self._get_env_variable("CIRCUITO_UMBRAL", "3"))
+        self.circuito_enfriamiento = float(self._get_env_variable("CIRCUITO_ENFRIAMIENTO", "300"))
+        # Única política de reintentos + circuit breaker, compartida por todos los usuarios
+        self.politica_reintentos = PoliticaReintentos(
+            self.max_retries,
+            self.retry_delay,
+            self.retry_max_delay,
+            self.circuito_umbral,
+            self.circuito_enfriamiento
+        )
+        
+        # ⚡ CONFIGURACIÓN DE CONCURRENCIA
+        self.max_workers = max(1, int(self._get_env_variable("MAX_WORKERS", "1")))
+        self.max_conexiones_host = max(1, int(self._get_env_variable("MAX_CONEXIONES_HOST", "4")))
+        self.motor = self._get_env_variable("MOTOR", "hilos")
+        self.limitador_host = LimitadorHost(self.max_conexiones_host)
+        # Pool de conexiones keep-alive compartido; cada usuario con su cookie jar
+        # MODO_HTTP=grabar|reproducir: respuestas de EcoDigital grabadas en FIXTURES_DIR (motor hilos)
+        self.modo_http = self._get_env_variable("MODO_HTTP", "").strip().lower()
+        self.fixtures_path = self._get_env_variable("FIXTURES_DIR", "./fixtures")
+        self.transporte_http = TransporteHttp(self.max_conexiones_host, modo=self.modo_http, directorio_grabaciones=self.fixtures_path)
+        # Sesiones autenticadas reutilizables entre ciclos (LRU + TTL de inactividad)
+        self.max_sesiones = max(1, int(self._get_env_variable("MAX_SESIONES", "500")))
+        self.sesion_ttl = float(self._get_env_variable("SESION_TTL", "3600"))
+        self.gestor_sesiones = GestorSesiones(self.max_sesiones, self.sesion_ttl)
+        # Cookies de todos los usuarios en un único SQLite (WAL); migra los JSON antiguos
+        self.almacen_sesiones = AlmacenSesiones(
+            self._get_env_variable("SESIONES_DB", os_path.join(self.cookies_base_path, "sesiones.db"))
+        )
+        self._migrar_cookies_json()
+        # Segundos durante los que unas cookies validadas se usan sin volver a comprobarlas
+        self.cookies_validez = float(self._get_env_variable("COOKIES_VALIDEZ", "1800"))
+        # Bytes como máximo que se leen de la página de turnos al validar unas cookies
+        self.sonda_bytes = max(4096, int(self._get_env_variable("SONDA_BYTES", "32768")))
+        # Leer ObtenerTurnos por trozos procesando cada turno según llega (memoria acotada)
+        self.turnos_stream = self._get_env_variable("TURNOS_STREAM", "1").lower() in ("1", "true", "si", "sí")
+
+        # 🪣 RITMO DE PETICIONES (token bucket): presupuestos separados para logins y API.
+        # LIMITADOR_ARCHIVO comparte el presupuesto entre varios procesos
+        self.limite_logins_minuto = float(self._get_env_variable("LIMITE_LOGINS_MINUTO", "6"))
+        self.rafaga_logins = float(self._get_env_variable("RAFAGA_LOGINS", "2"))
+        self.limite_api_minuto = float(self._get_env_variable("LIMITE_API_MINUTO", "30"))
+        self.rafaga_api = float(self._get_env_variable("RAFAGA_API", "5"))
+        self.limitador_tokens = LimitadorTokens(
+            {
+                "login": (self.limite_logins_minuto, self.rafaga_logins),
+                "api": (self.limite_api_minuto, self.rafaga_api),
+            },
+            self._get_env_variable("LIMITADOR_ARCHIVO", "") or None
+        )
+        # 🚪 Logins con credenciales en curso a la vez (cola FIFO, aparte del tráfico del API)
+        self.max_logins_simultaneos = max(1, int(self._get_env_variable("MAX_LOGINS_SIMULTANEOS", "1")))
+        self.puerta_login = PuertaLogin(self.max_logins_simultaneos)
+
+        # 👹 MODO DEMONIO (--daemon)
+        self.intervalo = max(1, int(self._get_env_variable("INTERVALO", "900")))
+        self.cron = self._get_env_variable("CRON", "")
+        # Renovar entre ciclos las sesiones que caducarían antes del siguiente
+        self.refresco_sesiones = self._get_env_variable("REFRESCO_SESIONES", "1").lower() in ("1", "true", "si", "sí")
+        self.refresco_margen = max(0.0, float(self._get_env_variable("REFRESCO_MARGEN", "120")))
+        # Planificación adaptativa por usuario (ADAPTATIVO=1 o --adaptativo).
+        # INTERVALO_MAX se limita a 24h: un calendario de más de 2 días se descarta con su historial
+        self.adaptativo = self._get_env_variable("ADAPTATIVO", "0").lower() in ("1", "true", "si", "sí")
+        self.intervalo_min = max(1, int(self._get_env_variable("INTERVALO_MIN", "300")))
+        self.intervalo_max = min(86400, max(1, int(self._get_env_variable("INTERVALO_MAX", "21600"))))
         
         # Telegram
         self.telegram_token = self._get_env_variable("TELEGRAM_TOKEN", "")
         self.telegram_chat = self._get_env_variable("TELEGRAM_CHAT", "")
+        if self.modo_http == "reproducir":
+            # Reproducción determinista a velocidad de CPU: sin mensajes reales a Telegram
+            self.telegram_token = ""
         
         # Validar configuración
         self.validate_config()
@@ -65,31 +140,46 @@ class Config:
         
         if users_str and pass_str:
             # Separar por comas y limpiar espacios
-            self.users_eco = [u.strip() for u in users_str.split(',') if u.strip()]
-            self.passwds_eco = [p.strip() for p in pass_str.split(',') if p.strip()]
+            self.users_eco = tuple(u.strip() for u in users_str.split(',') if u.strip())
+            self.passwds_eco = tuple(p.strip() for p in pass_str.split(',') if p.strip())
             
             print(f"📋 CSV cargado: {len(self.users_eco)} usuarios")
-            
-            # Establecer el PRIMERO como actual SOLO PARA INICIALIZAR
-            if self.users_eco:
-                self.user_eco = self.users_eco[0]
-                self.ps_eco = self.passwds_eco[0]
 
-    def _get_user_cookies_path(self) -> str:
+    def contexto(self, usuario: str, password: str) -> ContextoUsuario:
+        """Crea el contexto de ejecución de UN usuario"""
+        return ContextoUsuario(self, usuario, password)
+
+    def contextos(self) -> List[ContextoUsuario]:
+        """Crea los contextos de todos los usuarios configurados (en orden)"""
+        return [self.contexto(u, p) for u, p in zip(self.users_eco, self.passwds_eco)]
+
+    def _migrar_cookies_json(self):
+        """Pasa al almacén SQLite los archivos de cookies por usuario de versiones anteriores"""
+        migrados = 0
+        for usuario in self.users_eco:
+            try:
+                migrados += self.almacen_sesiones.migrar_archivo(usuario, self.get_user_cookies_path(usuario))
+            except Exception as e:
+                print(f"⚠️ No se pudieron migrar las cookies de {usuario}: {e}")
+        if migrados:
+            print(f"🍪 {migrados} archivo(s) de cookies migrados a {self.almacen_sesiones.ruta}")
+        self.almacen_sesiones.purgar_caducadas()
+
+    def get_user_cookies_path(self, usuario: str) -> str:
         """
-        Genera una ruta de cookies única para el usuario ACTUAL.
+        Ruta del archivo de cookies antiguo del usuario (solo para migrarlo a AlmacenSesiones).
         Ejemplo: ./cookies/usuario123_cookies.json
         """
         try:
-            if not self.user_eco:
-                raise ValueError("No hay usuario actual configurado")
+            if not usuario:
+                raise ValueError("No se indicó usuario")
             
             # Crear directorio base de cookies si no existe
             if not os_path.exists(self.cookies_base_path):
                 makedirs(self.cookies_base_path, exist_ok=True)
             
             # Extraer nombre de usuario del email
-            username = self.user_eco.split('@')[0] if '@' in self.user_eco else self.user_eco
+            username = usuario.split('@')[0] if '@' in usuario else usuario
             
             # Limpiar caracteres no válidos para nombres de archivo
             safe_username = sub(r'[^\w\-_\. ]', '_', username)
@@ -102,17 +192,17 @@ class Config:
             print(f"⚠️ Error generando ruta de cookies: {e}")
             return os_path.join(self.cookies_base_path, "cookies.json")
 
-    def get_user_data_path(self) -> str:
+    def get_user_data_path(self, usuario: str) -> str:
         """
-        Genera la ruta de datos específica para el usuario ACTUAL.
+        Genera la ruta de datos específica para el usuario indicado.
         Ejemplo: ./data/usuarios/usuario123/
         """
         try:
-            if not self.user_eco:
-                raise ValueError("No hay usuario actual configurado")
+            if not usuario:
+                raise ValueError("No se indicó usuario")
             
             # Extraer nombre de usuario del email
-            username = self.user_eco.split('@')[0] if '@' in self.user_eco else self.user_eco
+            username = usuario.split('@')[0] if '@' in usuario else usuario
             safe_username = sub(r'[^\w\-_\. ]', '_', username)
             
             # Ruta: ./data/usuarios/NOMBRE_USUARIO/
@@ -124,24 +214,20 @@ class Config:
             print(f"⚠️ Error generando ruta de datos: {e}")
             return self.data_path
         
-    def clear_session(self):
-        """Limpia la sesión actual para forzar un nuevo login"""
-        cookies_path = self._get_user_cookies_path()
-        
-        # Eliminar archivo de cookies para forzar login fresco
-        if os_path.exists(cookies_path):
-            try:
-                remove(cookies_path)
-                self.log.comentario("INFO", "Archivo de cookies eliminado")
-            except Exception as e:
-                self.log.comentario("WARNING", f"No se pudo eliminar cookies: {e}")
+    def clear_session(self, usuario: str):
+        """Limpia la sesión guardada del usuario para forzar un nuevo login"""
+        try:
+            if self.almacen_sesiones.borrar(usuario):
+                self.log.comentario("INFO", f"Sesión guardada eliminada ({usuario})")
+        except Exception as e:
+            self.log.comentario("WARNING", f"No se pudo eliminar la sesión de {usuario}: {e}")
 
-    def get_user_json_path(self) -> str:
+    def get_user_json_path(self, usuario: str) -> str:
         """
-        Genera la ruta completa del archivo JSON para el usuario ACTUAL.
+        Genera la ruta completa del archivo JSON para el usuario indicado.
         Ejemplo: ./data/usuarios/usuario123/calendario.json
         """
-        user_data_path = self.get_user_data_path()
+        user_data_path = self.get_user_data_path(usuario)
         return os_path.join(user_data_path, "calendario.json")
 
     def validate_config(self):
@@ -153,10 +239,6 @@ class Config:
         if len(self.users_eco) != len(self.passwds_eco):
             raise ValueError(f"Número de usuarios ({len(self.users_eco)}) no coincide con número de contraseñas ({len(self.passwds_eco)})")
         
-        # Validar que hay un usuario actual (aunque sea el primero)
-        if not self.user_eco or not self.ps_eco:
-            raise ValueError("No se pudo establecer un usuario actual")
-        
         # Validar rutas base
         required_paths = [self.logs_path, self.cookies_base_path, self.data_path]
         for path_dir in required_paths:
@@ -165,6 +247,5 @@ class Config:
                 print(f"📁 Directorio creado: {path_dir}")
         
         print(f"✅ Configuración válida: {len(self.users_eco)} usuario(s) cargados")
-        print(f"👤 Usuario actual por defecto: {self.user_eco}")
-        
+
         return True
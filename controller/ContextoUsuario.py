@@ -0,0 +1,48 @@
+# controller/ContextoUsuario.py
+from threading import Lock
+
+from controller.Log import Log
+
+class ContextoUsuario:
+    """
+    Contexto de ejecución de UN usuario.
+    Reúne credenciales, rutas y logger propios para que Ejecuciones, Login y
+    ExtractorCalendario no dependan de un "usuario actual" guardado en Config.
+    """
+
+    def __init__(self, config, usuario: str, password: str):
+        """
+        Constructor
+        Args:
+            config: Instancia de Config (compartida y de solo lectura)
+            usuario: Usuario de EcoDigital
+            password: Password de EcoDigital
+        """
+        self.usuario = usuario
+        self.password = password
+        self.ruta_datos = config.get_user_data_path(usuario)
+        self.log = Log(usuario)
+
+        # 📡 Métricas de la ejecución: peticiones a Asesor/ObtenerTurnos, peticiones HTTP
+        # totales contra EcoDigital y logins con credenciales (ver PoliticaReintentos)
+        self.peticiones_api = 0
+        self.peticiones_http = 0
+        self.logins = 0
+        self.__lock_metricas = Lock()
+
+    def contar(self, metrica: str, cantidad: int = 1):
+        """
+        Suma `cantidad` a una métrica ("peticiones_api", "peticiones_http" o "logins").
+        Seguro entre hilos: en extraer_rango varios meses del mismo usuario van en paralelo.
+        """
+        with self.__lock_metricas:
+            setattr(self, metrica, getattr(self, metrica) + cantidad)
+
+    def reiniciar_metricas(self):
+        """Pone a cero las métricas al empezar un ciclo (el contexto vive entre ciclos)"""
+        self.peticiones_api = 0
+        self.peticiones_http = 0
+        self.logins = 0
+
+    def __repr__(self) -> str:
+        return f"ContextoUsuario({self.usuario!r})"
@@ -0,0 +1,142 @@
+# controller/DecodificadorEco.py
+from datetime import date, datetime
+from re import compile as compilar
+
+class DecodificadorEco:
+    """
+    Decodifica los formatos de fecha de ObtenerTurnos sin strptime ni regex por turno:
+    - FechaHoraEntradaString / FechaHoraSalidaString: "AAAA-MM-DD HH:MM" (por posiciones)
+    - HoraDescanso1Entrada / HoraDescanso1Salida: "/Date(milisegundos)/" (ASP.NET)
+    Los textos con otro formato caen al camino lento (strptime / regex) con el mismo resultado.
+    decodificar_turnos() procesa la lista completa de un payload y devuelve columnas.
+    """
+
+    DIAS_SEMANA = ("Lunes", "Martes", "Miércoles", "Jueves", "Viernes", "Sábado", "Domingo")
+    PATRON_DATE = compilar(r'/Date\((\d+)\)/')
+    PREFIJO_DATE = "/Date("
+    COLUMNAS = ("fecha", "dia", "mes", "año", "dia_semana", "horario", "es_dia_libre", "break", "duracion_horas")
+
+    @staticmethod
+    def fecha(texto: str) -> date:
+        """'AAAA-MM-DD' -> date (ValueError si no es una fecha válida)"""
+        if len(texto) == 10 and texto[4] == "-" and texto[7] == "-":
+            return date(int(texto[0:4]), int(texto[5:7]), int(texto[8:10]))
+        return datetime.strptime(texto, "%Y-%m-%d").date()
+
+    @staticmethod
+    def minutos_hora(texto: str) -> int:
+        """'HH:MM' -> minutos desde medianoche (ValueError si no es una hora válida)"""
+        if len(texto) == 5 and texto[2] == ":" and texto[:2].isdigit() and texto[3:].isdigit():
+            horas, minutos = int(texto[:2]), int(texto[3:])
+            if horas < 24 and minutos < 60:
+                return horas * 60 + minutos
+        hora = datetime.strptime(texto.strip(), "%H:%M")
+        return hora.hour * 60 + hora.minute
+
+    @classmethod
+    def milisegundos(cls, valor) -> int:
+        """'/Date(1735722000000)/' -> 1735722000000, o None si no tiene ese formato"""
+        texto = str(valor)
+        if texto.startswith(cls.PREFIJO_DATE) and texto.endswith(")/"):
+            digitos = texto[6:-2]
+            if digitos.isdigit():
+                return int(digitos)
+        coincidencia = cls.PATRON_DATE.search(texto)
+        return int(coincidencia.group(1)) if coincidencia else None
+
+    @classmethod
+    def duracion_horas(cls, entrada: str, salida: str) -> float:
+        """
+        Horas entre 'HH:MM' de entrada y de salida; si la salida es anterior a la entrada el
+        turno cruza la medianoche (22:00 -> 06:00 = 8.0). None si alguna hora no se puede leer.
+        """
+        if not entrada or not salida:
+            return 0
+        try:
+            minutos = cls.minutos_hora(salida) - cls.minutos_hora(entrada)
+        except ValueError:
+            return None
+        if minutos < 0:
+            minutos += 24 * 60
+        return round(minutos / 60, 1)
+
+    @classmethod
+    def descanso(cls, entrada, salida) -> dict:
+        """
+        Break a partir de HoraDescanso1Entrada/Salida: {'horario': 'HH:MM - HH:MM', 'duracion_minutos': n}
+        o None si falta alguno o no tienen el formato /Date()/.
+        La duración sale de los milisegundos originales, sin pasar por datetime.
+        """
+        if not entrada or not salida:
+            return None
+        entrada_ms = cls.milisegundos(entrada)
+        salida_ms = cls.milisegundos(salida)
+        if entrada_ms is None or salida_ms is None:
+            return None
+        inicio = datetime.fromtimestamp(entrada_ms / 1000)
+        fin = datetime.fromtimestamp(salida_ms / 1000)
+        return {
+            'horario': f"{inicio.hour:02d}:{inicio.minute:02d} - {fin.hour:02d}:{fin.minute:02d}",
+            'duracion_minutos': int((salida_ms - entrada_ms) / 60000)
+        }
+
+    @classmethod
+    def decodificar_turno(cls, turno: dict) -> dict:
+        """
+        Campos de un turno del API ya decodificados, o None si no trae FechaHoraEntradaString.
+        Lanza ValueError si la fecha no es válida.
+        """
+        entrada = turno.get('FechaHoraEntradaString', '')
+        if not entrada or ' ' not in entrada:
+            return None
+        fecha_str, _, hora_entrada = entrada.partition(' ')
+        hora_entrada = hora_entrada.split(' ', 1)[0]
+        fecha = cls.fecha(fecha_str)
+
+        salida = turno.get('FechaHoraSalidaString', '')
+        hora_salida = salida.split(' ')[1] if ' ' in salida else ''
+        horario = f"{hora_entrada} - {hora_salida}" if hora_entrada and hora_salida else ''
+
+        novedad = turno.get('Novedad')
+        es_dia_libre = isinstance(novedad, dict) and novedad.get('Codigo') == 'LIBRE'
+
+        try:
+            descanso = cls.descanso(turno.get('HoraDescanso1Entrada'), turno.get('HoraDescanso1Salida'))
+        except (ValueError, TypeError, OverflowError, OSError):
+            descanso = None
+
+        return {
+            'fecha': fecha_str,
+            'dia': fecha.day,
+            'mes': fecha.month,
+            'año': fecha.year,
+            'dia_semana': cls.DIAS_SEMANA[fecha.weekday()],
+            'horario': horario,
+            'es_dia_libre': es_dia_libre,
+            'break': descanso,
+            'duracion_horas': cls.duracion_horas(hora_entrada, hora_salida) if horario else 0,
+        }
+
+    @classmethod
+    def decodificar_turnos(cls, turnos: list) -> tuple:
+        """
+        Decodifica todos los turnos de un payload de una pasada.
+        Returns:
+            (columnas, errores): dict con una lista por cada nombre de COLUMNAS (misma
+            longitud, en el orden del API) y lista de (texto_fecha, error) de los turnos
+            descartados por fecha inválida. Los turnos sin fecha se omiten sin error.
+        """
+        columnas = {nombre: [] for nombre in cls.COLUMNAS}
+        anexos = [(columnas[nombre].append, nombre) for nombre in cls.COLUMNAS]
+        errores = []
+        for turno in turnos or []:
+            try:
+                decodificado = cls.decodificar_turno(turno)
+            except (ValueError, TypeError, AttributeError) as e:
+                errores.append((turno.get('FechaHoraEntradaString', '') if isinstance(turno, dict) else '', e))
+                continue
+            if decodificado is None:
+                continue
+            for anexar, nombre in anexos:
+                anexar(decodificado[nombre])
+        return columnas, errores
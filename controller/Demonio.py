@@ -0,0 +1,142 @@
+# controller/Demonio.py
+from datetime import datetime, timedelta
+from signal import SIGINT, SIGTERM, signal
+from threading import Event
+from traceback import print_exc
+
+from controller.ExpresionCron import ExpresionCron
+from controller.PlanificadorAdaptativo import PlanificadorAdaptativo
+from controller.RefrescadorSesiones import RefrescadorSesiones
+
+class Demonio:
+    """
+    Modo demonio: un único proceso que repite la ejecución de todos los usuarios
+    cada INTERVALO segundos o según una expresión CRON.
+    Config, contextos, sesiones HTTP y calendarios en memoria viven entre ciclos
+    (los conservan el motor y Config.gestor_sesiones), así cada ciclo solo paga la consulta
+    al API y la comparación.
+    En modo adaptativo cada usuario lleva su propio próximo turno (PlanificadorAdaptativo)
+    y en cada ciclo solo se ejecutan los usuarios que ya vencieron.
+    Con REFRESCO_SESIONES el tiempo libre entre ciclos se usa para renovar las sesiones
+    que caducarían antes del siguiente (RefrescadorSesiones).
+    """
+
+    def __init__(self, config, ejecutar_ciclo, mostrar_resumen, intervalo: int = None, cron: str = None, adaptativo: bool = None):
+        """
+        Constructor
+        Args:
+            config: Instancia de Config compartida
+            ejecutar_ciclo: Callable(usuarios=None) que ejecuta los usuarios y devuelve el resumen
+            mostrar_resumen: Callable que imprime ese resumen
+            intervalo: Segundos entre el inicio de un ciclo y el siguiente (por defecto config.intervalo)
+            cron: Expresión cron de 5 campos; si se indica, tiene prioridad sobre el intervalo
+            adaptativo: Intervalo propio por usuario según su historial de cambios (ignora cron)
+        """
+        self.config = config
+        self.ejecutar_ciclo = ejecutar_ciclo
+        self.mostrar_resumen = mostrar_resumen
+        self.intervalo = max(1, intervalo or config.intervalo)
+        cron = cron if cron is not None else config.cron
+        self.cron = ExpresionCron(cron) if cron else None
+        adaptativo = config.adaptativo if adaptativo is None else adaptativo
+        self.planificador = PlanificadorAdaptativo(config) if adaptativo else None
+        if self.planificador:
+            self.cron = None
+        self.refrescador = RefrescadorSesiones(config) if config.refresco_sesiones else None
+        self.ciclos = 0
+        self.__detener = Event()
+
+    def proxima_ejecucion(self, inicio_ciclo: datetime) -> datetime:
+        """Momento del siguiente ciclo según la planificación configurada"""
+        if self.cron:
+            return self.cron.siguiente(datetime.now())
+        return max(inicio_ciclo + timedelta(seconds=self.intervalo), datetime.now())
+
+    def detener(self, *_):
+        """Pide detener el demonio al terminar el ciclo en curso (SIGTERM/SIGINT)"""
+        if not self.__detener.is_set():
+            print("\n🛑 Señal de parada recibida, terminando tras el ciclo actual...")
+        self.__detener.set()
+
+    def _ciclo(self, usuarios=None) -> dict:
+        """Ejecuta un ciclo sin dejar que un error tumbe el proceso. Retorna el resumen o None"""
+        self.ciclos += 1
+        print(f"\n{'='*60}")
+        print(f"🔁 CICLO {self.ciclos} - {datetime.now().strftime('%d/%m/%Y %H:%M:%S')}")
+        print(f"{'='*60}")
+        try:
+            resumen = self.ejecutar_ciclo(usuarios)
+            self.mostrar_resumen(resumen)
+            return resumen
+        except Exception as e:
+            print(f"💥 Error en el ciclo {self.ciclos}: {e}")
+            print_exc()
+            return None
+
+    def _esperar_hasta(self, proxima: datetime, excluir=()) -> bool:
+        """
+        Duerme hasta 'proxima' (renovando sesiones por el camino si hay refrescador).
+        Retorna False si se pidió detener mientras tanto
+        """
+        espera = (proxima - datetime.now()).total_seconds()
+        if espera > 0:
+            print(f"💤 Próximo ciclo: {proxima.strftime('%d/%m/%Y %H:%M:%S')}")
+            if self.refrescador:
+                return self.refrescador.refrescar_hasta(proxima, self.__detener, excluir)
+            if self.__detener.wait(espera):
+                return False
+        return True
+
+    def _ejecutar_adaptativo(self):
+        """Bucle con un próximo turno por usuario según su historial de cambios"""
+        proximas = {usuario: datetime.now() for usuario in self.config.users_eco}
+        while not self.__detener.is_set():
+            siguiente = min(proximas.values())
+            # Los usuarios del próximo turno se loguean en él de todos modos
+            if not self._esperar_hasta(siguiente, {u for u, fecha in proximas.items() if fecha <= siguiente}):
+                break
+
+            ahora = datetime.now()
+            pendientes = [u for u, fecha in proximas.items() if fecha <= ahora]
+            resumen = self._ciclo(pendientes) or {}
+            resultados = resumen.get("resultados", {})
+            for usuario in pendientes:
+                segundos = self.planificador.intervalo(resultados.get(usuario))
+                proximas[usuario] = datetime.now() + timedelta(seconds=segundos)
+                print(f"🗓️  {usuario}: próxima consulta en {segundos // 60} min")
+
+    def ejecutar(self):
+        """Bucle principal hasta recibir SIGTERM/SIGINT"""
+        signal(SIGTERM, self.detener)
+        signal(SIGINT, self.detener)
+
+        if self.planificador:
+            planificacion = f"adaptativo ({self.planificador.intervalo_min}s - {self.planificador.intervalo_max}s por usuario)"
+        elif self.cron:
+            planificacion = f"cron '{self.cron.expresion}'"
+        else:
+            planificacion = f"cada {self.intervalo}s"
+        print(f"👹 Modo demonio: {planificacion}")
+        if self.refrescador:
+            print(f"🔄 Renovación de sesiones entre ciclos (validez {self.config.cookies_validez:.0f}s, margen {self.config.refresco_margen:.0f}s)")
+
+        if self.planificador:
+            self._ejecutar_adaptativo()
+        else:
+            self._ejecutar_periodico()
+
+        if self.refrescador:
+            print(f"🔑 Sesiones renovadas entre ciclos: {self.refrescador.resumen()}")
+        print(f"👋 Demonio detenido tras {self.ciclos} ciclo(s)")
+
+    def _ejecutar_periodico(self):
+        """Bucle con todos los usuarios cada INTERVALO o según CRON"""
+        # Con cron se espera a la primera coincidencia; con intervalo se arranca ya
+        proxima = self.cron.siguiente(datetime.now()) if self.cron else datetime.now()
+        while not self.__detener.is_set():
+            if not self._esperar_hasta(proxima):
+                break
+
+            inicio = datetime.now()
+            self._ciclo()
+            proxima = self.proxima_ejecucion(inicio)
@@ -1,9 +1,5 @@
-from time import sleep
-from random import uniform
-from json import load, dump
 from datetime import datetime
 from traceback import print_exc
-from os import path as os_path, listdir, rmdir, remove
 
 from controller.Login import Login
 from controller.ExtractorCalendario import ExtractorCalendario
@@ -15,31 +11,35 @@ class Ejecuciones:
     Versión HTTP - sin dependencia de Playwright ni interacción con UI
     """
 
-    def __init__(self, config):  
-        """Constructor"""
+    def __init__(self, config, contexto):  
+        """
+        Constructor
+        Args:
+            config: Instancia de Config compartida (solo lectura)
+            contexto: ContextoUsuario del usuario a procesar
+        """
         self.config = config  
+        self.contexto = contexto
+        self.log = contexto.log
         self.login_instance = None
         self.extractor_instance = None
         self.json_fue_eliminado = False
         self.json_eliminado_por_mes = False
         self.notificador = NotificadorTelegram(self.config) 
 
-    def _verificar_y_eliminar_json_por_mes(self, ruta_json):
+    def _verificar_y_eliminar_json_por_mes(self, documento):
         """
-        Verifica si el JSON pertenece a un mes anterior al actual.
-        Si es así, lo elimina antes de iniciar el proceso.
-        Devuelve True si fue eliminado, False si no.
+        Verifica si el calendario (documento en memoria) pertenece a un mes anterior al actual.
+        Si es así, lo descarta antes de comparar; el archivo se reemplaza al guardar.
+        Devuelve True si fue descartado, False si no.
         """
         try:
-            if not ruta_json or not os_path.exists(ruta_json):
-                print(f"ℹ️  Archivo JSON no existe: {ruta_json}")
+            json_data = documento.datos
+            if json_data is None:
+                print(f"ℹ️  Archivo JSON no existe: {documento.ruta}")
                 return False
             
-            print(f"📅 Verificando mes del JSON: {ruta_json}")
-            
-            # Leer el JSON para obtener el mes
-            with open(ruta_json, 'r', encoding='utf-8') as f:
-                json_data = load(f)
+            print(f"📅 Verificando mes del JSON: {documento.ruta}")
             
             # Obtener mes del JSON (desde periodo.mes o fecha_generacion)
             periodo = json_data.get("periodo", {})
@@ -106,34 +106,16 @@ class Ejecuciones:
                 es_mes_anterior = True
             
             if es_mes_anterior:
-                print(f"🗑️  JSON corresponde a mes anterior ({mes_json_str}), eliminando...")
+                print(f"🗑️  JSON corresponde a mes anterior ({mes_json_str}), descartando...")
                 
-                # Obtener información del usuario antes de eliminar
+                # Obtener información del usuario antes de descartar
                 usuario = json_data.get("usuario", {}).get("nombre_completo", "desconocido")
-                print(f"📋 JSON a eliminar: Usuario={usuario}, Mes={mes_json_str}")
-                
-                # Eliminar el archivo
-                remove(ruta_json)
+                print(f"📋 JSON descartado: Usuario={usuario}, Mes={mes_json_str}")
                 
-                # Verificar que se eliminó
-                if not os_path.exists(ruta_json):
-                    print(f"✅ JSON eliminado exitosamente: {os_path.basename(ruta_json)}")
-                    
-                    # Intentar eliminar también el directorio si está vacío
-                    try:
-                        directorio = os_path.dirname(ruta_json)
-                        if os_path.exists(directorio) and not listdir(directorio):
-                            rmdir(directorio) 
-                            print(f"🗂️  Directorio vacío eliminado: {os_path.basename(directorio)}")
-                    except Exception as dir_error:
-                        print(f"ℹ️  No se pudo eliminar directorio: {dir_error}")
-                    
-                    self.json_fue_eliminado = True
-                    self.json_eliminado_por_mes = True
-                    return True
-                else:
-                    print(f"❌ No se pudo eliminar el JSON: {ruta_json}")
-                    return False
+                documento.descartar()
+                self.json_fue_eliminado = True
+                self.json_eliminado_por_mes = True
+                return True
             else:
                 print(f"✅ JSON corresponde al mes actual ({mes_json_str}), conservado")
                 self.json_fue_eliminado = False
@@ -147,21 +129,18 @@ class Ejecuciones:
             self.json_eliminado_por_mes = False
             return False
 
-    def _verificar_y_eliminar_json_antiguo(self, ruta_json):
+    def _verificar_y_eliminar_json_antiguo(self, documento):
         """
-        Verifica si el JSON tiene más de 2 días usando fecha_generacion y lo elimina.
-        Devuelve True si fue eliminado, False si no.
+        Verifica si el calendario (documento en memoria) tiene más de 2 días usando
+        fecha_generacion y lo descarta. Devuelve True si fue descartado, False si no.
         """
         try:
-            if not ruta_json or not os_path.exists(ruta_json):
-                print(f"ℹ️  Archivo JSON no existe: {ruta_json}")
+            json_data = documento.datos
+            if json_data is None:
+                print(f"ℹ️  Archivo JSON no existe: {documento.ruta}")
                 return False
             
-            print(f"📁 Verificando antigüedad del JSON: {ruta_json}")
-            
-            # Leer el JSON para obtener fecha_generacion
-            with open(ruta_json, 'r', encoding='utf-8') as f:
-                json_data = load(f)
+            print(f"📁 Verificando antigüedad del JSON: {documento.ruta}")
             
             # Obtener fecha_generacion del JSON
             fecha_generacion_str = json_data.get("periodo", {}).get("fecha_generacion")
@@ -169,7 +148,7 @@ class Ejecuciones:
             if not fecha_generacion_str:
                 print("⚠️  No se encontró 'fecha_generacion' en el JSON, usando fecha de modificación del archivo")
                 # Fallback a fecha de modificación del archivo
-                fecha_generacion = datetime.fromtimestamp(os_path.getmtime(ruta_json))
+                fecha_generacion = documento.fecha_modificacion()
             else:
                 try:
                     # Parsear fecha_generacion (formato: YYYY-MM-DD)
@@ -191,33 +170,15 @@ class Ejecuciones:
             
             # Si han pasado más de 2 días, eliminar
             if diferencia_dias > 2:
-                print(f"🗑️  Han pasado {diferencia_dias} días (>2), eliminando JSON...")
+                print(f"🗑️  Han pasado {diferencia_dias} días (>2), descartando JSON...")
                 
-                # Obtener información del usuario antes de eliminar
+                # Obtener información del usuario antes de descartar
                 usuario = json_data.get("usuario", {}).get("nombre_completo", "desconocido")
-                print(f"📋 JSON a eliminar: Usuario={usuario}, Fecha={fecha_generacion_str}")
+                print(f"📋 JSON descartado: Usuario={usuario}, Fecha={fecha_generacion_str}")
                 
-                # Eliminar el archivo
-                remove(ruta_json)
-                
-                # Verificar que se eliminó
-                if not os_path.exists(ruta_json):
-                    print(f"✅ JSON eliminado exitosamente: {os_path.basename(ruta_json)}")
-                    
-                    # Intentar eliminar también el directorio si está vacío
-                    try:
-                        directorio = os_path.dirname(ruta_json)
-                        if os_path.exists(directorio) and not listdir(directorio):
-                            rmdir(directorio) 
-                            print(f"🗂️  Directorio vacío eliminado: {os_path.basename(directorio)}")
-                    except Exception as dir_error:
-                        print(f"ℹ️  No se pudo eliminar directorio: {dir_error}")
-                    
-                    self.json_fue_eliminado = True
-                    return True
-                else:
-                    print(f"❌ No se pudo eliminar el JSON: {ruta_json}")
-                    return False
+                documento.descartar()
+                self.json_fue_eliminado = True
+                return True
             else:
                 print(f"✅ JSON conservado (diferencia: {diferencia_dias} días ≤ 2)")
                 self.json_fue_eliminado = False
@@ -229,149 +190,83 @@ class Ejecuciones:
             self.json_fue_eliminado = False
             return False
 
-    def extraer_y_procesar_calendario(self, user_email: str):
+    def _preparar_extractor(self):
+        """
+        Crea el extractor la primera vez y en ciclos siguientes (modo demonio) lo reutiliza
+        con la sesión actual, conservando el calendario cargado en memoria.
+        """
+        if self.extractor_instance is None:
+            self.extractor_instance = ExtractorCalendario(
+                self.login_instance.get_session(),
+                self.config,
+                self.contexto
+            )
+            return
+        self.extractor_instance.usar_sesion(self.login_instance.get_session())
+        if self.extractor_instance.nombre_usuario:
+            if self.extractor_instance.documento_usuario().sincronizar():
+                self.log.comentario("INFO", "calendario.json cambió en disco, se recargará")
+
+    def _reemplazar_login(self, login):
+        """
+        Cambia el Login actual. El GestorSesiones es el dueño de las sesiones:
+        registrar uno nuevo cierra el anterior y None descarta la sesión del usuario.
+        """
+        gestor = self.config.gestor_sesiones
+        if login is None:
+            gestor.descartar(self.contexto.usuario)
+        else:
+            gestor.guardar(self.contexto.usuario, login)
+        self.login_instance = login
+
+    def sesion_activa(self) -> bool:
+        """True si el GestorSesiones entregó una sesión caliente con cookies en memoria"""
+        return bool(self.login_instance and self.login_instance.get_session().cookies)
+
+    def extraer_y_procesar_calendario(self, user_email: str = None):
         """
         Ejecuta el proceso completo de extracción, comparación y guardado.
-        Verifica y elimina JSON antiguo antes de proceder.
+        Verifica la vigencia del JSON previo (en memoria) antes de comparar;
+        calendario.json se lee como máximo una vez y se escribe una sola vez.
         """
+        user_email = user_email or self.contexto.usuario
         try:
             print("🔄 Iniciando proceso de extracción y procesamiento...")
             
-            # Resetear banderas al inicio de cada ejecución
-            self.json_fue_eliminado = False
-            self.json_eliminado_por_mes = False
-            
-            # 1. Verificar si hay JSON que eliminar por cambio de mes (PRIORIDAD ALTA)
-            # 👇 PASAR config al extractor temporal
-            extractor_temp = ExtractorCalendario(None, self.config, user_email)  
-            ruta_json_usuario = extractor_temp.obtener_ruta_json_usuario()
-            
-            if ruta_json_usuario and os_path.exists(ruta_json_usuario):
-                print("\n🔍 VERIFICANDO CAMBIO DE MES...")
-                json_eliminado_por_mes = self._verificar_y_eliminar_json_por_mes(ruta_json_usuario)
-                
-                if not json_eliminado_por_mes:
-                    # Si no se eliminó por mes, verificar antigüedad (>2 días)
-                    print("\n🔍 VERIFICANDO ANTIGÜEDAD (>2 días)...")
-                    json_eliminado_por_antiguedad = self._verificar_y_eliminar_json_antiguo(ruta_json_usuario)
-                    
-                    if json_eliminado_por_antiguedad:
-                        print("🔄 JSON eliminado por antigüedad (>2 días). Esta será una nueva extracción.")
-                    else:
-                        print("✅ JSON conservado. Se comparará con la versión anterior.")
-                # Si ya se eliminó por mes, no hacer nada más
-            else:
-                print("ℹ️  No existe JSON previo para este usuario")
-                self.json_fue_eliminado = False
-            
-            # 2. EXTRAER datos del API (ya tenemos sesión en self.login_instance)
+            # 1. EXTRAER datos del API (ya tenemos sesión en self.login_instance)
             print("\n🔄 Extrayendo datos del calendario vía API...")
-            # 👇 PASAR config al extractor
-            self.extractor_instance = ExtractorCalendario(
-                self.login_instance.get_session(), 
-                self.config,
-                login_instance=self.login_instance
-            )
+            self._preparar_extractor()
 
             datos = self.extractor_instance.extraer_todo()
         
-            # Si falla por NOSESS y podemos reintentar login
-            if datos is None:
-                # Verificar si fue por sesión expirada (revisando último log o estado)
-                # O simplemente reintentar con login fresco
-                self.config.log.comentario("WARNING", "Reintentando con login fresco por posible sesión expirada")
-                
-                # Forzar nuevo login SIN usar cookies
-                if self.login_instance:
-                    self.login_instance.session.cookies.clear()
-                
-                nuevo_login = Login(self.config, self.config.user_eco, self.config.ps_eco)
-                if nuevo_login.login(use_cookies=False):  # ← Login fresco, sin cookies
-                    self.login_instance = nuevo_login
-                    self.extractor_instance = ExtractorCalendario(
-                        self.login_instance.get_session(), 
-                        self.config  
-                    )
-                    print("🔄 Reintentando extracción con sesión fresca...")
-                    datos = self.extractor_instance.extraer_todo()
+            # Sin datos o sesión expirada: NO se re-loguea aquí, el reintento (login fresco
+            # con backoff) lo decide ejecuta_login_y_extraccion según PoliticaReintentos
+            if not datos or datos.get("_error_session"):
+                if datos and datos.get("_error_session"):
+                    error = "NOSESS: sesión expirada"
                 else:
-                    self.config.log.error("Re-login fallido", "extraccion")
-            
-            if not datos:
-                self.config.log.error("No se pudieron obtener datos del API", "extraccion")
-                return None
+                    error = "No se pudieron obtener datos del API"
+                self.log.error(error, "extraccion")
+                return {"exito": False, "error": error, "reintentable": True}
             
-            # 3. EJECUTAR proceso simplificado
-            exito = self.extractor_instance.ejecutar_proceso_simplificado()
+            # 2. Verificar vigencia, comparar y guardar con los datos ya extraídos
+            resultado = self.procesar_datos_extraidos(datos, user_email)
             
-            if exito:
-                print("\n🎉 Proceso completado exitosamente")
-                
-                # Obtener datos actualizados para mostrar resumen
-                ruta_json = self.extractor_instance.obtener_ruta_json_usuario()
-                cambios_detectados = False
-                total_cambios = 0
-                dias_con_cambios = []
-                json_data = {}
-                if ruta_json and os_path.exists(ruta_json):
-                    with open(ruta_json, 'r', encoding='utf-8') as f:
-                        json_data = load(f)
-                    
-                    # Mostrar fecha de generación
-                    fecha_generacion = json_data.get("periodo", {}).get("fecha_generacion", "desconocida")
-                    mes_periodo = json_data.get("periodo", {}).get("mes", "desconocido")
-                    print(f"📅 Mes del calendario: {mes_periodo}")
-                    print(f"📅 Fecha de generación del JSON: {fecha_generacion}")
-                    
-                    # Mostrar mensaje especial si el JSON fue eliminado antes
-                    if self.json_eliminado_por_mes:
-                        print("📝 NOTA: Se creó nuevo JSON (el anterior correspondía a un mes anterior)")
-                    elif self.json_fue_eliminado:
-                        print("📝 NOTA: Se creó nuevo JSON (el anterior fue eliminado por antigüedad)")
-                    
-                    # Verificar cambios
-                    cambios_detectados = json_data.get("resumen_cambios", {}).get("se_detectaron_cambios", False)
-                    if cambios_detectados:
-                        total_cambios = json_data['resumen_cambios']['total_cambios']
-                        dias_con_cambios = json_data['resumen_cambios']['dias_con_cambios']
-                        print(f"🔄 Cambios detectados: {total_cambios} días modificados")
-                        print(f"📅 Días con cambios: {dias_con_cambios}")
-                    else:
-                        print(f"✅ Sin cambios detectados")
-                    
-                    # ===== ENVIAR NOTIFICACIÓN POR TELEGRAM =====
+            # ===== ENVIAR NOTIFICACIÓN POR TELEGRAM =====
+            if resultado.get("exito"):
+                json_data = self.extractor_instance.documento_usuario().datos
+                if json_data:
                     self._enviar_notificacion_telegram(
                         json_data=json_data,
-                        cambios_detectados=cambios_detectados,
-                        total_cambios=total_cambios,
-                        dias_con_cambios=dias_con_cambios,
+                        cambios_detectados=resultado["cambios_detectados"],
+                        total_cambios=resultado["total_cambios"],
+                        dias_con_cambios=resultado["dias_con_cambios"],
                         json_eliminado_por_mes=self.json_eliminado_por_mes,
                         json_fue_eliminado=self.json_fue_eliminado
                     )
-                
-                return {
-                    "exito": True,
-                    "usuario": self.extractor_instance.nombre_usuario or user_email,
-                    "ruta_json": ruta_json,
-                    "mes_calendario": mes_periodo if 'mes_periodo' in locals() else None,
-                    "fecha_generacion": fecha_generacion if 'fecha_generacion' in locals() else None,
-                    "json_eliminado": self.json_fue_eliminado,
-                    "json_eliminado_por_mes": self.json_eliminado_por_mes,
-                    "cambios_detectados": cambios_detectados,
-                    "total_cambios": total_cambios,
-                    "dias_con_cambios": dias_con_cambios
-                }
             else:
-                print("❌ Error en el proceso")
-                self.notificador.notificar_error(
-                    f"❌ Error en el proceso de extracción\n"
-                    f"👤 Usuario: {user_email}\n"
-                    f"📅 Fecha: {datetime.now().strftime('%d/%m/%Y %H:%M')}"
-                )
-                return {
-                    "exito": False,
-                    "error": "No se pudo completar el proceso"
-                }
+                self.notificador.enviar_mensaje(*self.notificacion_error_proceso(user_email))
+            return resultado
                 
         except Exception as e:
             print(f"💥 Error en ejecución: {e}")
@@ -387,107 +282,271 @@ class Ejecuciones:
                 "error": str(e)
             }
 
-    def _enviar_notificacion_telegram(self, json_data, cambios_detectados, total_cambios, dias_con_cambios, json_eliminado_por_mes, json_fue_eliminado):
+    def extraer_y_guardar_rango(self, desde, hasta, user_email: str = None) -> dict:
         """
-        Envía notificación por Telegram según los resultados de la ejecución
+        Variante de extraer_y_procesar_calendario para un rango de fechas (--desde/--hasta):
+        guarda un calendario_AAAA_MM.json por mes, sin tocar calendario.json ni notificar.
         """
-        try:
-            # Datos básicos
-            usuario = json_data.get("usuario", {}).get("nombre_completo", "Desconocido")
-            mes = json_data.get("periodo", {}).get("mes", "Desconocido")
-            fecha_generacion = json_data.get("periodo", {}).get("fecha_generacion", "Desconocida")
+        user_email = user_email or self.contexto.usuario
+        self._preparar_extractor()
+        extraccion = self.extractor_instance.extraer_rango(desde, hasta)
+
+        if extraccion.get("_error_session"):
+            self.log.error("NOSESS: sesión expirada durante el rango", "extraccion rango")
+            return {"exito": False, "error": "NOSESS: sesión expirada", "reintentable": True}
+        if extraccion["fallidos"]:
+            error = f"Meses sin datos del API: {', '.join(extraccion['fallidos'])}"
+            self.log.error(error, "extraccion rango")
+            return {"exito": False, "error": error, "reintentable": True}
+
+        return {
+            "exito": True,
+            "usuario": self.extractor_instance.nombre_usuario or user_email,
+            "meses": list(extraccion["meses"]),
+            "archivos": list(extraccion["meses"].values()),
+            "peticiones_api": self.contexto.peticiones_api
+        }
+
+    def procesar_datos_extraidos(self, datos, user_email: str = None) -> dict:
+        """
+        Verifica la vigencia del JSON previo, compara y guarda a partir de datos ya extraídos
+        (sin peticiones HTTP ni notificaciones). Lo comparten el motor sync y el async;
+        requiere self.extractor_instance con el nombre del usuario ya identificado.
+        Retorna: dict con el resultado de la ejecución
+        """
+        user_email = user_email or self.contexto.usuario
+        
+        # Resetear banderas al inicio de cada procesamiento
+        self.json_fue_eliminado = False
+        self.json_eliminado_por_mes = False
+        
+        # 1. Verificar vigencia del JSON previo (ya se conoce el nombre real del usuario)
+        documento = self.extractor_instance.documento_usuario()
+
+        # ⚡ Misma respuesta que generó el calendario de hoy: sin cambios, sin escribir ni backup
+        if datos.get("_sin_cambios"):
+            json_data = documento.datos
+            print("\n✅ Respuesta idéntica a la anterior - sin cambios (calendario no modificado)")
+            return {
+                "exito": True,
+                "usuario": self.extractor_instance.nombre_usuario or user_email,
+                "ruta_json": documento.ruta,
+                "mes_calendario": json_data.get("periodo", {}).get("mes"),
+                "fecha_generacion": json_data.get("periodo", {}).get("fecha_generacion"),
+                "json_eliminado": False,
+                "json_eliminado_por_mes": False,
+                "cambios_detectados": False,
+                "total_cambios": 0,
+                "dias_con_cambios": [],
+                "respuesta_identica": True,
+                "peticiones_api": self.contexto.peticiones_api,
+                "lecturas_calendario": documento.lecturas,
+                "historial_cambios": self.extractor_instance.historial_cambios()
+            }
+        
+        if documento.existe():
+            print("\n🔍 VERIFICANDO CAMBIO DE MES...")
+            json_eliminado_por_mes = self._verificar_y_eliminar_json_por_mes(documento)
             
-            # CABECERA
-            mensaje = f"📊 *REPORTE DE EXTRACCIÓN*\n"
-            mensaje += f"👤 *Usuario:* {usuario}\n"
-            mensaje += f"📅 *Mes:* {mes}\n"
-            mensaje += f"🕐 *Fecha:* {fecha_generacion}\n"
-            mensaje += "─" * 30 + "\n\n"
+            if not json_eliminado_por_mes:
+                # Si no se descartó por mes, verificar antigüedad (>2 días)
+                print("\n🔍 VERIFICANDO ANTIGÜEDAD (>2 días)...")
+                json_eliminado_por_antiguedad = self._verificar_y_eliminar_json_antiguo(documento)
+                
+                if json_eliminado_por_antiguedad:
+                    print("🔄 JSON descartado por antigüedad (>2 días). Esta será una nueva extracción.")
+                else:
+                    print("✅ JSON conservado. Se comparará con la versión anterior.")
+            # Si ya se descartó por mes, no hacer nada más
+        else:
+            print("ℹ️  No existe JSON previo para este usuario")
+            self.json_fue_eliminado = False
+        
+        # 2. EJECUTAR proceso simplificado con los datos ya extraídos (una sola petición al API)
+        exito = self.extractor_instance.ejecutar_proceso_simplificado(datos)
+        
+        if exito:
+            print("\n🎉 Proceso completado exitosamente")
             
-            # SECCIÓN: Estado del JSON
-            if json_eliminado_por_mes:
-                mensaje += f"🗑️ *JSON eliminado:* Cambio de mes\n"
-                mensaje += f"📝 *Acción:* Nueva extracción\n\n"
-            elif json_fue_eliminado:
-                mensaje += f"🗑️ *JSON eliminado:* Por antigüedad (>2 días)\n"
-                mensaje += f"📝 *Acción:* Nueva extracción\n\n"
-            else:
-                mensaje += f"📁 *JSON existente:* Conservado\n\n"
+            # Obtener datos actualizados para mostrar resumen (documento en memoria)
+            ruta_json = documento.ruta
+            cambios_detectados = False
+            total_cambios = 0
+            dias_con_cambios = []
+            json_data = documento.datos or {}
+            if json_data:
+                # Mostrar fecha de generación
+                fecha_generacion = json_data.get("periodo", {}).get("fecha_generacion", "desconocida")
+                mes_periodo = json_data.get("periodo", {}).get("mes", "desconocido")
+                print(f"📅 Mes del calendario: {mes_periodo}")
+                print(f"📅 Fecha de generación del JSON: {fecha_generacion}")
+                
+                # Mostrar mensaje especial si el JSON fue eliminado antes
+                if self.json_eliminado_por_mes:
+                    print("📝 NOTA: Se creó nuevo JSON (el anterior correspondía a un mes anterior)")
+                elif self.json_fue_eliminado:
+                    print("📝 NOTA: Se creó nuevo JSON (el anterior fue eliminado por antigüedad)")
+                
+                # Verificar cambios
+                cambios_detectados = json_data.get("resumen_cambios", {}).get("se_detectaron_cambios", False)
+                if cambios_detectados:
+                    total_cambios = json_data['resumen_cambios']['total_cambios']
+                    dias_con_cambios = json_data['resumen_cambios']['dias_con_cambios']
+                    print(f"🔄 Cambios detectados: {total_cambios} días modificados")
+                    print(f"📅 Días con cambios: {dias_con_cambios}")
+                else:
+                    print(f"✅ Sin cambios detectados")
             
-            # SECCIÓN: Cambios detectados
-            if cambios_detectados:
-                mensaje += f"🔄 *CAMBIOS DETECTADOS*\n"
-                mensaje += f"📊 *Total:* {total_cambios} día(s) modificado(s)\n"
+            return {
+                "exito": True,
+                "usuario": self.extractor_instance.nombre_usuario or user_email,
+                "ruta_json": ruta_json,
+                "mes_calendario": mes_periodo if 'mes_periodo' in locals() else None,
+                "fecha_generacion": fecha_generacion if 'fecha_generacion' in locals() else None,
+                "json_eliminado": self.json_fue_eliminado,
+                "json_eliminado_por_mes": self.json_eliminado_por_mes,
+                "cambios_detectados": cambios_detectados,
+                "total_cambios": total_cambios,
+                "dias_con_cambios": dias_con_cambios,
+                "respuesta_identica": False,
+                "peticiones_api": self.contexto.peticiones_api,
+                "lecturas_calendario": documento.lecturas,
+                "historial_cambios": self.extractor_instance.historial_cambios()
+            }
+        else:
+            print("❌ Error en el proceso")
+            return {
+                "exito": False,
+                "error": "No se pudo completar el proceso"
+            }
+
+    def mensaje_error_proceso(self, user_email: str) -> str:
+        """Mensaje de Telegram para un proceso de extracción fallido"""
+        return (
+            f"❌ Error en el proceso de extracción\n"
+            f"👤 Usuario: {user_email}\n"
+            f"📅 Fecha: {datetime.now().strftime('%d/%m/%Y %H:%M')}"
+        )
+
+    def notificacion_error_proceso(self, user_email: str) -> tuple:
+        """
+        (mensaje, formato) de Telegram para un proceso fallido, igual que notificar_error.
+        Lo comparten el motor sync y el async para enviar exactamente el mismo mensaje.
+        """
+        return f"❌ {self.mensaje_error_proceso(user_email)}", 'HTML'
+
+    def construir_mensaje_telegram(self, json_data, cambios_detectados, total_cambios, dias_con_cambios, json_eliminado_por_mes, json_fue_eliminado) -> str:
+        """
+        Construye el reporte Markdown de Telegram según los resultados de la ejecución
+        """
+        # Datos básicos
+        usuario = json_data.get("usuario", {}).get("nombre_completo", "Desconocido")
+        mes = json_data.get("periodo", {}).get("mes", "Desconocido")
+        fecha_generacion = json_data.get("periodo", {}).get("fecha_generacion", "Desconocida")
+        
+        # CABECERA
+        mensaje = f"📊 *REPORTE DE EXTRACCIÓN*\n"
+        mensaje += f"👤 *Usuario:* {usuario}\n"
+        mensaje += f"📅 *Mes:* {mes}\n"
+        mensaje += f"🕐 *Fecha:* {fecha_generacion}\n"
+        mensaje += "─" * 30 + "\n\n"
+        
+        # SECCIÓN: Estado del JSON
+        if json_eliminado_por_mes:
+            mensaje += f"🗑️ *JSON eliminado:* Cambio de mes\n"
+            mensaje += f"📝 *Acción:* Nueva extracción\n\n"
+        elif json_fue_eliminado:
+            mensaje += f"🗑️ *JSON eliminado:* Por antigüedad (>2 días)\n"
+            mensaje += f"📝 *Acción:* Nueva extracción\n\n"
+        else:
+            mensaje += f"📁 *JSON existente:* Conservado\n\n"
+        
+        # SECCIÓN: Cambios detectados
+        if cambios_detectados:
+            mensaje += f"🔄 *CAMBIOS DETECTADOS*\n"
+            mensaje += f"📊 *Total:* {total_cambios} día(s) modificado(s)\n"
+            
+            # Detalle de días con cambios (si hay pocos, los listamos)
+            if dias_con_cambios and len(dias_con_cambios) <= 10:
+                dias_str = ", ".join([str(d) for d in sorted(dias_con_cambios)])
+                mensaje += f"📅 *Días:* {dias_str}\n"
+            elif dias_con_cambios:
+                mensaje += f"📅 *Días:* {len(dias_con_cambios)} días modificados\n"
+            
+            mensaje += "\n"
+            
+            # Obtener detalles de los cambios para los primeros 3 días
+            if dias_con_cambios and len(dias_con_cambios) > 0:
+                mensaje += f"📋 *Detalles de cambios:*\n"
                 
-                # Detalle de días con cambios (si hay pocos, los listamos)
-                if dias_con_cambios and len(dias_con_cambios) <= 10:
-                    dias_str = ", ".join([str(d) for d in sorted(dias_con_cambios)])
-                    mensaje += f"📅 *Días:* {dias_str}\n"
-                elif dias_con_cambios:
-                    mensaje += f"📅 *Días:* {len(dias_con_cambios)} días modificados\n"
+                # Limitar a 3 días para no saturar el mensaje
+                dias_a_mostrar = sorted(dias_con_cambios)[:3]
+                calendario = {d["dia"]: d for d in json_data.get("calendario", [])}
                 
-                mensaje += "\n"
+                for dia in dias_a_mostrar:
+                    if dia in calendario:
+                        dia_info = calendario[dia]
+                        cambios_dia = dia_info.get("cambios", {})
+                        campos = cambios_dia.get("campos_modificados", [])
+                        
+                        # Obtener valores anteriores si existen en el historial
+                        historial = cambios_dia.get("historial", [])
+                        valor_anterior = ""
+                        valor_nuevo = ""
+                        
+                        if historial and len(historial) > 0:
+                            detalle = historial[-1].get("detalle", {})
+                            if detalle:
+                                antes = detalle.get("antes", {})
+                                despues = detalle.get("despues", {})
+                                
+                                # Formato legible de los cambios
+                                if "turno.horario" in campos:
+                                    horario_antes = antes.get("turno", {}).get("horario", "N/A")
+                                    horario_despues = despues.get("turno", {}).get("horario", "N/A")
+                                    valor_anterior += f"Horario: {horario_antes}\n      "
+                                    valor_nuevo += f"Horario: {horario_despues}\n      "
+                                
+                                if "turno.tipo" in campos:
+                                    tipo_antes = antes.get("turno", {}).get("tipo", "N/A")
+                                    tipo_despues = despues.get("turno", {}).get("tipo", "N/A")
+                                    valor_anterior += f"Tipo: {tipo_antes}\n      "
+                                    valor_nuevo += f"Tipo: {tipo_despues}\n      "
+                                
+                                if "break.horario" in campos:
+                                    break_antes = antes.get("break", {}).get("horario", "N/A")
+                                    break_despues = despues.get("break", {}).get("horario", "N/A")
+                                    valor_anterior += f"Break: {break_antes}\n      "
+                                    valor_nuevo += f"Break: {break_despues}\n      "
+                        
+                        mensaje += f"  • *Día {dia}*\n"
+                        if valor_anterior and valor_nuevo:
+                            mensaje += f"    ⬅️ *Antes:* {valor_anterior}\n"
+                            mensaje += f"    ➡️ *Después:* {valor_nuevo}\n"
+                        else:
+                            mensaje += f"    📝 Campos: {', '.join(campos)}\n"
                 
-                # Obtener detalles de los cambios para los primeros 3 días
-                if dias_con_cambios and len(dias_con_cambios) > 0:
-                    mensaje += f"📋 *Detalles de cambios:*\n"
-                    
-                    # Limitar a 3 días para no saturar el mensaje
-                    dias_a_mostrar = sorted(dias_con_cambios)[:3]
-                    calendario = {d["dia"]: d for d in json_data.get("calendario", [])}
-                    
-                    for dia in dias_a_mostrar:
-                        if dia in calendario:
-                            dia_info = calendario[dia]
-                            cambios_dia = dia_info.get("cambios", {})
-                            campos = cambios_dia.get("campos_modificados", [])
-                            
-                            # Obtener valores anteriores si existen en el historial
-                            historial = cambios_dia.get("historial", [])
-                            valor_anterior = ""
-                            valor_nuevo = ""
-                            
-                            if historial and len(historial) > 0:
-                                detalle = historial[-1].get("detalle", {})
-                                if detalle:
-                                    antes = detalle.get("antes", {})
-                                    despues = detalle.get("despues", {})
-                                    
-                                    # Formato legible de los cambios
-                                    if "turno.horario" in campos:
-                                        horario_antes = antes.get("turno", {}).get("horario", "N/A")
-                                        horario_despues = despues.get("turno", {}).get("horario", "N/A")
-                                        valor_anterior += f"Horario: {horario_antes}\n      "
-                                        valor_nuevo += f"Horario: {horario_despues}\n      "
-                                    
-                                    if "turno.tipo" in campos:
-                                        tipo_antes = antes.get("turno", {}).get("tipo", "N/A")
-                                        tipo_despues = despues.get("turno", {}).get("tipo", "N/A")
-                                        valor_anterior += f"Tipo: {tipo_antes}\n      "
-                                        valor_nuevo += f"Tipo: {tipo_despues}\n      "
-                                    
-                                    if "break.horario" in campos:
-                                        break_antes = antes.get("break", {}).get("horario", "N/A")
-                                        break_despues = despues.get("break", {}).get("horario", "N/A")
-                                        valor_anterior += f"Break: {break_antes}\n      "
-                                        valor_nuevo += f"Break: {break_despues}\n      "
-                            
-                            mensaje += f"  • *Día {dia}*\n"
-                            if valor_anterior and valor_nuevo:
-                                mensaje += f"    ⬅️ *Antes:* {valor_anterior}\n"
-                                mensaje += f"    ➡️ *Después:* {valor_nuevo}\n"
-                            else:
-                                mensaje += f"    📝 Campos: {', '.join(campos)}\n"
-                    
-                    if len(dias_con_cambios) > 3:
-                        mensaje += f"    ... y {len(dias_con_cambios) - 3} día(s) más\n"
-            else:
-                mensaje += f"✅ *Sin cambios detectados*\n"
-                mensaje += f"📋 El calendario no ha sido modificado desde la última ejecución.\n"
-            
-            # FOOTER
-            mensaje += "\n" + "─" * 30 + "\n"
-            mensaje += f"🤖 *Bot Notificador*"
+                if len(dias_con_cambios) > 3:
+                    mensaje += f"    ... y {len(dias_con_cambios) - 3} día(s) más\n"
+        else:
+            mensaje += f"✅ *Sin cambios detectados*\n"
+            mensaje += f"📋 El calendario no ha sido modificado desde la última ejecución.\n"
+        
+        # FOOTER
+        mensaje += "\n" + "─" * 30 + "\n"
+        mensaje += f"🤖 *Bot Notificador*"
+        
+        return mensaje
+
+    def _enviar_notificacion_telegram(self, json_data, cambios_detectados, total_cambios, dias_con_cambios, json_eliminado_por_mes, json_fue_eliminado):
+        """
+        Envía notificación por Telegram según los resultados de la ejecución
+        """
+        try:
+            mensaje = self.construir_mensaje_telegram(
+                json_data, cambios_detectados, total_cambios, dias_con_cambios,
+                json_eliminado_por_mes, json_fue_eliminado
+            )
             
             # Enviar mensaje
             self.notificador.enviar_mensaje(mensaje, formato='Markdown')
@@ -504,80 +563,96 @@ class Ejecuciones:
                     f"Extracción completada - Sin cambios en {json_data.get('periodo', {}).get('mes', '')}"
                 )
 
-    # En Ejecuciones.py - método ejecuta_login_y_extraccion
-    def ejecuta_login_y_extraccion(self):
+    def ejecuta_login_y_extraccion(self, rango=None):
         """
-        Ejecuta login en EcoDigital y extracción de turnos vía API HTTP.
-        Incluye limpieza de cookies y re-intento automático ante errores de sesión.
+        Ejecuta login en EcoDigital y extracción de turnos vía API HTTP
+        (con `rango` = (desde, hasta), extracción por meses de extraer_y_guardar_rango).
+        Es el ÚNICO bucle de reintentos del flujo: hasta MAX_RETRIES intentos con backoff
+        exponencial y jitter (PoliticaReintentos). Tras el primer intento fallido siempre
+        se hace login fresco; si el circuito está abierto por bloqueos no se insiste.
         """
         print("🚀 Iniciando ejecución en EcoDigital (HTTP)...")
         
-        intentos_login = 0
-        max_intentos = self.config.max_retries  
-        login_exitoso = False
+        # La sesión se toma prestada del GestorSesiones solo durante esta ejecución
+        self.login_instance = self.config.gestor_sesiones.obtener(self.contexto.usuario)
+        try:
+            return self._intentos_login_y_extraccion(rango)
+        finally:
+            self.login_instance = None
+            if self.extractor_instance:
+                self.extractor_instance.usar_sesion(None)
+
+    def _intentos_login_y_extraccion(self, rango=None):
+        """Bucle de intentos de ejecuta_login_y_extraccion"""
+        politica = self.config.politica_reintentos
+        resultado = {"exito": False, "error": "No se pudo hacer login o extracción"}
         
-        while intentos_login < max_intentos and not login_exitoso:
+        for intento in range(politica.max_intentos):
+            if not politica.esperar(intento, self.log):
+                print(f"🚧 Circuito abierto ({politica.segundos_restantes():.0f}s restantes) - se cancelan los reintentos")
+                return {"exito": False, "error": "Circuito abierto por bloqueos de Cloudflare"}
+            
             try:
-                print(f"\n🔄 Intento {intentos_login + 1}/{max_intentos}")
-                # Crear nueva instancia de Login (sesión limpia)
-                self.login_instance = Login(self.config)  
+                print(f"\n🔄 Intento {intento + 1}/{politica.max_intentos}")
+                if intento == 0 and self.sesion_activa():
+                    # Sesión caliente del GestorSesiones (ciclo anterior): directo a la extracción
+                    print("♻️  Reutilizando sesión activa")
+                    resultado_login = True
+                else:
+                    # Crear nueva instancia de Login (sesión limpia sobre el pool compartido)
+                    self._reemplazar_login(Login(self.config, self.contexto))
+                    
+                    if intento > 0:
+                        # Reintento: descartar cookies guardadas y forzar login fresco
+                        self.config.clear_session(self.contexto.usuario)
+                    
+                    # Intentar login
+                    resultado_login = self.login_instance.login(use_cookies=intento == 0)
+                    print(resultado_login)
                 
-                if intentos_login > 0:
-                    if self.login_instance:
-                        self.config.clear_session()
+                if not resultado_login:
+                    print(f"❌ Intento {intento + 1} fallido")
+                    resultado = {"exito": False, "error": "No se pudo hacer login"}
+                    continue
                 
+                print("✅ Login exitoso")
+                if rango:
+                    resultado = self.extraer_y_guardar_rango(*rango, self.contexto.usuario)
+                else:
+                    resultado = self.extraer_y_procesar_calendario(self.contexto.usuario)
                 
-                # Intentar login
-                resultado_login = self.login_instance.login()
-                print(resultado_login)
+                # Falló la extracción (NOSESS, error de API): reintentar con login fresco
+                if resultado and resultado.get("reintentable"):
+                    print(f"⚠️  Extracción fallida ({resultado.get('error')}) - se reintentará con login fresco")
+                    self._reemplazar_login(None)
+                    continue
                 
-                if resultado_login:
-                    login_exitoso = True
-                    print("✅ Login exitoso")
-                    
-                    # 👇 EXTRAER con manejo de errores de sesión (NOSESS)
-                    resultado_extraccion = self.extraer_y_procesar_calendario(self.config.user_eco)
-                    
-                    # Si la extracción falló por error de sesión, re-intentar login
-                    if resultado_extraccion and resultado_extraccion.get("exito") == False:
-                        error_msg = resultado_extraccion.get("error", "")
-                        if "NOSESS" in error_msg or "sesión" in error_msg.lower():
-                            print("⚠️  Extracción falló por sesión inválida - re-intentando login...")
-                            login_exitoso = False  # Forzar nuevo login en siguiente iteración
-                            self.config.clear_session()
-                            intentos_login += 1
-                            continue
-                    
-                    return resultado_extraccion  
-                else:
-                    intentos_login += 1
-                    print(f"❌ Intento {intentos_login} fallido")
-                    
-                    if intentos_login < max_intentos:
-                        print("⏳ Esperando antes del siguiente intento...")
-                        sleep(uniform(5, 8))
+                if resultado.get("exito"):
+                    # El API aceptó la sesión: sirve como validación de las cookies guardadas
+                    self.login_instance.marcar_validada()
+                return resultado
                         
             except Exception as e:
-                intentos_login += 1
-                print(f"💥 Error en intento {intentos_login}: {str(e)}")
+                print(f"💥 Error en intento {intento + 1}: {str(e)}")
                 print_exc()
-                
-                if intentos_login < max_intentos:
-                    print("⏳ Reintentando después de error...")
-                    sleep(uniform(5, 8))
+                resultado = {"exito": False, "error": str(e)}
 
         print("\n💀 EJECUCIÓN FALLIDA: No se pudo completar el proceso")
-        return {"exito": False, "error": "No se pudo hacer login o extracción"}
+        # No conservar una sesión que no sirvió para completar el proceso
+        self._reemplazar_login(None)
+        return resultado
 
-    def ejecutar_flujo_completo(self):
+    def ejecutar_flujo_completo(self, rango=None):
         """
         Ejecuta un flujo completo de prueba (HTTP).
+        Args:
+            rango: (desde, hasta) para extraer un rango de fechas por meses (None = ciclo normal)
         Retorna: dict con estado de la ejecución
         """
         print("🔁 Iniciando flujo completo de prueba (HTTP)...")
         
         steps = [
-            ("1. Login y extracción vía API", self.ejecuta_login_y_extraccion)
+            ("1. Login y extracción vía API", lambda: self.ejecuta_login_y_extraccion(rango))
         ]
         
         resultados = {}
@@ -604,6 +679,8 @@ class Ejecuciones:
                     # Mostrar detalles si existen
                     if resultado.get("mes_calendario"):
                         print(f"   📅 Mes: {resultado['mes_calendario']}")
+                    if resultado.get("meses"):
+                        print(f"   📆 Meses: {', '.join(resultado['meses'])}")
                 else:
                     print(f"❌ {step_name} - FALLIDO")
                     if resultado.get("error"):
@@ -613,8 +690,6 @@ class Ejecuciones:
                 print(f"💥 {step_name} - ERROR: {str(e)}")
                 print_exc()
                 resultados[step_name] = {"exito": False, "error": str(e)}
-            
-            sleep(uniform(1, 2))
         
         # 🔥 RETORNAR DICT ESTRUCTURADO (no bool)
         resultado_final = {
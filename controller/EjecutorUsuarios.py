@@ -0,0 +1,149 @@
+# controller/EjecutorUsuarios.py
+from time import time
+from traceback import print_exc
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+from controller.Ejecucion import Ejecuciones
+from controller.PoliticaReintentos import PoliticaReintentos
+
+class EjecutorUsuarios:
+    """
+    Ejecuta el flujo completo de Ejecuciones para todos los usuarios configurados.
+    Con MAX_WORKERS > 1 procesa varios usuarios a la vez con un pool de hilos acotado;
+    el límite por host (MAX_CONEXIONES_HOST) lo aplica Config.limitador_host en cada petición.
+    Cada usuario viaja en su propio ContextoUsuario; Config se comparte sin modificarse.
+    Contextos y Ejecuciones se conservan entre llamadas a ejecutar(), de modo que en modo
+    demonio cada ciclo reutiliza calendario en memoria; las sesiones HTTP las guarda
+    Config.gestor_sesiones.
+    """
+
+    def __init__(self, config):
+        """Constructor con inyección de config"""
+        self.config = config
+        self.max_workers = min(config.max_workers, len(config.users_eco)) or 1
+        self.contextos = config.contextos()
+        self.ejecuciones = {}
+
+    def _ejecuciones_de(self, contexto) -> Ejecuciones:
+        """Ejecuciones residente del usuario (se crea en el primer ciclo)"""
+        if contexto.usuario not in self.ejecuciones:
+            self.ejecuciones[contexto.usuario] = Ejecuciones(self.config, contexto)
+        return self.ejecuciones[contexto.usuario]
+
+    def _ejecutar_usuario(self, contexto, rango=None) -> dict:
+        """
+        Ejecuta el flujo para UN usuario y devuelve su resultado normalizado.
+        Los reintentos los gestiona solo Ejecuciones.ejecuta_login_y_extraccion (PoliticaReintentos).
+        """
+        usuario = contexto.usuario
+        inicio = time()
+        contexto.reiniciar_metricas()
+        try:
+            ejecutor = self._ejecuciones_de(contexto)
+            resultado = ejecutor.ejecutar_flujo_completo(rango)
+        except Exception as e:
+            print(f"💥 Error procesando {usuario}: {e}")
+            print_exc()
+            resultado = {"exito": False, "error": str(e)}
+
+        resultado["duracion_segundos"] = round(time() - inicio, 2)
+        resultado["peticiones_api"] = contexto.peticiones_api
+        resultado["peticiones_http"] = contexto.peticiones_http
+        resultado["logins"] = contexto.logins
+        print(f"✅ {usuario}: EXITOSO" if resultado.get("exito") else f"❌ {usuario}: FALLIDO")
+        return resultado
+
+    def _ejecutar_secuencial(self, contextos, rango=None) -> dict:
+        """Modo clásico: un usuario tras otro (el ritmo lo marca Config.limitador_tokens)"""
+        resultados = {}
+        for contexto in contextos:
+            resultados[contexto.usuario] = self._ejecutar_usuario(contexto, rango)
+        return resultados
+
+    def _ejecutar_concurrente(self, contextos, rango=None) -> dict:
+        """Modo concurrente: hasta max_workers usuarios a la vez"""
+        resultados = {}
+        with ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="usuario") as pool:
+            futuros = {
+                pool.submit(self._ejecutar_usuario, contexto, rango): contexto.usuario
+                for contexto in contextos
+            }
+            for futuro in as_completed(futuros):
+                usuario = futuros[futuro]
+                try:
+                    resultados[usuario] = futuro.result()
+                except Exception as e:
+                    print(f"💥 Error procesando {usuario}: {e}")
+                    resultados[usuario] = {"exito": False, "error": str(e)}
+        return resultados
+
+    def ejecutar(self, usuarios=None, rango=None) -> dict:
+        """
+        Ejecuta el flujo para todos los usuarios (o solo los indicados).
+        Args:
+            usuarios: Usuarios a ejecutar en este ciclo (None = todos)
+            rango: (desde, hasta) como date para extraer ese rango por meses (None = ciclo normal)
+        Retorna: dict con resumen (exitosos, fallidos, duración) y resultados por usuario
+        """
+        inicio = time()
+        contextos = [c for c in self.contextos if usuarios is None or c.usuario in usuarios]
+        if self.max_workers > 1 and len(contextos) > 1:
+            print(f"⚡ Modo concurrente: {self.max_workers} worker(s), máx. {self.config.max_conexiones_host} conexión(es) por host")
+            resultados = self._ejecutar_concurrente(contextos, rango)
+        else:
+            resultados = self._ejecutar_secuencial(contextos, rango)
+
+        exitosos = [u for u, r in resultados.items() if r.get("exito")]
+        fallidos = [c.usuario for c in contextos if c.usuario not in exitosos]
+        return {
+            "total": len(contextos),
+            "exitosos": exitosos,
+            "fallidos": fallidos,
+            "duracion_segundos": round(time() - inicio, 2),
+            "peticiones_api": sum(r.get("peticiones_api", 0) for r in resultados.values()),
+            "peticiones_http": sum(r.get("peticiones_http", 0) for r in resultados.values()),
+            "logins": sum(r.get("logins", 0) for r in resultados.values()),
+            "rango": rango is not None,
+            "resultados": resultados
+        }
+
+    def mostrar_resumen(self, resumen: dict):
+        """Imprime el resumen final de la ejecución"""
+        print(f"\n{'='*60}")
+        print("📊 RESUMEN DE EJECUCIÓN")
+        print(f"{'='*60}")
+        print(f"👥 Usuarios: {resumen['total']}")
+        print(f"✅ Exitosos: {len(resumen['exitosos'])}")
+        print(f"❌ Fallidos: {len(resumen['fallidos'])}")
+        for usuario in resumen["fallidos"]:
+            error = resumen["resultados"].get(usuario, {}).get("error")
+            print(f"   • {usuario}: {error or 'sin detalle'}")
+        print(f"⏱️  Duración total: {resumen['duracion_segundos']:.1f}s")
+
+        # 📡 Peticiones a ObtenerTurnos: lo esperado es exactamente 1 por usuario y ciclo
+        # (con --desde/--hasta es una por mes del rango, no se avisa)
+        total = resumen["total"] or 1
+        print(f"📡 Peticiones API: {resumen['peticiones_api']} ({resumen['peticiones_api'] / total:.2f} por usuario)")
+        for usuario, resultado in resumen["resultados"].items():
+            peticiones = resultado.get("peticiones_api", 0)
+            if peticiones != 1 and not resumen.get("rango"):
+                print(f"   ⚠️  {usuario}: {peticiones} petición(es) API")
+
+        # 🔁 Amplificación: peticiones HTTP reales contra EcoDigital por cada ObtenerTurnos útil
+        if "peticiones_http" in resumen:
+            amplificacion = PoliticaReintentos.amplificacion(resumen["peticiones_http"], resumen["total"])
+            print(f"🔁 Amplificación: {amplificacion:.2f}x ({resumen['peticiones_http']} peticiones HTTP, {resumen['logins']} login(s))")
+            for usuario, resultado in resumen["resultados"].items():
+                if resultado.get("logins", 0) > 1:
+                    print(f"   ⚠️  {usuario}: {resultado['logins']} login(s), {resultado.get('peticiones_http', 0)} peticiones HTTP")
+
+        # 🪣 Esperas impuestas por el limitador de peticiones
+        print(f"🪣 Limitador: {self.config.limitador_tokens.resumen()}")
+
+        # 🚪 Cola de logins con credenciales
+        if self.config.puerta_login.logins:
+            print(f"🚪 Logins: {self.config.puerta_login.resumen()}")
+
+        # 🔑 Sesiones reutilizables entre ciclos
+        sesiones = self.config.gestor_sesiones.estadisticas()
+        print(f"🔑 Sesiones: {sesiones['vivas']} viva(s), {sesiones['aciertos']} reutilizada(s), {sesiones['fallos']} nueva(s), {sesiones['expulsadas']} expulsada(s)")
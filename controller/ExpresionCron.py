@@ -0,0 +1,98 @@
+# controller/ExpresionCron.py
+from datetime import datetime, timedelta
+from typing import Set
+
+class ExpresionCron:
+    """
+    Expresión cron clásica de 5 campos: minuto hora día-del-mes mes día-de-la-semana.
+    Admite *, listas (1,15), rangos (8-18), pasos (*/10, 8-18/2) y 0/7 = domingo.
+    Como en cron, si se restringen día del mes y día de la semana basta con que coincida uno.
+    """
+
+    CAMPOS = (
+        ("minuto", 0, 59),
+        ("hora", 0, 23),
+        ("dia", 1, 31),
+        ("mes", 1, 12),
+        ("dia_semana", 0, 7),
+    )
+
+    def __init__(self, expresion: str):
+        """
+        Constructor
+        Args:
+            expresion: Texto cron, p. ej. "*/15 6-22 * * *"
+        """
+        partes = expresion.split()
+        if len(partes) != len(self.CAMPOS):
+            raise ValueError(f"Expresión cron inválida (se esperan 5 campos): {expresion!r}")
+
+        self.expresion = expresion
+        valores = {
+            nombre: self._parsear_campo(parte, minimo, maximo, nombre)
+            for parte, (nombre, minimo, maximo) in zip(partes, self.CAMPOS)
+        }
+        self.minutos = valores["minuto"]
+        self.horas = valores["hora"]
+        self.dias = valores["dia"]
+        self.meses = valores["mes"]
+        # Domingo: cron usa 0 o 7, Python weekday() usa 6
+        self.dias_semana = {(d - 1) % 7 for d in valores["dia_semana"]}
+        # Como en cron, un campo que empieza por '*' (también '*/2') cuenta como libre
+        self.__dia_libre = partes[2].startswith("*")
+        self.__dia_semana_libre = partes[4].startswith("*")
+
+    @staticmethod
+    def _parsear_campo(texto: str, minimo: int, maximo: int, nombre: str) -> Set[int]:
+        """Convierte un campo cron en el conjunto de valores que admite"""
+        valores = set()
+        for elemento in texto.split(","):
+            rango, _, paso = elemento.partition("/")
+            try:
+                paso = int(paso) if paso else 1
+                if rango == "*":
+                    inicio, fin = minimo, maximo
+                elif "-" in rango:
+                    inicio, fin = (int(v) for v in rango.split("-", 1))
+                else:
+                    inicio = int(rango)
+                    fin = maximo if paso > 1 else inicio
+            except ValueError:
+                raise ValueError(f"Campo cron '{nombre}' inválido: {texto!r}")
+            if paso < 1 or inicio < minimo or fin > maximo or inicio > fin:
+                raise ValueError(f"Campo cron '{nombre}' fuera de rango ({minimo}-{maximo}): {texto!r}")
+            valores.update(range(inicio, fin + 1, paso))
+        return valores
+
+    def _coincide_dia(self, fecha: datetime) -> bool:
+        """Reglas de cron para combinar día del mes y día de la semana"""
+        if fecha.month not in self.meses:
+            return False
+        dia_ok = fecha.day in self.dias
+        semana_ok = fecha.weekday() in self.dias_semana
+        if self.__dia_libre or self.__dia_semana_libre:
+            return dia_ok and semana_ok
+        return dia_ok or semana_ok
+
+    def siguiente(self, desde: datetime) -> datetime:
+        """
+        Próximo instante (al minuto) posterior a 'desde' que cumple la expresión.
+        Salta días y horas completos que no coinciden, así el cálculo es inmediato.
+        """
+        fecha = desde.replace(second=0, microsecond=0) + timedelta(minutes=1)
+        limite = fecha + timedelta(days=366 * 5)
+        while fecha < limite:
+            if not self._coincide_dia(fecha):
+                fecha = fecha.replace(hour=0, minute=0) + timedelta(days=1)
+                continue
+            if fecha.hour not in self.horas:
+                fecha = fecha.replace(minute=0) + timedelta(hours=1)
+                continue
+            if fecha.minute not in self.minutos:
+                fecha += timedelta(minutes=1)
+                continue
+            return fecha
+        raise ValueError(f"La expresión cron {self.expresion!r} nunca se cumple")
+
+    def __repr__(self) -> str:
+        return f"ExpresionCron({self.expresion!r})"
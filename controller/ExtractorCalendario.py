@@ -1,139 +1,222 @@
+from concurrent.futures import ThreadPoolExecutor
 from glob import glob
-from json import dump, load
+from json import dump, load, loads
 from traceback import print_exc
 from os import path as os_path, makedirs, remove, listdir
-from datetime import datetime, timedelta
-from numpy import zeros, int32 as np_32, array as np_array
-from re import search
+from datetime import date, datetime, timedelta
 from calendar import monthrange
-from shutil import copy2
+from hashlib import sha256
+
+from controller.CalendarioDocumento import CalendarioDocumento
+from controller.DecodificadorEco import DecodificadorEco
+from controller.LectorTurnosJson import LectorTurnosJson
 
 class ExtractorCalendario:
     """
     Clase encargada de extraer datos del calendario de turnos de EcoDigital usando API HTTP.
     Versión HTTP - sin dependencia de Playwright
     """
+
+    # Bytes por trozo al leer ObtenerTurnos en streaming
+    TROZO_API = 64 * 1024
+    # Versión del calendario persistido. La 1.0 salía de una matriz 5x7 (perdía los días de la
+    # 6ª semana y guardaba duraciones por defecto): al comparar con ella no cuentan como cambio
+    VERSION_CALENDARIO = "1.1"
+    VERSIONES_MATRIZ = (None, "1.0")
     
-    def __init__(self, session, config, user_email=None, login_instance=None):
-        """Constructor que inicializa con sesión HTTP"""
+    def __init__(self, session, config, contexto):
+        """
+        Constructor que inicializa con sesión HTTP
+        Args:
+            session: Sesión HTTP autenticada (puede ser None para operar solo con archivos)
+            config: Instancia de Config con configuración global (solo lectura)
+            contexto: ContextoUsuario del usuario a procesar
+        """
         self.session = session
         self.nombre_usuario = None
         self.config = config  # Guardar configuración inyectada
-        self.user_email = user_email if user_email else config.user_eco
-        self._login_instance = login_instance
+        self.contexto = contexto
+        self.log = contexto.log
+        self.user_email = contexto.usuario
+        self._documento = None
+        self._documento_nombre = None
+        # SHA-256 del cuerpo crudo de la última respuesta válida de ObtenerTurnos
+        self.huella_respuesta = None
+
+    def usar_sesion(self, session):
+        """
+        Cambia la sesión HTTP (p. ej. tras un re-login) conservando el estado del extractor,
+        incluido el documento del calendario ya cargado en memoria.
+        """
+        self.session = session
+
+    def rango_fechas_api(self, fecha_inicio: str = None, fecha_fin: str = None):
+        """
+        Calcula (si no se indican) y formatea las fechas para ObtenerTurnos.
+        Por defecto: mes actual ±5 días. Retorna: (fecha_inicio_fmt, fecha_fin_fmt) sin ceros iniciales
+        """
+        if not fecha_inicio or not fecha_fin:
+            hoy = datetime.now()
+            primer_dia_mes = hoy.replace(day=1)
+            fecha_inicio = (primer_dia_mes - timedelta(days=5)).strftime("%d/%m/%Y")
+            primer_dia_siguiente = (hoy.replace(day=28) + timedelta(days=4)).replace(day=1)
+            fecha_fin = (primer_dia_siguiente + timedelta(days=5)).strftime("%d/%m/%Y")
+        
+        # Formatear fechas (sin ceros iniciales)
+        fecha_inicio_fmt = fecha_inicio.replace("/0", "/").lstrip("0")
+        fecha_fin_fmt = fecha_fin.replace("/0", "/").lstrip("0")
+        return fecha_inicio_fmt, fecha_fin_fmt
+
+    def headers_api(self) -> dict:
+        """Headers para el request a ObtenerTurnos"""
+        return {
+            'Content-Type': 'application/json;charset=UTF-8',
+            'Accept': 'application/json, text/plain, */*',
+            'Origin': self.config.eco_base_url,
+            'Referer': f'{self.config.eco_login_url}Master',
+            'Sec-Fetch-Dest': 'empty',
+            'Sec-Fetch-Mode': 'cors',
+            'Sec-Fetch-Site': 'same-origin'
+        }
+
+    def interpretar_respuesta_api(self, status_code: int, content_type: str, response_text: str):
+        """
+        Traduce la respuesta HTTP de ObtenerTurnos (común a los motores sync y async).
+        Retorna: dict con datos, None si error, o {"_error_session": "NOSESS"} si sesión expiró
+        """
+        response_text = response_text.strip()
+        
+        # Detectar NOSESS ANTES de verificar status codes
+        if response_text.upper() == "NOSESS":
+            self.log.error("Sesión expirada para API (NOSESS)", "API response")
+            return {"_error_session": "NOSESS"}
+        
+        # Verificar códigos de error HTTP
+        if status_code == 401:
+            self.log.error("No autorizado - sesión expirada", "API response")
+            return {"_error_session": "NOSESS"}
+        elif status_code == 403:
+            self.log.error("Acceso prohibido - verificar permisos", "API response")
+            return None
+        elif status_code == 404:
+            self.log.error("API no encontrada - verificar URL", "API response")
+            return None
+        elif status_code != 200:
+            self.log.error(f"Error en API: {status_code}", "API response")
+            return None
+        
+        # Verificar content-type
+        if 'application/json' not in content_type:
+            self.log.error(f"Content-Type incorrecto: {content_type}", "API response")
+            self.log.comentario("DEBUG", f"Respuesta (primeros 200 chars): {response_text[:200]}")
+            return None
+        
+        # Parsear respuesta JSON
+        try:
+            data = loads(response_text)
+            # La huella viaja con la respuesta (varios meses de extraer_rango van en paralelo)
+            if isinstance(data, dict):
+                data["_huella"] = sha256(response_text.encode('utf-8')).hexdigest()
+            self.log.comentario("SUCCESS", "Turnos extraídos exitosamente")
+            return data
+        except ValueError as e:
+            self.log.error(f"Error parseando JSON: {str(e)}", "API response")
+            self.log.comentario("DEBUG", f"Respuesta raw: {response_text[:200]}")
+            return None
+
+    def respuesta_en_streaming(self, status_code: int, content_type: str) -> bool:
+        """True si la respuesta de ObtenerTurnos se lee por trozos (200 + JSON con TURNOS_STREAM)"""
+        return self.config.turnos_stream and status_code == 200 and 'application/json' in content_type
+
+    def lector_respuesta_api(self):
+        """
+        Lector incremental del cuerpo de ObtenerTurnos (común a los motores sync y async).
+        Cada turno se decodifica con anotar_turno en cuanto llega.
+        Retorna: (LectorTurnosJson, turnos_por_dia que va rellenando)
+        """
+        turnos_por_dia = {}
+
+        def al_turno(turno):
+            if lector.turnos == 1:
+                self.identificar_usuario({'turnos': [turno]})
+            self.anotar_turno(turnos_por_dia, turno)
 
-    def extraer_turnos_api(self, fecha_inicio: str = None, fecha_fin: str = None, reintentar: bool = True):
+        lector = LectorTurnosJson(al_turno)
+        return lector, turnos_por_dia
+
+    def resultado_lectura_api(self, lector: LectorTurnosJson, turnos_por_dia: dict):
+        """
+        Cierra la lectura en streaming; equivale a interpretar_respuesta_api para el cuerpo leído.
+        Retorna: {"_turnos_por_dia": ..., "_huella": ...} para procesar_respuesta_api, None si error,
+        o {"_error_session": "NOSESS"} si sesión expiró
         """
-        Extrae los turnos directamente del API JSON
+        lector.finalizar()
+        if lector.error is not None:
+            if lector.inicio.strip().upper() == b"NOSESS":
+                self.log.error("Sesión expirada para API (NOSESS)", "API response")
+                return {"_error_session": "NOSESS"}
+            self.log.error(f"Error parseando JSON: {str(lector.error)}", "API response")
+            self.log.comentario("DEBUG", f"Respuesta raw: {lector.inicio.decode('utf-8', errors='replace')}")
+            return None
+        if not lector.tiene_clave:
+            self.log.error("Datos del API inválidos (no contiene 'turnos')", "Sin data turnos")
+            return None
+        self.log.comentario("SUCCESS", f"Turnos extraídos exitosamente ({lector.turnos} turnos, {lector.bytes_leidos / 1024:.0f} KB leídos por trozos)")
+        return {"_turnos_por_dia": turnos_por_dia, "_huella": lector.huella}
+
+    def extraer_turnos_api(self, fecha_inicio: str = None, fecha_fin: str = None):
+        """
+        Extrae los turnos directamente del API JSON.
+        No reintenta ni re-loguea por su cuenta: un NOSESS se devuelve tal cual y el
+        reintento (con login fresco y backoff) lo decide PoliticaReintentos en Ejecuciones.
         Retorna: dict con datos, None si error, o {"_error_session": "NOSESS"} si sesión expiró
         """
         try:
-            # Calcular fechas si no se proporcionan
-            if not fecha_inicio or not fecha_fin:
-                hoy = datetime.now()
-                primer_dia_mes = hoy.replace(day=1)
-                fecha_inicio = (primer_dia_mes - timedelta(days=5)).strftime("%d/%m/%Y")
-                primer_dia_siguiente = (hoy.replace(day=28) + timedelta(days=4)).replace(day=1)
-                fecha_fin = (primer_dia_siguiente + timedelta(days=5)).strftime("%d/%m/%Y")
-            
-            # Formatear fechas (sin ceros iniciales)
-            fecha_inicio_fmt = fecha_inicio.replace("/0", "/").lstrip("0")
-            fecha_fin_fmt = fecha_fin.replace("/0", "/").lstrip("0")
-            
-            self.config.log.comentario("INFO", f"📡 Consultando API de turnos: {fecha_inicio_fmt} a {fecha_fin_fmt}")
-            
-            # Headers para el request
-            headers = {
-                'Content-Type': 'application/json;charset=UTF-8',
-                'Accept': 'application/json, text/plain, */*',
-                'Origin': self.config.eco_base_url,
-                'Referer': f'{self.config.eco_login_url}Master',
-                'Sec-Fetch-Dest': 'empty',
-                'Sec-Fetch-Mode': 'cors',
-                'Sec-Fetch-Site': 'same-origin'
-            }
+            fecha_inicio_fmt, fecha_fin_fmt = self.rango_fechas_api(fecha_inicio, fecha_fin)
+            
+            self.log.comentario("INFO", f"📡 Consultando API de turnos: {fecha_inicio_fmt} a {fecha_fin_fmt}")
             
             payload = {"fechaInicio": fecha_inicio_fmt, "fechaFin": fecha_fin_fmt}
             
             if not self.session:
-                self.config.log.error("Sesión no inicializada", "API request")
+                self.log.error("Sesión no inicializada", "API request")
                 return None
             
-            # Hacer request al API
-            response = self.session.post(
-                self.config.eco_api_turnos,
-                json=payload,
-                headers=headers,
-                timeout=self.config.timeout
-            )
-            
-            self.config.log.comentario("INFO", f"Status API: {response.status_code}")
-            
-            # 🔥 NUEVO: Detectar NOSESS ANTES de verificar status codes
-            response_text = response.text.strip()
-            if response_text.upper() == "NOSESS":
-                self.config.log.comentario("WARNING", "⚠️ API retornó NOSESS - sesión inválida")
+            politica = self.config.politica_reintentos
+            if not politica.permitir():
+                self.log.error(f"Circuito abierto por bloqueos de Cloudflare ({politica.segundos_restantes():.0f}s restantes)", "API request")
+                return None
             
-                # Si es el primer intento y tenemos referencia a Login
-                if reintentar and self._login_instance:
-                    self.config.log.comentario("INFO", "🔄 Intentando re-login para renovar sesión...")
+            # Hacer request al API
+            self.contexto.contar("peticiones_api")
+            self.config.limitador_tokens.adquirir("api")
+            with self.config.limitador_host.ocupar(self.config.eco_api_turnos):
+                response = self.session.post(
+                    self.config.eco_api_turnos,
+                    json=payload,
+                    headers=self.headers_api(),
+                    timeout=self.config.timeout,
+                    stream=self.config.turnos_stream
+                )
+                try:
+                    politica.registrar_respuesta(self.contexto, response.status_code, response.headers)
                     
-                    # 1. Limpiar sesión inválida
-                    self._login_instance.clear_session()
+                    self.log.comentario("INFO", f"Status API: {response.status_code}")
                     
-                    # 2. Ejecutar nuevo login
-                    if self._login_instance.login(use_cookies=False):
-                        self.config.log.comentario("SUCCESS", "✅ Re-login exitoso, reintentando API...")
-                        # 3. Reintentar la llamada API (sin recursión infinita)
-                        return self.extraer_turnos_api(fecha_inicio, fecha_fin, reintentar=False)
-                    else:
-                        self.config.log.error("❌ Re-login fallido", "API auth")
-                        return None
-                else:
-                    self.config.log.error("❌ Sesión inválida y no hay re-login disponible", "API auth")
-                    return None
-            
-            # Verificar códigos de error HTTP
-            if response.status_code == 401:
-                self.config.log.error("No autorizado - sesión expirada", "API response")
-                return {"_error_session": "NOSESS"}
-            elif response.status_code == 403:
-                self.config.log.error("Acceso prohibido - verificar permisos", "API response")
-                return None
-            elif response.status_code == 404:
-                self.config.log.error("API no encontrada - verificar URL", "API response")
-                return None
-            elif response.status_code != 200:
-                self.config.log.error(f"Error en API: {response.status_code}", "API response")
-                return None
-            
-            # Verificar content-type
-            content_type = response.headers.get('Content-Type', '')
-            if 'application/json' not in content_type:
-                # 🔥 NUEVO: Re-verificar NOSESS si el content-type no es JSON
-                if response_text.upper() == "NOSESS":
-                    self.config.log.error("Sesión expirada para API (NOSESS)", "API response")
-                    return {"_error_session": "NOSESS"}
-                self.config.log.error(f"Content-Type incorrecto: {content_type}", "API response")
-                self.config.log.comentario("DEBUG", f"Respuesta (primeros 200 chars): {response_text[:200]}")
-                return None
-            
-            # Parsear respuesta JSON
-            try:
-                data = response.json()
-                self.config.log.comentario("SUCCESS", "Turnos extraídos exitosamente")
-                return data
-            except ValueError as e:
-                # 🔥 NUEVO: Re-verificar NOSESS antes de reportar error de JSON
-                if response_text.upper() == "NOSESS":
-                    self.config.log.error("Sesión expirada para API (NOSESS)", "API response")
-                    return {"_error_session": "NOSESS"}
-                self.config.log.error(f"Error parseando JSON: {str(e)}", "API response")
-                self.config.log.comentario("DEBUG", f"Respuesta raw: {response_text[:200]}")
-                return None
+                    content_type = response.headers.get('Content-Type', '')
+                    if not self.respuesta_en_streaming(response.status_code, content_type):
+                        return self.interpretar_respuesta_api(response.status_code, content_type, response.text)
+                    
+                    # ⚡ Cada turno se procesa según llega, sin tener el cuerpo entero en memoria
+                    lector, turnos_por_dia = self.lector_respuesta_api()
+                    for trozo in response.iter_content(self.TROZO_API):
+                        lector.alimentar(trozo)
+                    return self.resultado_lectura_api(lector, turnos_por_dia)
+                finally:
+                    response.close()
                 
         except Exception as e:
-            self.config.log.error(f"Error extrayendo turnos del API: {str(e)}", "Extractor turnos")
+            self.log.error(f"Error extrayendo turnos del API: {str(e)}", "Extractor turnos")
             print_exc()
             return None
 
@@ -145,12 +228,12 @@ class ExtractorCalendario:
         try:
             # 🔥 NUEVO: Detectar señal de sesión expirada ANTES de cualquier validación
             if isinstance(data_api, dict) and data_api.get("_error_session") == "NOSESS":
-                self.config.log.error("Sesión expirada para API (NOSESS) - requiere re-login", "procesar_datos")
+                self.log.error("Sesión expirada para API (NOSESS) - requiere re-login", "procesar_datos")
                 return {"_error_session": "NOSESS"}
             
             # Validación robusta de datos
             if data_api is None:
-                self.config.log.error("Datos del API son None", "Sin data turnos")
+                self.log.error("Datos del API son None", "Sin data turnos")
                 return None
             
             # Si es string, probablemente es un error HTML o NOSESS
@@ -158,217 +241,130 @@ class ExtractorCalendario:
                 preview = data_api[:200] + "..." if len(data_api) > 200 else data_api
                 # 🔥 Verificar si es NOSESS
                 if data_api.strip().upper() == "NOSESS":
-                    self.config.log.error("Sesión expirada para API (NOSESS)", "Error formato")
+                    self.log.error("Sesión expirada para API (NOSESS)", "Error formato")
                     return {"_error_session": "NOSESS"}
-                self.config.log.error("El API devolvió texto en lugar de JSON", "Error formato")
-                self.config.log.comentario("DEBUG", f"Respuesta: {preview}")
+                self.log.error("El API devolvió texto en lugar de JSON", "Error formato")
+                self.log.comentario("DEBUG", f"Respuesta: {preview}")
                 return None
             
             # Verificar que sea diccionario
             if not isinstance(data_api, dict):
-                self.config.log.error(f"Tipo de dato inesperado: {type(data_api)}", "Sin data turnos")
+                self.log.error(f"Tipo de dato inesperado: {type(data_api)}", "Sin data turnos")
                 return None
             
             # Verificar que contenga 'turnos'
-            if 'turnos' not in data_api:
-                self.config.log.error("Datos del API inválidos (no contiene 'turnos')", "Sin data turnos")
+            if 'turnos' not in data_api and '_turnos_por_dia' not in data_api:
+                self.log.error("Datos del API inválidos (no contiene 'turnos')", "Sin data turnos")
                 if data_api:
-                    self.config.log.comentario("INFO", f"Estructura recibida: {list(data_api.keys())}")
+                    self.log.comentario("INFO", f"Estructura recibida: {list(data_api.keys())}")
                 return None
             
+            # ⚡ Respuesta leída en streaming: los turnos ya se procesaron según llegaban
+            if '_turnos_por_dia' in data_api:
+                turnos_por_dia = data_api['_turnos_por_dia']
+                self.log.comentario(f"Procesados {len(turnos_por_dia)} días con turnos (streaming)", "Data turnos")
+                return turnos_por_dia
+            
             # El API devuelve directamente el objeto JSON con 'turnos' y 'eventos'
             turnos_data = data_api
             
             # Extraer información del usuario del primer turno
-            if 'turnos' in turnos_data and len(turnos_data['turnos']) > 0:
-                primer_turno = turnos_data['turnos'][0]
-                if 'Asesor' in primer_turno and 'NombreCompleto' in primer_turno['Asesor']:
-                    nombre_usuario = primer_turno['Asesor']['NombreCompleto']
-                    if nombre_usuario:
-                        self.nombre_usuario = nombre_usuario
-                        self.config.log.comentario(f"👤 Usuario identificado: {nombre_usuario}", "Usuario identificado")
-            
-            # Procesar turnos por día
+            self.identificar_usuario(turnos_data)
+            
+            # Procesar turnos por día (fechas y breaks decodificados en bloque)
+            columnas, errores = DecodificadorEco.decodificar_turnos(turnos_data.get('turnos', []))
+            for fecha_str, error in errores:
+                self.log.comentario("WARNING", f"⚠️ Error procesando turno {fecha_str}: {error}")
+
+            # Clave (año, mes, día): el rango por defecto (mes actual ±5 días) trae días con
+            # el mismo número de los meses vecinos
             turnos_por_dia = {}
-            for turno in turnos_data.get('turnos', []):
-                fecha_hora_entrada = turno.get('FechaHoraEntradaString', '')
-                if not fecha_hora_entrada or ' ' not in fecha_hora_entrada:
-                    continue
-                fecha_str = fecha_hora_entrada.split(' ')[0]
-                
-                try:
-                    fecha = datetime.strptime(fecha_str, "%Y-%m-%d")
-                    dia_num = fecha.day
-                    mes_num = fecha.month
-                    año_num = fecha.year
-                    
-                    dias_semana = ["Lunes", "Martes", "Miércoles", "Jueves", "Viernes", "Sábado", "Domingo"]
-                    dia_semana = dias_semana[fecha.weekday()]
-                    
-                    # Determinar si es día libre
-                    es_dia_libre = False
-                    novedad = turno.get('Novedad')
-                    if novedad and isinstance(novedad, dict) and novedad.get('Codigo') == 'LIBRE':
-                        es_dia_libre = True
-                    
-                    # Extraer horario
-                    horario_entrada = fecha_hora_entrada.split(' ')[1] if ' ' in fecha_hora_entrada else ''
-                    fecha_hora_salida = turno.get('FechaHoraSalidaString', '')
-                    horario_salida = fecha_hora_salida.split(' ')[1] if ' ' in fecha_hora_salida else ''
-                    horario = f"{horario_entrada} - {horario_salida}" if horario_entrada and horario_salida else ''
-                    
-                    tipo = 'Día Libre' if es_dia_libre else 'Dimensionado'
-                    
-                    # EXTRAER BREAKS
-                    break_info = None
-                    hora_descanso_entrada_str = turno.get('HoraDescanso1Entrada')
-                    hora_descanso_salida_str = turno.get('HoraDescanso1Salida')
-                    
-                    if hora_descanso_entrada_str and hora_descanso_salida_str:
-                        match_entrada = search(r'/Date\((\d+)\)/', str(hora_descanso_entrada_str))
-                        match_salida = search(r'/Date\((\d+)\)/', str(hora_descanso_salida_str))
-                        
-                        if match_entrada and match_salida:
-                            try:
-                                entrada_ms = int(match_entrada.group(1))
-                                salida_ms = int(match_salida.group(1))
-                                entrada_break = datetime.fromtimestamp(entrada_ms / 1000)
-                                salida_break = datetime.fromtimestamp(salida_ms / 1000)
-                                horario_break = f"{entrada_break.strftime('%H:%M')} - {salida_break.strftime('%H:%M')}"
-                                duracion_minutos = int((salida_break - entrada_break).total_seconds() / 60)
-                                break_info = {'horario': horario_break, 'duracion_minutos': duracion_minutos}
-                            except (ValueError, TypeError) as e:
-                                self.config.log.comentario("WARNING", f"⚠️ Error convirtiendo timestamps de break: {e}")
-                    
-                    turnos_por_dia[dia_num] = {
-                        'fecha': fecha_str,
-                        'dia': dia_num,
-                        'mes': mes_num,
-                        'año': año_num,
-                        'dia_semana': dia_semana,
-                        'turno': {
-                            'horario': horario,
-                            'tipo': tipo,
-                            'duracion_horas': self._calcular_duracion_horas(horario)
-                        },
-                        'break': break_info,
-                        'es_dia_libre': es_dia_libre
-                    }
-                except Exception as e:
-                    self.config.log.comentario("WARNING", f"⚠️ Error procesando turno {fecha_str}: {e}")
-                    print_exc()
-                    continue
+            for valores in zip(*(columnas[nombre] for nombre in DecodificadorEco.COLUMNAS)):
+                registro = self._registro_dia(*valores)
+                turnos_por_dia[registro['año'], registro['mes'], registro['dia']] = registro
             
-            self.config.log.comentario(f"Procesados {len(turnos_por_dia)} días con turnos", "Data turnos")
+            self.log.comentario(f"Procesados {len(turnos_por_dia)} días con turnos", "Data turnos")
             return turnos_por_dia
             
         except Exception as e:
-            self.config.log.error(f"Error procesando datos del API: {str(e)}", "Procesador de datos extraidos")
+            self.log.error(f"Error procesando datos del API: {str(e)}", "Procesador de datos extraidos")
             print_exc()
             return None
 
+    def _registro_dia(self, fecha_str, dia_num, mes_num, año_num, dia_semana, horario, es_dia_libre, break_info, duracion_horas) -> dict:
+        """Entrada de turnos_por_dia a partir de los campos de DecodificadorEco (orden de COLUMNAS)"""
+        return {
+            'fecha': fecha_str,
+            'dia': dia_num,
+            'mes': mes_num,
+            'año': año_num,
+            'dia_semana': dia_semana,
+            'turno': {
+                'horario': horario,
+                'tipo': 'Día Libre' if es_dia_libre else 'Dimensionado',
+                'duracion_horas': duracion_horas
+            },
+            'break': break_info,
+            'es_dia_libre': es_dia_libre
+        }
+
+    def anotar_turno(self, turnos_por_dia: dict, turno: dict):
+        """Decodifica UN turno del API y lo guarda en turnos_por_dia (lectura en streaming)"""
+        try:
+            decodificado = DecodificadorEco.decodificar_turno(turno)
+        except (ValueError, TypeError, AttributeError) as e:
+            fecha_str = turno.get('FechaHoraEntradaString', '') if isinstance(turno, dict) else ''
+            self.log.comentario("WARNING", f"⚠️ Error procesando turno {fecha_str}: {e}")
+            return
+        if decodificado is not None:
+            clave = (decodificado['año'], decodificado['mes'], decodificado['dia'])
+            turnos_por_dia[clave] = self._registro_dia(*(decodificado[n] for n in DecodificadorEco.COLUMNAS))
+
     def _calcular_duracion_horas(self, horario: str) -> float:
         """Calcula la duración en horas a partir del string de horario"""
-        try:
-            if not horario:
-                return 0
-            
-            # Ejemplo: "08:00 - 14:00"
-            partes = horario.split(' - ')
-            if len(partes) != 2:
-                return 6  # Valor por defecto
-            
-            inicio = datetime.strptime(partes[0].strip(), "%H:%M")
-            fin = datetime.strptime(partes[1].strip(), "%H:%M")
-            
-            duracion = (fin - inicio).total_seconds() / 3600
-            return round(duracion, 1)
-            
-        except Exception:
-            return 6  # Valor por defecto
+        if not horario:
+            return 0
+        # Ejemplo: "08:00 - 14:00"
+        partes = horario.split(' - ')
+        if len(partes) != 2:
+            return None
+        return DecodificadorEco.duracion_horas(partes[0].strip(), partes[1].strip())
 
-    def generar_estructura_compatible(self, turnos_por_dia):
+    def generar_estructura_compatible(self, turnos_por_dia, año: int = None, mes: int = None):
         """
-        Genera estructuras de datos compatibles con el código anterior (matrices 5x7)
+        Estructura intermedia del mes indicado (por defecto el actual): un registro por CADA
+        día del mes con su turno de turnos_por_dia, indexado por (año, mes, día) (o None si
+        el API no trajo ese día). Los días de los meses vecinos se ignoran.
+        generar_json_calendario la convierte directamente en el calendario persistido.
         """
         try:            
-            # Obtener mes y año actual
+            # Mes y año del calendario (por defecto el actual)
             hoy = datetime.now()
-            mes_actual = hoy.month
-            año_actual = hoy.year
-            
-            # Crear matrices vacías
-            numeros_matriz = zeros((5, 7), dtype=np_32)
-            eventos_principales = np_array([
-                ["", "", "", "", "", "", ""],
-                ["", "", "", "", "", "", ""],
-                ["", "", "", "", "", "", ""],
-                ["", "", "", "", "", "", ""],
-                ["", "", "", "", "", "", ""]
-            ], dtype=object)
-            
-            eventos_secundarios = np_array([
-                ["", "", "", "", "", "", ""],
-                ["", "", "", "", "", "", ""],
-                ["", "", "", "", "", "", ""],
-                ["", "", "", "", "", "", ""],
-                ["", "", "", "", "", "", ""]
-            ], dtype=object)
-            
-            # Mapear días al calendario
-            # Primero, obtener el primer día del mes y cuántos días tiene
-            primer_dia_mes, dias_en_mes = monthrange(año_actual, mes_actual)
+            mes_actual = mes or hoy.month
+            año_actual = año or hoy.year
             
-            # Ajustar: lunes = 0 en calendar, pero necesitamos lunes = 0 para nuestra matriz
-            # calendar.monthrange devuelve lunes = 0, domingo = 6 (correcto)
-            
-            # Calcular en qué fila y columna va cada día
-            for dia_num in range(1, dias_en_mes + 1):
-                # Calcular día de la semana (0=lunes, 6=domingo)
-                fecha_dia = datetime(año_actual, mes_actual, dia_num)
-                dia_semana = fecha_dia.weekday()  # 0=lunes, 6=domingo
-                
-                # Calcular fila: (dia_num + offset_del_primer_dia - 1) // 7
-                fila = (dia_num + primer_dia_mes - 1) // 7
-                columna = dia_semana
-                
-                # Verificar que la fila esté en rango (0-4)
-                if fila < 5:
-                    # Guardar número del día
-                    numeros_matriz[fila, columna] = dia_num
-                    
-                    # Si hay turno para este día, guardarlo
-                    if dia_num in turnos_por_dia:
-                        turno_info = turnos_por_dia[dia_num]
-                        
-                        if turno_info['es_dia_libre']:
-                            eventos_principales[fila, columna] = "Día Libre"
-                        elif turno_info['turno']['horario']:
-                            # Formato: "08:00 - 14:00 Dimensionado"
-                            horario = turno_info['turno']['horario']
-                            tipo = turno_info['turno']['tipo']
-                            eventos_principales[fila, columna] = f"{horario} {tipo}"
-                        
-                        # Guardar break si existe
-                        if turno_info['break'] and turno_info['break']['horario']:
-                            eventos_secundarios[fila, columna] = f"{turno_info['break']['horario']} Break"
-            
-            # Obtener nombres de días de la semana
-            dias_semana = ["Lun.", "Mar.", "Mié.", "Jue.", "Vie.", "Sáb.", "Dom."]
+            # calendar.monthrange devuelve el día de la semana del día 1 (lunes = 0) y los días del mes
+            primer_dia_mes, dias_en_mes = monthrange(año_actual, mes_actual)
+            dias = [
+                {
+                    'dia': dia_num,
+                    'dia_semana': DecodificadorEco.DIAS_SEMANA[(primer_dia_mes + dia_num - 1) % 7],
+                    'registro': turnos_por_dia.get((año_actual, mes_actual, dia_num))
+                }
+                for dia_num in range(1, dias_en_mes + 1)
+            ]
             
             return {
                 'nombre_usuario': self.nombre_usuario,
-                'dias_semana': dias_semana,
-                'numeros_matriz': numeros_matriz,
-                'eventos_principales': eventos_principales,
-                'eventos_secundarios': eventos_secundarios,
-                'es_festivo': zeros((5, 7), dtype=bool),
+                'año': año_actual,
+                'mes': mes_actual,
+                'dias': dias,
                 'hoy_numero': hoy.day,
                 'hoy_fecha': hoy.strftime("%Y-%m-%d")
             }
             
         except Exception as e:
-            self.config.log.error(f"Error generando estructura compatible: {str(e)}", "estructra incompatible")
+            self.log.error(f"Error generando estructura compatible: {str(e)}", "estructra incompatible")
             
             print_exc()
             return None
@@ -376,23 +372,72 @@ class ExtractorCalendario:
     def extraer_todo(self):
         """Extrae todos los datos del calendario usando el API"""
         try:
-            self.config.log.comentario("INFO", "🔄 Iniciando extracción de turnos desde API...")
+            self.log.comentario("INFO", "🔄 Iniciando extracción de turnos desde API...")
             
             if not self.session:
-                self.config.log.error("Sesión no disponible - hacer login primero", "extraccion")
+                self.log.error("Sesión no disponible - hacer login primero", "extraccion")
                 return None
             
             # 1. Extraer datos del API
             data_api = self.extraer_turnos_api()
             if not data_api:
-                self.config.log.error("No se obtuvieron datos del API", "extraccion")
+                self.log.error("No se obtuvieron datos del API", "extraccion")
                 return None
             
+            # 2. Procesar y generar estructura compatible
+            return self.procesar_respuesta_api(data_api)
+            
+        except Exception as e:
+            self.log.error(f"Error en extracción completa: {str(e)}", "extraccion de datos completo calendario")
+            print_exc()
+            return None
+
+    def identificar_usuario(self, data_api):
+        """Toma el nombre del asesor del primer turno (define la ruta de su calendario.json)"""
+        turnos = data_api.get('turnos') if isinstance(data_api, dict) else None
+        if turnos:
+            primer_turno = turnos[0]
+            if 'Asesor' in primer_turno and 'NombreCompleto' in primer_turno['Asesor']:
+                nombre_usuario = primer_turno['Asesor']['NombreCompleto']
+                if nombre_usuario and nombre_usuario != self.nombre_usuario:
+                    self.nombre_usuario = nombre_usuario
+                    self.log.comentario(f"👤 Usuario identificado: {nombre_usuario}", "Usuario identificado")
+        return self.nombre_usuario
+
+    def respuesta_sin_cambios(self, data_api) -> bool:
+        """
+        True si la respuesta es idéntica (misma huella SHA-256) a la que generó el calendario
+        guardado y ese calendario es de hoy. Exigir fecha_generacion de hoy hace que el primer
+        ciclo de cada día lo reescriba, así nunca envejece hasta descartarse por antigüedad.
+        """
+        if not self.huella_respuesta or not self.identificar_usuario(data_api):
+            return False
+        calendario = self.documento_usuario().datos
+        if not calendario:
+            return False
+        return (
+            calendario.get("metadata", {}).get("huella_respuesta") == self.huella_respuesta
+            and calendario.get("periodo", {}).get("fecha_generacion") == datetime.now().strftime("%Y-%m-%d")
+        )
+
+    def procesar_respuesta_api(self, data_api):
+        """
+        Convierte la respuesta ya descargada de ObtenerTurnos en la estructura compatible.
+        Lo usan extraer_todo (sync) y el motor async, que descarga por su cuenta.
+        Retorna: dict compatible, None si error, o {"_error_session": "NOSESS"} si sesión expiró
+        """
+        try:
             # 🔥 NUEVO: Verificar si la API devolvió señal de sesión expirada
             if isinstance(data_api, dict) and data_api.get("_error_session") == "NOSESS":
                 return {"_error_session": "NOSESS"}
+            self.huella_respuesta = data_api.get("_huella") if isinstance(data_api, dict) else None
             
-            # 2. Procesar datos
+            # ⚡ Respuesta idéntica a la del calendario guardado: nada que procesar ni escribir
+            if self.respuesta_sin_cambios(data_api):
+                self.log.comentario("INFO", "Respuesta idéntica a la anterior (misma huella), sin procesar")
+                return {"_sin_cambios": True, "nombre_usuario": self.nombre_usuario}
+            
+            # 1. Procesar datos
             turnos_por_dia = self.procesar_datos_api(data_api)
             
             # 🔥 NUEVO: Verificar señal de NOSESS después de procesar también
@@ -400,20 +445,20 @@ class ExtractorCalendario:
                 return {"_error_session": "NOSESS"}
             
             if not turnos_por_dia:
-                self.config.log.error("No se pudieron procesar los datos del API", "extraccion")
+                self.log.error("No se pudieron procesar los datos del API", "extraccion")
                 return None
             
-            # 3. Generar estructura compatible
+            # 2. Generar estructura compatible
             datos_compatibles = self.generar_estructura_compatible(turnos_por_dia)
             if not datos_compatibles:
-                self.config.log.error("No se pudo generar estructura compatible", "extraccion")
+                self.log.error("No se pudo generar estructura compatible", "extraccion")
                 return None
             
-            self.config.log.comentario("SUCCESS", "Extracción completada exitosamente")
+            self.log.comentario("SUCCESS", "Extracción completada exitosamente")
             return datos_compatibles
             
         except Exception as e:
-            self.config.log.error(f"Error en extracción completa: {str(e)}", "extraccion de datos completo calendario")
+            self.log.error(f"Error procesando respuesta del API: {str(e)}", "extraccion de datos completo calendario")
             print_exc()
             return None
 
@@ -437,26 +482,23 @@ class ExtractorCalendario:
         print("\n📋 TURNOS POR DÍA:")
         print("-" * 60)
         
-        numeros = datos['numeros_matriz']
-        turnos = datos['eventos_principales']
-        breaks = datos['eventos_secundarios']
-        
-        for i in range(5):
-            for j in range(7):
-                dia_num = numeros[i, j]
-                if dia_num > 0:
-                    turno = turnos[i, j]
-                    break_info = breaks[i, j]
-                    
-                    if turno or break_info:
-                        dia_semana = datos['dias_semana'][j]
-                        es_hoy = " ⭐" if dia_num == datos['hoy_numero'] else ""
-                        
-                        print(f"\n  📅 {dia_semana} {dia_num}{es_hoy}:")
-                        if turno:
-                            print(f"     🕐 Turno: {turno}")
-                        if break_info:
-                            print(f"     ☕ Break: {break_info}")
+        for dia in datos['dias']:
+            registro = dia['registro']
+            if not registro:
+                continue
+            turno = "Día Libre" if registro['es_dia_libre'] else (
+                f"{registro['turno']['horario']} {registro['turno']['tipo']}" if registro['turno']['horario'] else ""
+            )
+            break_info = f"{registro['break']['horario']} Break" if registro['break'] and registro['break']['horario'] else ""
+            
+            if turno or break_info:
+                es_hoy = " ⭐" if dia['dia'] == datos['hoy_numero'] else ""
+                
+                print(f"\n  📅 {dia['dia_semana']} {dia['dia']}{es_hoy}:")
+                if turno:
+                    print(f"     🕐 Turno: {turno}")
+                if break_info:
+                    print(f"     ☕ Break: {break_info}")
         
         print("\n" + "="*60)
 
@@ -465,16 +507,12 @@ class ExtractorCalendario:
         Obtiene la ruta del archivo JSON único para el usuario.
         """
         try:
-            if not self.nombre_usuario:
-                # Usar email como fallback
-                nombre_usuario = self.config.user_eco.split('@')[0] if '@' in self.config.user_eco else self.config.user_eco
-            
-            # Limpiar nombre para usar como directorio
-            nombre_limpio = "".join(c for c in self.nombre_usuario if c.isalnum() or c in (' ', '_')).rstrip() if self.nombre_usuario else self.config.user_eco
+            # Limpiar nombre para usar como directorio (email como fallback)
+            nombre_limpio = "".join(c for c in self.nombre_usuario if c.isalnum() or c in (' ', '_')).rstrip() if self.nombre_usuario else self.user_email
             nombre_directorio = nombre_limpio.replace(' ', '_').upper()
             
             # Ruta: ./data/usuarios/{NOMBRE_USUARIO}/
-            ruta_base = "./data/usuarios"
+            ruta_base = os_path.join(self.config.data_path, "usuarios")
             ruta_usuario = os_path.join(ruta_base, nombre_directorio)
             
             if "_" in nombre_directorio:
@@ -526,20 +564,33 @@ class ExtractorCalendario:
         
         return None
 
+    def documento_usuario(self) -> CalendarioDocumento:
+        """
+        Devuelve el documento en memoria del calendario.json del usuario.
+        Se crea una vez por nombre de usuario, así el archivo se lee como máximo una vez.
+        """
+        if self._documento is None or self._documento_nombre != self.nombre_usuario:
+            self._documento = CalendarioDocumento(self.obtener_ruta_json_usuario())
+            self._documento_nombre = self.nombre_usuario
+        return self._documento
+
+    def historial_cambios(self) -> list:
+        """
+        Historial de cambios de todos los días del calendario en memoria.
+        Retorna: [{"dia": n, "fecha": "%Y-%m-%dT%H:%M:%SZ"}, ...]
+        """
+        datos = self.documento_usuario().datos or {}
+        return [
+            {"dia": dia.get("dia"), "fecha": entrada.get("fecha")}
+            for dia in datos.get("calendario", [])
+            for entrada in dia.get("cambios", {}).get("historial", [])
+        ]
+
     def cargar_json_existente(self):
         """
-        Carga el JSON existente del usuario (si existe).
+        Carga el JSON existente del usuario (si existe) desde el documento en memoria.
         """
-        ruta_json = self.obtener_ruta_json_usuario()
-        if not ruta_json or not os_path.exists(ruta_json):
-            return None
-        
-        try:
-            with open(ruta_json, 'r', encoding='utf-8') as f:
-                return load(f)
-        except Exception as e:
-            print(f"⚠️ Error cargando JSON existente: {e}")
-            return None
+        return self.documento_usuario().datos
 
     def comparar_y_actualizar(self, datos_extractos):
         """
@@ -552,30 +603,28 @@ class ExtractorCalendario:
             if not calendario_nuevo:
                 print("No se pudo generar JSON con datos nuevos")
                 return None
+            calendario_nuevo["metadata"]["huella_respuesta"] = self.huella_respuesta
             
-            # 2. OBTENER RUTA Y VERIFICAR EXISTENCIA FÍSICA EN DISCO (¡CRÍTICO!)
-            ruta_json = self.obtener_ruta_json_usuario()
-            json_existe_en_disco = ruta_json and os_path.exists(ruta_json)
+            # 2. OBTENER DOCUMENTO Y VERIFICAR SI HAY VERSIÓN PREVIA VIGENTE (¡CRÍTICO!)
+            documento = self.documento_usuario()
+            json_existe = documento.existe()
             
-            print(f"\n🔍 VERIFICACIÓN FÍSICA DEL JSON:")
-            print(f"   Ruta: {ruta_json}")
-            print(f"   ¿Existe en disco? {'SÍ' if json_existe_en_disco else 'NO'}")
+            print(f"\n🔍 VERIFICACIÓN DEL JSON:")
+            print(f"   Ruta: {documento.ruta}")
+            print(f"   ¿Existe versión previa? {'SÍ' if json_existe else 'NO'}")
             
             # 3. EXTRAER MES DEL NUEVO CALENDARIO
             mes_nuevo = calendario_nuevo.get("periodo", {}).get("mes", "")
-            año_nuevo = datetime.now().year
             
-            # 4. SI NO EXISTE EN DISCO → PRIMERA EXTRACCIÓN (SIN COMPARACIÓN)
-            if not json_existe_en_disco:
+            # 4. SI NO HAY VERSIÓN PREVIA → PRIMERA EXTRACCIÓN (SIN COMPARACIÓN)
+            if not json_existe:
+                if documento.existe_en_disco() and not documento.descartado:
+                    print(f"⚠️  JSON existe en disco pero no se pudo cargar - tratando como primera extracción")
                 print(f"📝 PRIMERA EXTRACCIÓN del mes ({mes_nuevo}) - guardando SIN historial de cambios")
                 return self._guardar_calendario_limpio(calendario_nuevo, es_primera_extraccion=True)
             
-            # 5. SI EXISTE EN DISCO → CARGAR Y VERIFICAR MES
-            calendario_existente = self.cargar_json_existente()
-            
-            if not calendario_existente:
-                print(f"⚠️  JSON existe en disco pero no se pudo cargar - tratando como primera extracción")
-                return self._guardar_calendario_limpio(calendario_nuevo, es_primera_extraccion=True)
+            # 5. SI EXISTE → USAR LA VERSIÓN YA CARGADA EN MEMORIA
+            calendario_existente = documento.datos
             
             # 6. EXTRAER MES DEL JSON EXISTENTE
             mes_existente = calendario_existente.get("periodo", {}).get("mes", "")
@@ -627,24 +676,12 @@ class ExtractorCalendario:
                 "se_detectaron_cambios": False
             }
             
-            # Guardar SIN crear backup (es primera extracción)
-            ruta_json = self.obtener_ruta_json_usuario()
-            if not ruta_json:
-                print("No se pudo obtener ruta para guardar JSON")
+            # Guardar SIN crear backup (es primera extracción): reemplaza el JSON anterior
+            documento = self.documento_usuario()
+            ruta_json = documento.ruta
+            if not documento.guardar(calendario, backup=False):
                 return False
             
-            # Eliminar backup previo si existe (evitar acumulación)
-            if os_path.exists(ruta_json):
-                try:
-                    remove(ruta_json)
-                    print(f"🗑️  JSON anterior eliminado antes de guardar nuevo")
-                except Exception as e:
-                    print(f"⚠️  No se pudo eliminar JSON anterior: {e}")
-            
-            # Guardar nuevo JSON
-            with open(ruta_json, 'w', encoding='utf-8') as f:
-                dump(calendario, f, ensure_ascii=False, indent=2)
-            
             if es_primera_extraccion:
                 print(f"Calendario GUARDADO (primera extracción del mes): {ruta_json}")
             else:
@@ -667,6 +704,8 @@ class ExtractorCalendario:
             # Crear diccionarios por día para fácil acceso
             dias_antiguos = {d["dia"]: d for d in calendario_antiguo["calendario"]}
             dias_nuevos = {d["dia"]: d for d in calendario_actualizado["calendario"]}
+            version_antigua = (calendario_antiguo.get("metadata") or {}).get("version")
+            antiguo_de_matriz = version_antigua in self.VERSIONES_MATRIZ
             
             cambios_detectados = False
             total_cambios = 0
@@ -680,9 +719,10 @@ class ExtractorCalendario:
                 cambio_detectado = False
                 
                 if not dia_antiguo:
-                    # Día nuevo (no existía antes)
-                    cambios_dia = ["nuevo_dia"]
-                    cambio_detectado = True
+                    # Día nuevo (no existía antes); en calendarios 1.0 es un día que no cabía en la matriz
+                    if not antiguo_de_matriz:
+                        cambios_dia = ["nuevo_dia"]
+                        cambio_detectado = True
                 else:
                     # Comparar campos específicos
                     # a) Turno
@@ -709,7 +749,8 @@ class ExtractorCalendario:
                     if existe_break_antiguo and existe_break_nuevo:
                         if break_antiguo.get("horario") != break_nuevo.get("horario"):
                             cambios_dia.append("break.horario")
-                        if break_antiguo.get("duracion_minutos") != break_nuevo.get("duracion_minutos"):
+                        # La 1.0 guardaba siempre 20 minutos: su duración no es comparable
+                        if not antiguo_de_matriz and break_antiguo.get("duracion_minutos") != break_nuevo.get("duracion_minutos"):
                             cambios_dia.append("break.duracion")
                     
                     # c) Día libre
@@ -824,22 +865,12 @@ class ExtractorCalendario:
         es_primera_extraccion: True si es la primera extracción del mes (evita mensajes de "cambios")
         """
         try:
-            ruta_json = self.obtener_ruta_json_usuario()
-            if not ruta_json:
-                print("No se pudo obtener ruta para guardar JSON")
-                return False
+            documento = self.documento_usuario()
+            ruta_json = documento.ruta
             
             # Crear backup SOLO si NO es primera extracción
-            if os_path.exists(ruta_json) and not es_primera_extraccion:
-                timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-                ruta_backup = ruta_json.replace(".json", f"_backup_{timestamp}.json")
-                
-                copy2(ruta_json, ruta_backup)
-                print(f"💾 Backup creado: {os_path.basename(ruta_backup)}")
-            
-            # Guardar nuevo JSON
-            with open(ruta_json, 'w', encoding='utf-8') as f:
-                dump(calendario, f, ensure_ascii=False, indent=2)
+            if not documento.guardar(calendario, backup=not es_primera_extraccion):
+                return False
             
             # Mensaje apropiado según contexto
             if es_primera_extraccion:
@@ -892,92 +923,69 @@ class ExtractorCalendario:
             nombre_usuario = datos_extractos.get('nombre_usuario', 'Usuario Desconocido')
             
             usuario_info = {
-                "id": nombre_usuario.upper().replace(" ", "_") if nombre_usuario else self.config.user_eco.upper().replace("@", "_").replace(".", "_"),
-                "nombre_completo": nombre_usuario if nombre_usuario else self.config.user_eco
+                "id": nombre_usuario.upper().replace(" ", "_") if nombre_usuario else self.user_email.upper().replace("@", "_").replace(".", "_"),
+                "nombre_completo": nombre_usuario if nombre_usuario else self.user_email
             }
             
             # Información del período
             periodo_info = {
-                "mes": datetime.now().strftime("%B %Y"),
+                "mes": datetime(datos_extractos.get('año') or datetime.now().year, datos_extractos.get('mes') or datetime.now().month, 1).strftime("%B %Y"),
                 "dias_totales": 0,
                 "dias_laborables": 0,
                 "dias_libres": 0,
                 "fecha_generacion": datetime.now().strftime("%Y-%m-%d")
             }
             
-            # Calendario detallado
+            # Calendario detallado: un día por cada día del mes, directamente desde turnos_por_dia
             calendario_detallado = []
-            numeros = datos_extractos['numeros_matriz']
             
-            # Mapeo simple de días abreviados a completos
-            dias_semana_completos = {
-                "Lun.": "Lunes", "Mar.": "Martes", "Mié.": "Miércoles",
-                "Jue.": "Jueves", "Vie.": "Viernes", "Sáb.": "Sábado",
-                "Dom.": "Domingo"
-            }
-            
-            for i in range(5):
-                for j in range(7):
-                    dia_num = numeros[i, j]
-                    if dia_num > 0:
-                        # Actualizar contadores
-                        periodo_info["dias_totales"] += 1
-                        
-                        turno_raw = datos_extractos['eventos_principales'][i, j]
-                        break_raw = datos_extractos['eventos_secundarios'][i, j]
-                        
-                        # Obtener día de la semana
-                        dia_semana_key = datos_extractos['dias_semana'][j] if j < len(datos_extractos['dias_semana']) else f"Día {j+1}"
-                        dia_semana = dias_semana_completos.get(dia_semana_key, dia_semana_key)
-                        
-                        # Determinar si es día libre
-                        es_dia_libre = turno_raw == "Día Libre" if turno_raw else False
-                        
-                        if es_dia_libre:
-                            periodo_info["dias_libres"] += 1
-                            turno_info = {
-                                "horario": None,
-                                "tipo": "Día Libre",
-                                "duracion_horas": 0
-                            }
-                        else:
-                            periodo_info["dias_laborables"] += 1
-                            # Extraer información básica del turno
-                            turno_info = {
-                                "horario": turno_raw.split()[0] + ":00 - " + turno_raw.split()[2] + ":00" if turno_raw and len(turno_raw.split()) >= 3 else None,
-                                "tipo": " ".join(turno_raw.split()[3:]) if turno_raw and len(turno_raw.split()) > 3 else "Dimensionado",
-                                "duracion_horas": 6  # Valor por defecto
-                            }
-                        
-                        # Información del break
-                        break_info = {
-                            "horario": break_raw.split("Break")[0].strip() if break_raw else None,
-                            "duracion_minutos": 20  # Valor por defecto
-                        }
-                        
-                        dia_info = {
-                            "dia": int(dia_num),
-                            "dia_semana": dia_semana,
-                            "turno": turno_info,
-                            "break": break_info,
-                            "es_dia_libre": es_dia_libre,
-                            "cambios": {
-                                "ha_cambiado": False,
-                                "detalle_cambios": None,
-                                "campos_modificados": [],
-                                "ultima_modificacion": None,
-                                "historial": []
-                            }
-                        }
-                        
-                        calendario_detallado.append(dia_info)
+            for dia in datos_extractos['dias']:
+                registro = dia['registro'] or {}
+                turno = registro.get('turno') or {}
+                descanso = registro.get('break') or {}
+                es_dia_libre = bool(registro.get('es_dia_libre'))
+                horario = turno.get('horario')
+                
+                if es_dia_libre:
+                    periodo_info["dias_libres"] += 1
+                    turno_info = {
+                        "horario": None,
+                        "tipo": "Día Libre",
+                        "duracion_horas": 0
+                    }
+                else:
+                    periodo_info["dias_laborables"] += 1
+                    turno_info = {
+                        # "08:00 - 14:00" -> "08:00:00 - 14:00:00" (formato persistido desde la versión 1.0)
+                        "horario": " - ".join(f"{hora}:00" for hora in horario.split(" - ")) if horario else None,
+                        "tipo": "Dimensionado",
+                        # None si EcoDigital mandó una hora ilegible (no se inventa la duración)
+                        "duracion_horas": turno.get('duracion_horas') if horario else 0
+                    }
+                
+                calendario_detallado.append({
+                    "dia": dia['dia'],
+                    "dia_semana": dia['dia_semana'],
+                    "turno": turno_info,
+                    "break": {
+                        "horario": descanso.get('horario'),
+                        "duracion_minutos": descanso.get('duracion_minutos') or 0
+                    },
+                    "es_dia_libre": es_dia_libre,
+                    "cambios": {
+                        "ha_cambiado": False,
+                        "detalle_cambios": None,
+                        "campos_modificados": [],
+                        "ultima_modificacion": None,
+                        "historial": []
+                    }
+                })
             
-            # Ordenar por día
-            calendario_detallado.sort(key=lambda x: x["dia"])
+            periodo_info["dias_totales"] = len(calendario_detallado)
             
             # Metadata con fecha y hora de última ejecución
             metadata = {
-                "version": "1.0",
+                "version": self.VERSION_CALENDARIO,
                 "ultima_actualizacion": datetime.now().strftime("%Y-%m-%dT%H:%M:%SZ"),
                 "tiene_cambios_versiones_anteriores": False
             }
@@ -999,35 +1007,38 @@ class ExtractorCalendario:
             print_exc()
             return None
 
-    def ejecutar_proceso_simplificado(self):
+    def ejecutar_proceso_simplificado(self, datos=None):
         """
         Ejecuta el proceso simplificado: extraer, comparar y actualizar un solo archivo.
+        Si se reciben `datos` (resultado de extraer_todo) no se vuelve a consultar el API.
         """
         try:
-            print("🔄 Extrayendo datos del calendario...")
+            # 1. Extraer datos (solo si no vienen ya extraídos)
+            if datos is None:
+                print("🔄 Extrayendo datos del calendario...")
+                datos = self.extraer_todo()
             
-            # 1. Extraer datos
-            datos = self.extraer_todo()
-            
-            if not datos:
+            if not datos or datos.get("_error_session"):
                 return None
             
+            if datos.get("_sin_cambios"):
+                print("Sin cambios en esta ejecución (respuesta idéntica)")
+                return True
+            
             # 2. Mostrar datos extraídos
             self.mostrar_datos_extraidos(datos)
             
             # 3. Verificar si el JSON existe ANTES de comparar
-            ruta_json = self.obtener_ruta_json_usuario()
-            json_existe = ruta_json and os_path.exists(ruta_json)
+            documento = self.documento_usuario()
+            json_existe = documento.existe()
             
             # 4. Comparar y actualizar archivo único
             resultado = self.comparar_y_actualizar(datos)
             
             if resultado:                
-                # Mostrar resumen de cambios si existe
-                if ruta_json and os_path.exists(ruta_json):
-                    with open(ruta_json, 'r', encoding='utf-8') as f:
-                        json_data = load(f)
-                    
+                # Mostrar resumen de cambios (desde el documento en memoria, sin releer disco)
+                json_data = documento.datos
+                if json_data:
                     # Si el JSON no existía antes, es una nueva extracción
                     if not json_existe:
                         print("📝 Nueva extracción (no existía JSON anterior)")
@@ -1045,4 +1056,89 @@ class ExtractorCalendario:
             print(f"💥 Error en ejecución: {e}")
             
             print_exc()
-            return None
\ No newline at end of file
+            return None
+    @staticmethod
+    def meses_rango(desde: date, hasta: date) -> list:
+        """
+        Meses naturales completos que cubren [desde, hasta].
+        Retorna: [(año, mes, primer_dia, ultimo_dia), ...]
+        """
+        tramos = []
+        año, mes = desde.year, desde.month
+        while (año, mes) <= (hasta.year, hasta.month):
+            tramos.append((año, mes, date(año, mes, 1), date(año, mes, monthrange(año, mes)[1])))
+            año, mes = (año + 1, 1) if mes == 12 else (año, mes + 1)
+        return tramos
+
+    def ruta_calendario_mes(self, año: int, mes: int) -> str:
+        """Ruta de calendario_AAAA_MM.json, junto al calendario.json del usuario"""
+        ruta = self.documento_usuario().ruta
+        return os_path.join(os_path.dirname(ruta), f"calendario_{año}_{mes:02d}.json") if ruta else None
+
+    def _extraer_tramo(self, inicio: date, fin: date) -> tuple:
+        """
+        Descarga y procesa un mes del rango (se ejecuta en el pool de extraer_rango).
+        Retorna: (turnos_por_dia, huella de su respuesta); turnos_por_dia es None si error
+        o {"_error_session": "NOSESS"}. No toca self.huella_respuesta (lo comparten los hilos).
+        """
+        data_api = self.extraer_turnos_api(inicio.strftime("%d/%m/%Y"), fin.strftime("%d/%m/%Y"))
+        if not data_api or data_api.get("_error_session"):
+            return data_api, None
+        return self.procesar_datos_api(data_api), data_api.get("_huella")
+
+    def guardar_calendario_mes(self, turnos_por_dia: dict, año: int, mes: int, huella: str = None) -> str:
+        """
+        Genera el calendario de un mes y lo fusiona con su calendario_AAAA_MM.json
+        (si ya existía se comparan como en el ciclo normal y se conserva el historial).
+        Retorna: ruta guardada o None si error
+        """
+        estructura = self.generar_estructura_compatible(turnos_por_dia, año, mes)
+        calendario = self.generar_json_calendario(estructura) if estructura else None
+        ruta = self.ruta_calendario_mes(año, mes)
+        if not calendario or not ruta:
+            return None
+        calendario["metadata"]["huella_respuesta"] = huella
+        documento = CalendarioDocumento(ruta)
+        if documento.existe():
+            calendario = self._detectar_cambios(documento.datos, calendario)
+        return ruta if documento.guardar(calendario) else None
+
+    def extraer_rango(self, desde: date, hasta: date) -> dict:
+        """
+        Extrae los turnos de un rango de fechas cualquiera y los guarda en un calendario por mes.
+        El rango se amplía a meses completos; tras el primero (que comprueba la sesión) el
+        resto se pide en paralelo sobre la misma sesión (como máximo MAX_CONEXIONES_HOST a la
+        vez; el ritmo lo siguen marcando limitador_tokens y limitador_host).
+        calendario.json no se modifica.
+        Retorna: {"meses": {"AAAA_MM": ruta}, "fallidos": ["AAAA_MM", ...]}
+                 con "_error_session": "NOSESS" si la sesión expiró en algún mes
+        """
+        tramos = self.meses_rango(desde, hasta)
+        print(f"📆 Extrayendo {len(tramos)} mes(es): {tramos[0][2]:%Y-%m-%d} → {tramos[-1][3]:%Y-%m-%d}")
+
+        # El primer mes va solo: si la sesión ya no vale no se lanzan N peticiones con NOSESS
+        primero = self._extraer_tramo(tramos[0][2], tramos[0][3])
+        if isinstance(primero[0], dict) and primero[0].get("_error_session"):
+            return {"meses": {}, "fallidos": [f"{a}_{m:02d}" for a, m, _, _ in tramos], "_error_session": "NOSESS"}
+
+        hilos = max(1, min(len(tramos) - 1, self.config.max_conexiones_host))
+        with ThreadPoolExecutor(max_workers=hilos, thread_name_prefix="mes") as pool:
+            respuestas = [primero] + list(pool.map(lambda tramo: self._extraer_tramo(tramo[2], tramo[3]), tramos[1:]))
+
+        resultado = {"meses": {}, "fallidos": []}
+        for (año, mes, _, _), (turnos_por_dia, huella) in zip(tramos, respuestas):
+            clave = f"{año}_{mes:02d}"
+            if turnos_por_dia is None or turnos_por_dia.get("_error_session"):
+                if turnos_por_dia:
+                    resultado["_error_session"] = "NOSESS"
+                resultado["fallidos"].append(clave)
+                continue
+            # Solo los días del propio mes (por si el API devuelve días vecinos)
+            turnos_mes = {clave: t for clave, t in turnos_por_dia.items() if clave[:2] == (año, mes)}
+            ruta = self.guardar_calendario_mes(turnos_mes, año, mes, huella)
+            if ruta:
+                resultado["meses"][clave] = ruta
+                print(f"💾 {clave}: {len(turnos_mes)} día(s) con turno → {os_path.basename(ruta)}")
+            else:
+                resultado["fallidos"].append(clave)
+        return resultado
@@ -0,0 +1,94 @@
+# controller/GestorSesiones.py
+from collections import OrderedDict
+from threading import Lock
+from time import monotonic
+
+class GestorSesiones:
+    """
+    Guarda las sesiones autenticadas (instancias de Login) por usuario para
+    reutilizarlas entre ciclos sin volver a hacer login.
+    Expulsa las sesiones inactivas por TTL y, si se supera `max_sesiones`,
+    la menos usada recientemente (LRU); al expulsar se cierra la sesión.
+    Así memoria y sockets se mantienen acotados aunque haya miles de usuarios.
+    """
+
+    def __init__(self, max_sesiones: int = 500, ttl_segundos: float = 3600):
+        """
+        Constructor
+        Args:
+            max_sesiones: Sesiones vivas como máximo
+            ttl_segundos: Inactividad tras la cual una sesión se expulsa
+        """
+        self.max_sesiones = max(1, int(max_sesiones))
+        self.ttl_segundos = max(1.0, float(ttl_segundos))
+        self.__sesiones = OrderedDict()  # usuario -> (login, último uso)
+        self.__lock = Lock()
+        self.aciertos = 0
+        self.fallos = 0
+        self.expulsadas = 0
+
+    def _expulsar(self, usuario: str):
+        """Saca la sesión del gestor y la cierra (con el lock tomado)"""
+        login, _ = self.__sesiones.pop(usuario)
+        login.close()
+        self.expulsadas += 1
+
+    def _purgar_caducadas(self, ahora: float):
+        """Expulsa las sesiones que superaron el TTL (están al principio: orden LRU)"""
+        while self.__sesiones:
+            usuario, (_, ultimo_uso) = next(iter(self.__sesiones.items()))
+            if ahora - ultimo_uso < self.ttl_segundos:
+                break
+            self._expulsar(usuario)
+
+    def obtener(self, usuario: str):
+        """
+        Sesión caliente del usuario o None si no hay (o caducó).
+        Cuenta aciertos y fallos.
+        """
+        with self.__lock:
+            ahora = monotonic()
+            self._purgar_caducadas(ahora)
+            if usuario not in self.__sesiones:
+                self.fallos += 1
+                return None
+            login, _ = self.__sesiones[usuario]
+            self.__sesiones[usuario] = (login, ahora)
+            self.__sesiones.move_to_end(usuario)
+            self.aciertos += 1
+            return login
+
+    def guardar(self, usuario: str, login):
+        """Registra (o renueva) la sesión del usuario; cierra la anterior si era otra"""
+        with self.__lock:
+            anterior = self.__sesiones.get(usuario)
+            if anterior and anterior[0] is not login:
+                anterior[0].close()
+            self.__sesiones[usuario] = (login, monotonic())
+            self.__sesiones.move_to_end(usuario)
+            while len(self.__sesiones) > self.max_sesiones:
+                self._expulsar(next(iter(self.__sesiones)))
+
+    def descartar(self, usuario: str):
+        """Cierra y elimina la sesión del usuario (p. ej. tras un fallo de sesión)"""
+        with self.__lock:
+            if usuario in self.__sesiones:
+                login, _ = self.__sesiones.pop(usuario)
+                login.close()
+
+    def cerrar_todas(self):
+        """Cierra todas las sesiones (al terminar el proceso)"""
+        with self.__lock:
+            for login, _ in self.__sesiones.values():
+                login.close()
+            self.__sesiones.clear()
+
+    def estadisticas(self) -> dict:
+        """Sesiones vivas, aciertos, fallos y expulsiones"""
+        with self.__lock:
+            return {
+                "vivas": len(self.__sesiones),
+                "aciertos": self.aciertos,
+                "fallos": self.fallos,
+                "expulsadas": self.expulsadas,
+            }
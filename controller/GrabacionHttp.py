@@ -0,0 +1,155 @@
+# controller/GrabacionHttp.py
+from glob import glob
+from http.client import HTTPMessage
+from io import BytesIO
+from json import dump, load, loads
+from os import path as os_path, makedirs
+from re import sub
+from threading import Lock
+from types import SimpleNamespace
+from urllib.parse import urlsplit
+
+from requests.adapters import BaseAdapter, HTTPAdapter
+from urllib3 import HTTPResponse
+
+# Cabeceras de respuesta que se conservan en las grabaciones (el resto se descarta)
+CABECERAS_GRABADAS = ("content-type", "server", "cf-mitigated", "location", "set-cookie")
+
+def directorio_usuario(directorio: str, usuario: str) -> str:
+    """Carpeta de grabaciones de un usuario (nombre de archivo seguro)"""
+    return os_path.join(directorio, sub(r'[^\w\-_\.]', '_', usuario or "anonimo"))
+
+def clave_peticion(metodo: str, url: str) -> str:
+    """Clave con la que se emparejan peticiones y grabaciones: método + ruta"""
+    return f"{metodo.upper()} {urlsplit(url).path}"
+
+
+class AdaptadorGrabacion(BaseAdapter):
+    """
+    Adaptador de requests que envía las peticiones por el adaptador real (pool compartido)
+    y guarda cada respuesta de EcoDigital como fixture JSON del usuario, sin credenciales:
+    no se guarda el cuerpo del POST de login, el usuario y la contraseña se sustituyen en
+    los cuerpos y los valores de las cookies se reemplazan por marcadores.
+    """
+
+    def __init__(self, base: BaseAdapter, directorio: str, usuario: str, password: str = None):
+        """
+        Constructor
+        Args:
+            base: Adaptador real (TransporteHttp.adaptador)
+            directorio: Carpeta raíz de las grabaciones (FIXTURES_DIR)
+            usuario: Usuario cuyas respuestas se graban
+            password: Contraseña a eliminar de las grabaciones
+        """
+        super().__init__()
+        self.base = base
+        self.directorio = directorio_usuario(directorio, usuario)
+        self.secretos = {s: r for s, r in ((usuario, "usuario@grabado"), (password, "********")) if s}
+        makedirs(self.directorio, exist_ok=True)
+        self.__lock = Lock()
+        self.__siguiente = len(glob(os_path.join(self.directorio, "*.json")))
+
+    def _limpiar(self, texto: str) -> str:
+        """Sustituye usuario y contraseña en un texto"""
+        for secreto, reemplazo in self.secretos.items():
+            texto = texto.replace(secreto, reemplazo)
+        return texto
+
+    def _cabeceras(self, respuesta) -> list:
+        """Cabeceras permitidas, con los valores de las cookies sustituidos"""
+        cabeceras = []
+        for nombre, valor in respuesta.raw.headers.items():
+            if nombre.lower() not in CABECERAS_GRABADAS:
+                continue
+            if nombre.lower() == "set-cookie":
+                cookie = valor.split(";", 1)[0].split("=", 1)[0].strip()
+                valor = f"{cookie}=valor-grabado; Path=/"
+            cabeceras.append([nombre, valor])
+        return cabeceras
+
+    def send(self, request, **kwargs):
+        """Envía la petición real y graba la respuesta"""
+        respuesta = self.base.send(request, **kwargs)
+        clave = clave_peticion(request.method, request.url)
+        peticion = None
+        if request.body and "json" in (request.headers.get("Content-Type") or ""):
+            cuerpo = request.body.decode("utf-8") if isinstance(request.body, bytes) else request.body
+            peticion = loads(self._limpiar(cuerpo))
+        grabacion = {
+            "clave": clave,
+            "peticion": peticion,
+            "estado": respuesta.status_code,
+            "cabeceras": self._cabeceras(respuesta),
+            "codificacion": respuesta.encoding or "utf-8",
+            "cuerpo": self._limpiar(respuesta.content.decode(respuesta.encoding or "utf-8", errors="replace")),
+        }
+        with self.__lock:
+            numero = self.__siguiente
+            self.__siguiente += 1
+        nombre = sub(r'[^\w]+', '_', clave).strip('_')
+        with open(os_path.join(self.directorio, f"{numero:04d}_{nombre}.json"), "w", encoding="utf-8") as f:
+            dump(grabacion, f, ensure_ascii=False, indent=1)
+        return respuesta
+
+    def close(self):
+        """El adaptador real lo cierra TransporteHttp"""
+
+
+class AdaptadorReproduccion(HTTPAdapter):
+    """
+    Adaptador de requests que responde sin red con las grabaciones del usuario, en el
+    mismo orden en que se grabaron para cada método + ruta. Agotadas las de una ruta,
+    repite la última (así varios ciclos del demonio siguen siendo deterministas).
+    """
+
+    def __init__(self, directorio: str, usuario: str):
+        """
+        Constructor
+        Args:
+            directorio: Carpeta raíz de las grabaciones (FIXTURES_DIR)
+            usuario: Usuario cuyas grabaciones se reproducen
+        """
+        super().__init__(max_retries=0)
+        self.__lock = Lock()
+        self.__grabaciones = {}
+        self.__posiciones = {}
+        for archivo in sorted(glob(os_path.join(directorio_usuario(directorio, usuario), "*.json"))):
+            with open(archivo, "r", encoding="utf-8") as f:
+                grabacion = load(f)
+            self.__grabaciones.setdefault(grabacion["clave"], []).append(grabacion)
+        if not self.__grabaciones:
+            print(f"⚠️  Sin grabaciones para {usuario} en {directorio}")
+
+    def _siguiente(self, clave: str):
+        """Siguiente grabación de la clave (la última se repite) o None"""
+        with self.__lock:
+            grabaciones = self.__grabaciones.get(clave)
+            if not grabaciones:
+                return None
+            posicion = self.__posiciones.get(clave, 0)
+            self.__posiciones[clave] = posicion + 1
+            return grabaciones[min(posicion, len(grabaciones) - 1)]
+
+    def send(self, request, stream=False, timeout=None, verify=True, cert=None, proxies=None):
+        """Construye la respuesta a partir de la grabación, sin abrir conexiones"""
+        grabacion = self._siguiente(clave_peticion(request.method, request.url))
+        if grabacion is None:
+            grabacion = {"estado": 404, "cabeceras": [["Content-Type", "text/plain"]], "cuerpo": "Sin grabación"}
+        cuerpo = grabacion["cuerpo"].encode(grabacion.get("codificacion") or "utf-8", errors="replace")
+
+        # extract_cookies_to_jar solo necesita .msg de la respuesta original (Set-Cookie)
+        mensaje = HTTPMessage()
+        for nombre, valor in grabacion["cabeceras"]:
+            mensaje.add_header(nombre, valor)
+        original = SimpleNamespace(msg=mensaje, isclosed=lambda: True, close=lambda: None)
+
+        crudo = HTTPResponse(
+            body=BytesIO(cuerpo),
+            headers=[(n, v) for n, v in grabacion["cabeceras"] if n.lower() != "content-length"] + [("Content-Length", str(len(cuerpo)))],
+            status=grabacion["estado"],
+            preload_content=False,
+            decode_content=False,
+            original_response=original,
+            request_url=request.url
+        )
+        return self.build_response(request, crudo)
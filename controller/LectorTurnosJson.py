@@ -0,0 +1,253 @@
+# controller/LectorTurnosJson.py
+from codecs import getincrementaldecoder
+from hashlib import sha256
+from json import JSONDecodeError, JSONDecoder
+from re import compile as compilar
+
+class LectorTurnosJson:
+    """
+    Lector incremental del cuerpo de ObtenerTurnos ({"turnos": [...], "eventos": [...]}).
+    Recibe el cuerpo por trozos de bytes (requests iter_content / aiohttp iter_chunked) y
+    entrega cada objeto de "turnos" a `al_turno` en cuanto está completo, sin guardar el
+    cuerpo entero: en memoria solo queda el trozo aún sin interpretar. Calcula a la vez la
+    huella SHA-256 del cuerpo (la misma que da sha256 sobre el texto completo).
+    Los valores que no son de "turnos" (p. ej. "eventos") se recorren sin decodificarlos,
+    siguiendo solo la profundidad y las cadenas: no se acumulan en memoria por grandes que sean.
+    No lanza excepciones al alimentarlo: un JSON inválido queda en `error`.
+    """
+
+    BLANCOS = compilar(r'[ \t\n\r]*')
+    DELIMITADORES = frozenset(' \t\n\r,:]}')
+    # Caracteres que importan al saltar un valor: dentro de una cadena y fuera de ella
+    ESPECIALES_CADENA = compilar(r'["\\]')
+    ESPECIALES_VALOR = compilar(r'["{}\[\]]')
+    CIERRES = {"}": "{", "]": "["}
+    # Tamaño máximo de un único valor JSON pendiente de completar (protege de cuerpos sin fin)
+    MAX_PENDIENTE = 8 * 1024 * 1024
+    # A partir de cuántos caracteres ya leídos se recorta el búfer
+    RECORTE = 64 * 1024
+
+    def __init__(self, al_turno, clave: str = "turnos"):
+        """
+        Constructor
+        Args:
+            al_turno: Función que recibe cada turno (dict) según se completa
+            clave: Clave de primer nivel cuyo array se recorre elemento a elemento
+        """
+        self.al_turno = al_turno
+        self.clave = clave
+        self.error = None
+        self.tiene_clave = False
+        self.turnos = 0
+        self.bytes_leidos = 0
+        self.inicio = b""
+        self.__hash = sha256()
+        self.__decodificador = getincrementaldecoder("utf-8")()
+        self.__json = JSONDecoder()
+        self.__buffer = ""
+        self.__posicion = 0
+        self.__estado = "inicio"
+        self.__clave_actual = None
+        # Valor que se está saltando: aperturas pendientes ({ o [) y si se está dentro de una cadena
+        self.__aperturas = []
+        self.__en_cadena = False
+
+    @property
+    def huella(self) -> str:
+        """SHA-256 (hex) de los bytes recibidos"""
+        return self.__hash.hexdigest()
+
+    def alimentar(self, trozo: bytes):
+        """Añade un trozo del cuerpo y entrega los turnos que se hayan completado"""
+        if not trozo:
+            return
+        self.bytes_leidos += len(trozo)
+        self.__hash.update(trozo)
+        if len(self.inicio) < 64:
+            self.inicio += trozo[:64 - len(self.inicio)]
+        if self.error is not None:
+            return
+        try:
+            self.__buffer += self.__decodificador.decode(trozo)
+            self._avanzar(final=False)
+        except ValueError as e:
+            self.error = e
+
+    def finalizar(self):
+        """Marca el fin del cuerpo: entrega lo pendiente y comprueba que el JSON esté completo"""
+        if self.error is not None:
+            return
+        try:
+            self.__buffer += self.__decodificador.decode(b"", final=True)
+            self._avanzar(final=True)
+            if self.__estado != "fin":
+                raise ValueError("JSON incompleto")
+            if self.BLANCOS.match(self.__buffer, self.__posicion).end() != len(self.__buffer):
+                raise ValueError(f"Datos extra tras el JSON (posición {self.__posicion})")
+        except ValueError as e:
+            self.error = e
+
+    def _caracter(self, final: bool):
+        """Salta blancos y devuelve el siguiente carácter (None si hay que esperar más datos)"""
+        self.__posicion = self.BLANCOS.match(self.__buffer, self.__posicion).end()
+        if self.__posicion < len(self.__buffer):
+            return self.__buffer[self.__posicion]
+        if final:
+            raise ValueError("JSON incompleto")
+        return None
+
+    def _valor(self, final: bool):
+        """
+        Decodifica el valor JSON en la posición actual. Devuelve (True, valor) o (False, None)
+        si el valor todavía no ha llegado entero.
+        """
+        try:
+            valor, fin = self.__json.raw_decode(self.__buffer, self.__posicion)
+        except JSONDecodeError:
+            if final:
+                raise
+            if len(self.__buffer) - self.__posicion > self.MAX_PENDIENTE:
+                raise ValueError(f"Valor JSON de más de {self.MAX_PENDIENTE} caracteres")
+            return False, None
+        # Un número cortado entre trozos ("1." + "5") solo es completo si le sigue un delimitador
+        if not final and (fin == len(self.__buffer) or self.__buffer[fin] not in self.DELIMITADORES):
+            return False, None
+        self.__posicion = fin
+        return True, valor
+
+    def _saltar(self, caracter: str, final: bool) -> bool:
+        """
+        Avanza sobre un valor que no interesa sin decodificarlo, conservando entre trozos la
+        profundidad y si se está dentro de una cadena. Números y literales (cortos) se
+        validan con _valor. Retorna True cuando el valor terminó.
+        """
+        if not self.__aperturas and not self.__en_cadena:
+            # Comienzo del valor
+            if caracter not in '"{[':
+                listo, _ = self._valor(final)
+                return listo
+            if caracter == '"':
+                self.__en_cadena = True
+            else:
+                self.__aperturas.append(caracter)
+            self.__posicion += 1
+
+        buffer, posicion = self.__buffer, self.__posicion
+        try:
+            while True:
+                if self.__en_cadena:
+                    especial = self.ESPECIALES_CADENA.search(buffer, posicion)
+                    if especial is None:
+                        posicion = len(buffer)
+                        return False
+                    if especial.group() == "\\":
+                        if especial.end() >= len(buffer):
+                            # El carácter escapado llega en el próximo trozo
+                            posicion = especial.start()
+                            return False
+                        posicion = especial.end() + 1
+                        continue
+                    posicion = especial.end()
+                    self.__en_cadena = False
+                    if not self.__aperturas:
+                        return True
+                    continue
+
+                especial = self.ESPECIALES_VALOR.search(buffer, posicion)
+                if especial is None:
+                    posicion = len(buffer)
+                    return False
+                caracter, posicion = especial.group(), especial.end()
+                if caracter == '"':
+                    self.__en_cadena = True
+                elif caracter in "{[":
+                    self.__aperturas.append(caracter)
+                elif self.__aperturas.pop() != self.CIERRES[caracter]:
+                    raise ValueError(f"Cierre {caracter!r} inesperado (posición {posicion - 1})")
+                elif not self.__aperturas:
+                    return True
+        finally:
+            self.__posicion = posicion
+
+    def _esperado(self, caracter: str, esperados: str):
+        """Error de sintaxis con la posición"""
+        return ValueError(f"Se esperaba {esperados!r} y llegó {caracter!r} (posición {self.__posicion})")
+
+    def _avanzar(self, final: bool):
+        """Recorre el búfer todo lo posible según el estado actual"""
+        while self.__estado != "fin":
+            caracter = self._caracter(final)
+            if caracter is None:
+                break
+            estado = self.__estado
+
+            if estado == "inicio":
+                if caracter != "{":
+                    raise self._esperado(caracter, "{")
+                self.__posicion += 1
+                self.__estado = "primera_clave"
+
+            elif estado in ("primera_clave", "clave"):
+                if caracter == "}" and estado == "primera_clave":
+                    self.__posicion += 1
+                    self.__estado = "fin"
+                    continue
+                if caracter != '"':
+                    raise self._esperado(caracter, '"')
+                listo, clave = self._valor(final)
+                if not listo:
+                    break
+                self.__clave_actual = clave
+                self.__estado = "dos_puntos"
+
+            elif estado == "dos_puntos":
+                if caracter != ":":
+                    raise self._esperado(caracter, ":")
+                self.__posicion += 1
+                if self.__clave_actual == self.clave:
+                    self.tiene_clave = True
+                    self.__estado = "array"
+                else:
+                    self.__estado = "valor"
+
+            elif estado == "array":
+                if caracter != "[":
+                    # "turnos": null u otro valor: se salta como cualquier otro
+                    self.__estado = "valor"
+                    continue
+                self.__posicion += 1
+                self.__estado = "primer_elemento"
+
+            elif estado in ("primer_elemento", "elemento"):
+                if caracter == "]" and estado == "primer_elemento":
+                    self.__posicion += 1
+                    self.__estado = "separador"
+                    continue
+                listo, turno = self._valor(final)
+                if not listo:
+                    break
+                self.turnos += 1
+                self.al_turno(turno)
+                self.__estado = "separador_elemento"
+
+            elif estado == "separador_elemento":
+                if caracter not in ",]":
+                    raise self._esperado(caracter, ", o ]")
+                self.__posicion += 1
+                self.__estado = "elemento" if caracter == "," else "separador"
+
+            elif estado == "valor":
+                if not self._saltar(caracter, final):
+                    break
+                self.__estado = "separador"
+
+            elif estado == "separador":
+                if caracter not in ",}":
+                    raise self._esperado(caracter, ", o }")
+                self.__posicion += 1
+                self.__estado = "clave" if caracter == "," else "fin"
+
+        # Descarta lo ya interpretado para que el búfer no crezca con el cuerpo
+        if self.__posicion > self.RECORTE:
+            self.__buffer = self.__buffer[self.__posicion:]
+            self.__posicion = 0
@@ -0,0 +1,43 @@
+# controller/LimitadorHost.py
+from contextlib import contextmanager
+from threading import BoundedSemaphore, Lock
+from urllib.parse import urlsplit
+
+class LimitadorHost:
+    """
+    Limita el número de peticiones HTTP simultáneas contra un mismo host.
+    Se comparte entre todos los hilos a través de Config.
+    """
+
+    def __init__(self, max_por_host: int = 4):
+        """
+        Constructor
+        Args:
+            max_por_host: Peticiones simultáneas permitidas por host
+        """
+        self.max_por_host = max(1, int(max_por_host))
+        self.__semaforos = {}
+        self.__lock = Lock()
+
+    def _semaforo(self, url: str) -> BoundedSemaphore:
+        """Obtiene (o crea) el semáforo asociado al host de la URL"""
+        host = urlsplit(url.strip()).netloc.lower()
+        with self.__lock:
+            if host not in self.__semaforos:
+                self.__semaforos[host] = BoundedSemaphore(self.max_por_host)
+            return self.__semaforos[host]
+
+    @contextmanager
+    def ocupar(self, url: str):
+        """
+        Bloquea hasta que haya un cupo libre para el host de la URL.
+        Uso:
+            with config.limitador_host.ocupar(url):
+                session.get(url)
+        """
+        semaforo = self._semaforo(url)
+        semaforo.acquire()
+        try:
+            yield
+        finally:
+            semaforo.release()
@@ -0,0 +1,98 @@
+# controller/LimitadorTokens.py
+from json import load, dump
+from os import path as os_path, makedirs
+from threading import Lock
+from time import sleep, time
+
+try:
+    from fcntl import flock, LOCK_EX, LOCK_UN
+except ImportError:  # Windows: sin bloqueo de archivos, el limitador queda por proceso
+    flock = None
+
+class LimitadorTokens:
+    """
+    Limitador token bucket para las peticiones a EcoDigital, con presupuestos
+    separados por tipo de petición (p. ej. "login" y "api").
+    Cada cubeta admite ráfagas de hasta `capacidad` peticiones y se rellena a
+    `por_minuto` tokens por minuto: los workers van tan rápido como permite el
+    presupuesto y no más, sin pausas aleatorias.
+    Con `archivo` el estado se comparte entre procesos (bloqueo fcntl); en sistemas
+    sin fcntl se usa el estado en memoria del proceso.
+    """
+
+    def __init__(self, cubetas: dict, archivo: str = None):
+        """
+        Constructor
+        Args:
+            cubetas: {"nombre": (por_minuto, capacidad)}
+            archivo: Ruta del estado compartido entre procesos (None = solo este proceso)
+        """
+        self.cubetas = {
+            nombre: (max(0.001, float(por_minuto)) / 60.0, max(1.0, float(capacidad)))
+            for nombre, (por_minuto, capacidad) in cubetas.items()
+        }
+        self.archivo = archivo if archivo and flock else None
+        if archivo and not flock:
+            print("⚠️  Limitador entre procesos no disponible en este sistema (sin fcntl), se usa por proceso")
+        self.__lock = Lock()
+        self.__estado = {nombre: (capacidad, time()) for nombre, (_, capacidad) in self.cubetas.items()}
+        self.esperas = {nombre: 0 for nombre in self.cubetas}
+        self.segundos_esperados = {nombre: 0.0 for nombre in self.cubetas}
+
+    def _tomar(self, estado: dict, cubeta: str) -> float:
+        """Rellena la cubeta, reserva un token y devuelve cuánto hay que esperar por él"""
+        tasa, capacidad = self.cubetas[cubeta]
+        ahora = time()
+        tokens, ultimo = estado.get(cubeta, (capacidad, ahora))
+        tokens = min(capacidad, tokens + max(0.0, ahora - ultimo) * tasa) - 1
+        estado[cubeta] = (tokens, ahora)
+        # Tokens negativos = reservas pendientes: se esperan por orden de llegada
+        return -tokens / tasa if tokens < 0 else 0.0
+
+    def _tomar_compartido(self, cubeta: str) -> float:
+        """Como _tomar pero con el estado en archivo, bloqueado entre procesos"""
+        makedirs(os_path.dirname(self.archivo) or ".", exist_ok=True)
+        with open(self.archivo, 'a+', encoding='utf-8') as f:
+            flock(f, LOCK_EX)
+            try:
+                f.seek(0)
+                try:
+                    estado = {k: tuple(v) for k, v in load(f).items()}
+                except ValueError:
+                    estado = {}
+                espera = self._tomar(estado, cubeta)
+                f.seek(0)
+                f.truncate()
+                dump(estado, f)
+                f.flush()
+                return espera
+            finally:
+                flock(f, LOCK_UN)
+
+    def reservar(self, cubeta: str) -> float:
+        """
+        Reserva un token de la cubeta sin bloquear.
+        Retorna: segundos que hay que esperar antes de enviar la petición (útil con asyncio)
+        """
+        if cubeta not in self.cubetas:
+            return 0.0
+        with self.__lock:
+            espera = self._tomar_compartido(cubeta) if self.archivo else self._tomar(self.__estado, cubeta)
+            if espera > 0:
+                self.esperas[cubeta] += 1
+                self.segundos_esperados[cubeta] += espera
+        return espera
+
+    def adquirir(self, cubeta: str) -> float:
+        """Bloquea hasta disponer de un token de la cubeta. Retorna los segundos esperados"""
+        espera = self.reservar(cubeta)
+        if espera > 0:
+            sleep(espera)
+        return espera
+
+    def resumen(self) -> str:
+        """Texto breve con las esperas acumuladas por cubeta"""
+        return ", ".join(
+            f"{nombre}: {self.esperas[nombre]} espera(s) / {self.segundos_esperados[nombre]:.1f}s"
+            for nombre in self.cubetas
+        )
@@ -1,6 +1,7 @@
 from datetime import datetime
 from pathlib import Path
 from os import getcwd
+from threading import Lock
 
 class Log:
     """
@@ -24,13 +25,15 @@ class Log:
     
     __ANCHO = 120
     __FORMATO_TIEMPO = '%Y-%m-%d %H:%M:%S'
+    __LOCK_ESCRITURA = Lock()
     
-    def __init__(self):
+    def __init__(self, usuario: str = None):
         """
         Inicializa el sistema de logging con las rutas configuradas.
         Crea los directorios necesarios si no existen.
+        Si se indica `usuario`, cada mensaje se etiqueta con él (útil con varios hilos).
         """
-        fecha_actual = datetime.now().strftime('%Y-%m-%d')
+        self.__etiqueta = f"[{usuario}] " if usuario else ""
         
         # Configuración de rutas
         self.__ruta_base = Path(getcwd())
@@ -41,9 +44,15 @@ class Log:
         self.__ruta_procesos.mkdir(parents=True, exist_ok=True)
         self.__ruta_errores.mkdir(parents=True, exist_ok=True)
         
-        # Archivos de log
-        self.__archivo_procesos = self.__ruta_procesos / f"LogProcesos_{fecha_actual}.txt"
-        self.__archivo_errores = self.__ruta_errores / f"LogErrores_{fecha_actual}.txt"
+    @property
+    def __archivo_procesos(self) -> Path:
+        """Log de procesos del día actual (el nombre se calcula al escribir: en modo demonio cambia a medianoche)"""
+        return self.__ruta_procesos / f"LogProcesos_{datetime.now().strftime('%Y-%m-%d')}.txt"
+    
+    @property
+    def __archivo_errores(self) -> Path:
+        """Log de errores del día actual"""
+        return self.__ruta_errores / f"LogErrores_{datetime.now().strftime('%Y-%m-%d')}.txt"
     
     def __tiempo_actual(self) -> str:
         """Obtiene el tiempo actual formateado"""
@@ -58,33 +67,34 @@ class Log:
         return mensaje
     
     def __escribir_log(self, archivo: Path, mensaje: str):
-        """Escribe de forma segura en el archivo de log"""
-        with archivo.open('a', encoding='utf-8') as f:
-            f.write(mensaje + "\n")
+        """Escribe de forma segura en el archivo de log (un hilo a la vez)"""
+        with self.__LOCK_ESCRITURA:
+            with archivo.open('a', encoding='utf-8') as f:
+                f.write(mensaje + "\n")
     
     def inicio_proceso(self, nombre_aplicacion: str = "Proceso"):
         """Registra el inicio de un proceso"""
         mensaje = self.__formatear_mensaje(
-            f"INICIO DE EJECUCIÓN - {nombre_aplicacion} - {self.__tiempo_actual()}"
+            f"{self.__etiqueta}INICIO DE EJECUCIÓN - {nombre_aplicacion} - {self.__tiempo_actual()}"
         )
         self.__escribir_log(self.__archivo_procesos, mensaje)
     
     def fin_proceso(self, nombre_aplicacion: str = "Proceso"):
         """Registra la finalización de un proceso"""
         mensaje = self.__formatear_mensaje(
-            f"FIN DE EJECUCIÓN - {nombre_aplicacion} - {self.__tiempo_actual()}"
+            f"{self.__etiqueta}FIN DE EJECUCIÓN - {nombre_aplicacion} - {self.__tiempo_actual()}"
         )
         self.__escribir_log(self.__archivo_procesos, mensaje)
     
     def proceso(self, nombre_proceso: str):
         """Registra un proceso específico"""
-        mensaje = f"| Ejecutando: {nombre_proceso.ljust(80)} | Hora: {self.__tiempo_actual()} |"
+        mensaje = f"| Ejecutando: {(self.__etiqueta + nombre_proceso).ljust(80)} | Hora: {self.__tiempo_actual()} |"
         self.__escribir_log(self.__archivo_procesos, mensaje)
     
     def comentario(self, nivel: str, mensaje: str):
         """Registra un comentario con nivel de severidad"""
         contenido = self.__formatear_mensaje(
-            f"{nivel.upper()}: {mensaje}",
+            f"{nivel.upper()}: {self.__etiqueta}{mensaje}",
             f"Hora: {self.__tiempo_actual()}"
         )
         self.__escribir_log(self.__archivo_procesos, contenido)
@@ -92,7 +102,7 @@ class Log:
     def error(self, descripcion_error: str, proceso: str = ""):
         """Registra un error ocurrido"""
         contenido = self.__formatear_mensaje(
-            f"ERROR DETECTADO - {self.__tiempo_actual()}",
+            f"{self.__etiqueta}ERROR DETECTADO - {self.__tiempo_actual()}",
             f"Proceso: {proceso}" if proceso else "Proceso no especificado",
             f"Detalle: {descripcion_error}"
         )
@@ -1,10 +1,8 @@
 # controller/Login.py
-from requests import Session, exceptions
-from json import load, dump
-from os import path as os_path, makedirs, remove
-from re import sub
-from time import sleep
-from random import uniform
+from requests import exceptions
+from re import sub, compile as re_compile, escape, IGNORECASE
+from datetime import datetime
+from time import time
 
 class Login:
     """
@@ -12,40 +10,107 @@ class Login:
     ¡CRÍTICO: Mantiene espacios al final en URLs/headers como en el curl original!
     """
 
-    def __init__(self, config, user=None, password=None):
+    # 🔑 HEADERS DE NAVEGADOR (compartidos con el motor async)
+    HEADERS_NAVEGADOR = {
+        'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/144.0.0.0 Safari/537.36',
+        'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,image/avif,image/webp,image/apng,*/*;q=0.8,application/signed-exchange;v=b3;q=0.7',
+        'Accept-Language': 'en-US,en;q=0.9,es;q=0.8',
+        'Accept-Encoding': 'gzip, deflate, br',
+        'Connection': 'keep-alive',
+        'Upgrade-Insecure-Requests': '1',
+        'Sec-Fetch-Dest': 'document',
+        'Sec-Fetch-Mode': 'navigate',
+        'Sec-Fetch-Site': 'same-origin',
+        'Sec-Fetch-User': '?1',
+        'Sec-Ch-Ua': '"Not(A:Brand";v="8", "Chromium";v="144", "Google Chrome";v="144"',
+        'Sec-Ch-Ua-Mobile': '?0',
+        'Sec-Ch-Ua-Platform': '"Windows"',
+    }
+
+    # Headers adicionales para parecer más "humano" a Cloudflare en un re-login
+    HEADERS_RELOGIN = {
+        'Priority': 'u=0, i',
+        'Sec-Ch-Ua-Full-Version-List': '"Chromium";v="144.0.7464.0", "Google Chrome";v="144.0.7464.0", "Not(A:Brand";v="8.0.0.0"'
+    }
+
+    # Indicadores de login exitoso en el HTML
+    MARCADORES_LOGIN = (
+        'fc-btnvercalendarioturnos-button',
+        'turnosasesor',
+        'master#'
+    )
+
+    # Los mismos marcadores como expresiones: la búsqueda se detiene en la primera
+    # coincidencia sin pasar a minúsculas todo el HTML (versión texto y bytes)
+    PATRON_MARCADORES = re_compile('|'.join(map(escape, MARCADORES_LOGIN)), IGNORECASE)
+    PATRON_MARCADORES_BYTES = re_compile('|'.join(map(escape, MARCADORES_LOGIN)).encode(), IGNORECASE)
+    SOLAPE_MARCADORES = max(map(len, MARCADORES_LOGIN)) - 1
+
+    # Tamaño de cada trozo leído por la sonda de sesión
+    TROZO_SONDA = 4096
+
+    @classmethod
+    def headers_base(cls, config) -> dict:
+        """Headers completos de navegador para EcoDigital"""
+        headers = dict(cls.HEADERS_NAVEGADOR)
+        # ⚠️ ESPACIOS AL FINAL - ¡CRÍTICOS PARA CLOUDFLARE!
+        headers['Origin'] = f'{config.eco_base_url}  '
+        headers['Referer'] = f'{config.eco_login_url}  '
+        return headers
+
+    @classmethod
+    def es_html_logueado(cls, html: str) -> bool:
+        """Verifica indicadores de login exitoso en un HTML"""
+        return cls.PATRON_MARCADORES.search(html) is not None
+
+    @classmethod
+    def marcador_en_trozo(cls, cola: bytes, trozo: bytes) -> tuple:
         """
-        Constructor con inyección de config y credenciales opcionales.
+        Busca los marcadores de login en un HTML recibido por trozos.
         Args:
-            config: Instancia de Config con configuración global
-            user: Usuario específico (opcional, fallback a config.user_eco)
-            password: Password específico (opcional, fallback a config.ps_eco)
+            cola: Final del trozo anterior (un marcador puede quedar partido entre dos trozos)
+            trozo: Bytes recién recibidos
+        Retorna: (encontrado, cola para el siguiente trozo)
+        """
+        ventana = cola + trozo
+        if cls.PATRON_MARCADORES_BYTES.search(ventana):
+            return True, b""
+        return False, ventana[-cls.SOLAPE_MARCADORES:]
+
+    @staticmethod
+    def estado_cookies(cookies: list, validada_en: float, validez: float) -> tuple:
+        """
+        Clasifica las cookies guardadas sin hacer peticiones.
+        Retorna: (estado, cookies aún vigentes), con estado:
+        - "caducada": todas las cookies con fecha de caducidad ya vencieron -> login fresco directo
+        - "confiable": ninguna vencida y validadas hace menos de `validez` segundos -> directo al API
+        - "validar": hay que comprobarlas contra la página de turnos
+        """
+        ahora = time()
+        vigentes = [c for c in cookies if c.get('expires') is None or c['expires'] > ahora]
+        if not vigentes:
+            return "caducada", vigentes
+        if len(vigentes) == len(cookies) and validada_en and 0 <= ahora - validada_en < validez:
+            return "confiable", vigentes
+        return "validar", vigentes
+
+    def __init__(self, config, contexto):
+        """
+        Constructor con inyección de config y contexto del usuario.
+        Args:
+            config: Instancia de Config con configuración global (solo lectura)
+            contexto: ContextoUsuario con credenciales, rutas y logger del usuario
         """
         self.config = config
-        # Priorizar credenciales explícitas, sino usar las del config global
-        self.user = user if user is not None else config.user_eco
-        self.password = password if password is not None else config.ps_eco
-        
-        self.session = Session()
+        self.contexto = contexto
+        self.log = contexto.log
+        self.user = contexto.usuario
+        self.password = contexto.password
         
-        # 🔑 HEADERS COMPLETOS (espacios al final críticos para Cloudflare)
-        self.session.headers.update({
-            'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/144.0.0.0 Safari/537.36',
-            'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,image/avif,image/webp,image/apng,*/*;q=0.8,application/signed-exchange;v=b3;q=0.7',
-            'Accept-Language': 'en-US,en;q=0.9,es;q=0.8',
-            'Accept-Encoding': 'gzip, deflate, br',
-            'Connection': 'keep-alive',
-            'Upgrade-Insecure-Requests': '1',
-            'Sec-Fetch-Dest': 'document',
-            'Sec-Fetch-Mode': 'navigate',
-            'Sec-Fetch-Site': 'same-origin',
-            'Sec-Fetch-User': '?1',
-            'Sec-Ch-Ua': '"Not(A:Brand";v="8", "Chromium";v="144", "Google Chrome";v="144"',
-            'Sec-Ch-Ua-Mobile': '?0',
-            'Sec-Ch-Ua-Platform': '"Windows"',
-            # ⚠️ ESPACIOS AL FINAL - ¡CRÍTICOS PARA CLOUDFLARE!
-            'Origin': f'{self.config.eco_base_url}  ',  
-            'Referer': f'{self.config.eco_login_url}  ',  
-        })
+        # Cookies propias del usuario sobre el pool de conexiones compartido
+        self.session = self.config.transporte_http.nueva_sesion(self.headers_base(self.config), contexto)
+        # Última vez que EcoDigital aceptó estas cookies (epoch)
+        self.validada_en = None
 
     def _get_login_payload(self) -> dict:
         """Payload para el login usando las credenciales de esta instancia"""
@@ -59,123 +124,150 @@ class Login:
     def login(self, use_cookies: bool = True) -> bool:
         """Login con bypass Cloudflare mejorado para VPS"""
         
-        self.config.log.inicio_proceso(f"LOGIN ECO - {self.user}")  
+        self.log.inicio_proceso(f"LOGIN ECO - {self.user}")  
+        politica = self.config.politica_reintentos
+
+        if not politica.permitir():
+            self.log.error(f"Circuito abierto por bloqueos de Cloudflare ({politica.segundos_restantes():.0f}s restantes)", "Login")
+            self.log.fin_proceso(f"LOGIN ECO - {self.user}")
+            return False
 
         try:
-            self.config.log.proceso("Intentando login")  
+            self.log.proceso("Intentando login")  
 
             # 1. Intentar con cookies específicas del usuario
             if use_cookies and self._try_cookies_login():
-                self.config.log.comentario("INFO", "Login exitoso usando cookies")  
-                self.config.log.fin_proceso(f"LOGIN ECO - {self.user}")  
+                self.log.comentario("INFO", "Login exitoso usando cookies")  
+                self.log.fin_proceso(f"LOGIN ECO - {self.user}")  
                 return True
 
-            # 🔥 NUEVO: Si es re-login sin cookies, añadir delay para evitar rate limiting
-            if not use_cookies:
-                sleep(uniform(1.5, 3.0))
-                
-                # Headers adicionales para parecer más "humano" a Cloudflare
-                self.session.headers.update({
-                    'Priority': 'u=0, i',
-                    'Sec-Ch-Ua-Full-Version-List': '"Chromium";v="144.0.7464.0", "Google Chrome";v="144.0.7464.0", "Not(A:Brand";v="8.0.0.0"'
-                })
+            # 2. Login con credenciales: la puerta limita cuántos hay en curso a la vez
+            with self.config.puerta_login.pasar(self.log):
+                # Re-comprobación tras la cola: el titular de la prueba del semiabierto sigue teniendo paso
+                if not politica.permitir():
+                    self.log.error("Circuito abierto mientras se esperaba turno de login", "Login")
+                    self.log.fin_proceso(f"LOGIN ECO - {self.user}")
+                    return False
+                return self._login_con_credenciales(use_cookies, politica)
+
+        except exceptions.Timeout:
+            self.log.error("Timeout en la conexión", "LOGIN")  
+            self.log.fin_proceso(f"LOGIN ECO - {self.user}")  
+            return False
+
+        except Exception as e:
+            self.log.error(str(e), "LOGIN")  
+            self.log.fin_proceso(f"LOGIN ECO - {self.user}")  
+            return False
+
+    def _login_con_credenciales(self, use_cookies: bool, politica) -> bool:
+        """GET inicial + POST de credenciales (se ejecuta dentro de la puerta de logins)"""
+        # Si es re-login sin cookies: headers adicionales para parecer más "humano" a Cloudflare
+        if not use_cookies:
+            self.session.headers.update(self.HEADERS_RELOGIN)
 
+        # Presupuesto de logins (token bucket compartido) en lugar de pausas aleatorias
+        self.config.limitador_tokens.adquirir("login")
 
-            # 2. GET inicial para obtener cookies Cloudflare
-            self.config.log.proceso("GET inicial para obtener cookies Cloudflare")
+        # 2. GET inicial para obtener cookies Cloudflare
+        self.log.proceso("GET inicial para obtener cookies Cloudflare")
 
+        with self.config.limitador_host.ocupar(self.config.eco_login_url):
             response = self.session.get(
                 self.config.eco_login_url,
                 timeout=self.config.timeout,  
                 allow_redirects=True
             )
+        politica.registrar_respuesta(self.contexto, response.status_code, response.headers)
 
-            self.config.log.comentario("INFO", f"Status GET inicial: {response.status_code}")  
+        self.log.comentario("INFO", f"Status GET inicial: {response.status_code}")  
 
-            if response.status_code == 403:
-                self.config.log.error("Cloudflare bloqueó la petición (403)", "Login")  
-                self.config.log.fin_proceso(f"LOGIN ECO - {self.user}")  
-                return False
-            
-            if response.status_code == 404:
-                self.config.log.error("URL no encontrada (404) - Verifica eco_login_url", "Login")  
-                self.config.log.comentario("ERROR", f"URL intentada: {self.config.eco_login_url}")
-                self.config.log.fin_proceso(f"LOGIN ECO - {self.user}")  
-                return False
+        if response.status_code == 403:
+            self.log.error("Cloudflare bloqueó la petición (403)", "Login")  
+            self.log.fin_proceso(f"LOGIN ECO - {self.user}")  
+            return False
+        
+        if response.status_code == 404:
+            self.log.error("URL no encontrada (404) - Verifica eco_login_url", "Login")  
+            self.log.comentario("ERROR", f"URL intentada: {self.config.eco_login_url}")
+            self.log.fin_proceso(f"LOGIN ECO - {self.user}")  
+            return False
 
-            if response.status_code != 200:
-                self.config.log.error(f"Error en GET inicial: {response.status_code}", "Login")  
-                self.config.log.fin_proceso(f"LOGIN ECO - {self.user}")  
-                return False
+        if response.status_code != 200:
+            self.log.error(f"Error en GET inicial: {response.status_code}", "Login")  
+            self.log.fin_proceso(f"LOGIN ECO - {self.user}")  
+            return False
 
-            # 3. POST con credenciales
-            self.config.log.proceso("Enviando credenciales")
-            payload = self._get_login_payload()
+        # 3. POST con credenciales
+        self.log.proceso("Enviando credenciales")
+        payload = self._get_login_payload()
+        politica.registrar_login(self.contexto)
+        with self.config.limitador_host.ocupar(self.config.eco_login_url):
             login_response = self.session.post(
                 self.config.eco_login_url,
                 data=payload,
                 timeout=self.config.timeout,  
                 allow_redirects=True
             )
+        politica.registrar_respuesta(self.contexto, login_response.status_code, login_response.headers)
 
-            if login_response.status_code == 403:
-                self.config.log.error("Cloudflare bloqueó el POST (403)", "POST login")  
-                self.config.log.fin_proceso(f"LOGIN ECO - {self.user}")  
-                return False
-
-            if "Usuario o contraseña incorrectos" in login_response.text:
-                self.config.log.error("Credenciales incorrectas", "POST login")  
-                self.config.log.fin_proceso(f"LOGIN ECO - {self.user}")  
-                return False
-
-            if self._is_logged_in_response(login_response):
-                self.config.log.comentario("SUCCESS", "Login exitoso")  
-                self.save_cookies()
-                self.config.log.fin_proceso(f"LOGIN ECO - {self.user}")  
-                return True
-
-            self.config.log.error("Login fallido (respuesta inesperada)", "POST login")  
-            self.config.log.fin_proceso(f"LOGIN ECO - {self.user}")  
+        if login_response.status_code == 403:
+            self.log.error("Cloudflare bloqueó el POST (403)", "POST login")  
+            self.log.fin_proceso(f"LOGIN ECO - {self.user}")  
             return False
 
-        except exceptions.Timeout:
-            self.config.log.error("Timeout en la conexión", "LOGIN")  
-            self.config.log.fin_proceso(f"LOGIN ECO - {self.user}")  
+        if "Usuario o contraseña incorrectos" in login_response.text:
+            self.log.error("Credenciales incorrectas", "POST login")  
+            self.log.fin_proceso(f"LOGIN ECO - {self.user}")  
             return False
 
-        except Exception as e:
-            self.config.log.error(str(e), "LOGIN")  
-            self.config.log.fin_proceso(f"LOGIN ECO - {self.user}")  
-            return False
+        if self._is_logged_in_response(login_response):
+            self.log.comentario("SUCCESS", "Login exitoso")  
+            self.save_cookies()
+            self.log.fin_proceso(f"LOGIN ECO - {self.user}")  
+            return True
+
+        self.log.error("Login fallido (respuesta inesperada)", "POST login")  
+        self.log.fin_proceso(f"LOGIN ECO - {self.user}")  
+        return False
 
     def _is_logged_in_response(self, response) -> bool:
         """Verifica indicadores de login exitoso en el HTML"""
-        content = response.text.lower()
-        logged_in_indicators = [
-            'fc-btnvercalendarioturnos-button',
-            'turnosasesor',
-            'master#'
-        ]
-        return any(indicator in content for indicator in logged_in_indicators)
+        return self.es_html_logueado(response.text)
+
+    def _sonda_html_logueado(self, response) -> bool:
+        """
+        Lee una respuesta abierta con stream=True por trozos hasta encontrar un marcador
+        de login o llegar a SONDA_BYTES, sin descargar la página completa. Cierra la respuesta.
+        """
+        try:
+            cola, leidos = b"", 0
+            for trozo in response.iter_content(self.TROZO_SONDA):
+                encontrado, cola = self.marcador_en_trozo(cola, trozo)
+                leidos += len(trozo)
+                if encontrado:
+                    return True
+                if leidos >= self.config.sonda_bytes:
+                    break
+            return False
+        finally:
+            response.close()
 
     def _try_cookies_login(self) -> bool:
         """Intenta login usando cookies guardadas específicas del usuario"""
         try:
-            # 👇 USAR método de Config para garantizar consistencia de rutas
-            cookies_path = self.config._get_user_cookies_path()
+            cookies, validada_en = self.config.almacen_sesiones.leer(self.user)
 
-            if not os_path.exists(cookies_path):
-                self.config.log.comentario("INFO", f"No existen cookies para {self.user}")
+            if not cookies:
+                self.log.comentario("INFO", f"No existen cookies para {self.user}")
                 return False
 
-            with open(cookies_path, 'r') as f:  
-                cookies = load(f)
-
-            if not cookies:
-                self.config.log.comentario("INFO", "Archivo de cookies vacío")
+            estado, cookies = self.estado_cookies(cookies, validada_en, self.config.cookies_validez)
+            if estado == "caducada":
+                self.log.comentario("INFO", "Cookies expiradas según su fecha de caducidad, se hará login fresco")
                 return False
 
-            self.config.log.proceso("Cargando cookies en sesión")  
+            self.log.proceso("Cargando cookies en sesión")  
 
             self.session.cookies.clear()
             clean_domain = sub(r'^https?://', '', self.config.eco_base_url)  
@@ -186,42 +278,49 @@ class Login:
                     cookie['value'],
                     domain=cookie.get('domain', clean_domain),
                     path=cookie.get('path', '/'),
-                    secure=cookie.get('secure', True)
+                    secure=cookie.get('secure', True),
+                    expires=cookie.get('expires')
                 )
 
-            self.config.log.proceso("Validando cookies contra endpoint turnos")  
+            if estado == "confiable":
+                # Validadas hace poco: la propia llamada al API hará de comprobación
+                # (si responde NOSESS, el reintento hace login fresco)
+                self.validada_en = validada_en
+                self.log.comentario("SUCCESS", f"Cookies validadas hace {time() - validada_en:.0f}s, se omite la validación")
+                return True
 
-            response = self.session.get(
-                self.config.eco_turnos_url,  
-                timeout=self.config.timeout  
-            )
+            self.log.proceso("Validando cookies contra endpoint turnos")  
 
-            if response.status_code == 200 and self._is_logged_in_response(response):
-                self.config.log.comentario("SUCCESS", "Login con cookies válido")  
+            self.config.limitador_tokens.adquirir("api")
+            with self.config.limitador_host.ocupar(self.config.eco_turnos_url):
+                response = self.session.get(
+                    self.config.eco_turnos_url,  
+                    timeout=self.config.timeout,
+                    stream=True
+                )
+                try:
+                    self.config.politica_reintentos.registrar_respuesta(self.contexto, response.status_code, response.headers)
+                    logueado = response.status_code == 200 and self._sonda_html_logueado(response)
+                finally:
+                    # Con stream=True la conexión no vuelve al pool hasta cerrar (403/5xx/redirect incluidos)
+                    response.close()
+
+            if logueado:
+                self.log.comentario("SUCCESS", "Login con cookies válido")  
+                self.save_cookies()
                 return True
 
-            self.config.log.comentario("WARNING", "Cookies inválidas o expiradas")  
+            self.log.comentario("WARNING", "Cookies inválidas o expiradas")  
             return False
 
         except Exception as e:
-            self.config.log.error(str(e), "LOGIN COOKIES")  
+            self.log.error(str(e), "LOGIN COOKIES")  
             return False
 
-    def _get_user_cookies_path(self) -> str:
-        """
-        Genera ruta única de cookies por usuario.
-        🔥 CRÍTICO: Regex debe coincidir EXACTAMENTE con Config._get_user_cookies_path()
-        """
-        username = self.user.split('@')[0] if '@' in self.user else self.user
-        # 👇 ESPACIO al final en el regex para coincidir con Config.py
-        safe_username = sub(r'[^\w\-_\. ]', '_', username)
-        cookies_file = f"{safe_username}_cookies.json"
-        return os_path.join(self.config.cookies_base_path, cookies_file)
-
     def save_cookies(self):
         """Guarda cookies específicas para este usuario"""
         try:
-            self.config.log.proceso("Guardando cookies")  
+            self.log.proceso("Guardando cookies")  
 
             cookies = []
             for cookie in self.session.cookies:
@@ -234,31 +333,47 @@ class Login:
                     'secure': cookie.secure,
                 })
 
-            # 👇 USAR método de Config para consistencia
-            cookies_path = self.config._get_user_cookies_path()
-            
-            # Crear directorio si no existe
-            makedirs(os_path.dirname(cookies_path), exist_ok=True)
-
-            with open(cookies_path, 'w') as f:  
-                dump(cookies, f, indent=2)
+            self.validada_en = time()
+            self.config.almacen_sesiones.guardar(self.user, cookies, self.validada_en)
 
-            self.config.log.comentario("SUCCESS", f"Cookies guardadas en {cookies_path}")  
+            self.log.comentario("SUCCESS", f"Cookies guardadas ({self.user})")  
 
         except Exception as e:
-            self.config.log.error(str(e), "SAVE COOKIES")
+            self.log.error(str(e), "SAVE COOKIES")
+
+    def marcar_validada(self):
+        """
+        Registra que EcoDigital aceptó la sesión (p. ej. ObtenerTurnos respondió bien).
+        Solo reescribe la sesión guardada cuando la validación guardada pasó la mitad de su vigencia.
+        """
+        if self.validada_en is None or time() - self.validada_en > self.config.cookies_validez / 2:
+            self.save_cookies()
 
     def get_session(self):
         """Retorna la sesión actual para requests adicionales"""
         return self.session
 
+    def clear_session(self):
+        """Descarta las cookies en memoria y las guardadas para forzar un login fresco"""
+        self.session.cookies.clear()
+        self.config.clear_session(self.user)
+
     def close(self):
-        """Cierra la sesión para liberar recursos"""
+        """Libera la sesión del usuario (las conexiones del pool compartido siguen abiertas)"""
         if self.session:
             self.session.close()
 
-    def validar_sesion_api(self) -> bool:
-        """Verifica si la sesión actual es válida para el endpoint de la API"""
+    def validar_sesion_api(self, forzar: bool = False) -> bool:
+        """
+        Verifica si la sesión actual es válida para el endpoint de la API.
+        Si EcoDigital la aceptó hace menos de COOKIES_VALIDEZ no hace ninguna petición;
+        si no, consulta ObtenerTurnos solo para el día de hoy y lee únicamente el inicio
+        de la respuesta (basta para distinguir NOSESS de datos).
+        Args:
+            forzar: Consultar siempre y, si la sesión sirve, renovar validada_en (RefrescadorSesiones)
+        """
+        if not forzar and self.validada_en and time() - self.validada_en < self.config.cookies_validez:
+            return True
         try:
             headers = {
                 'Content-Type': 'application/json;charset=UTF-8',
@@ -266,20 +381,35 @@ class Login:
                 'Origin': self.config.eco_base_url,
                 'Referer': f'{self.config.eco_login_url}Master',
             }
-            payload = {"fechaInicio": "1/1/2026", "fechaFin": "2/1/2026"}
+            hoy = datetime.now()
+            fecha = f"{hoy.day}/{hoy.month}/{hoy.year}"
+            payload = {"fechaInicio": fecha, "fechaFin": fecha}
             
-            response = self.session.post(
-                self.config.eco_api_turnos,
-                json=payload,
-                headers=headers,
-                timeout=10
-            )
+            self.contexto.contar("peticiones_api")
+            self.config.limitador_tokens.adquirir("api")
+            with self.config.limitador_host.ocupar(self.config.eco_api_turnos):
+                response = self.session.post(
+                    self.config.eco_api_turnos,
+                    json=payload,
+                    headers=headers,
+                    timeout=10,
+                    stream=True
+                )
+                try:
+                    inicio = next(response.iter_content(64), b"")
+                finally:
+                    response.close()
+            self.config.politica_reintentos.registrar_respuesta(self.contexto, response.status_code, response.headers)
             
             # Si devuelve NOSESS o 401, la sesión no es válida para API
-            if response.text.strip().upper() == "NOSESS" or response.status_code == 401:
-                self.config.clear_session()
+            if inicio.strip().upper().startswith(b"NOSESS") or response.status_code == 401:
+                self.clear_session()
                 return False
+            if response.status_code == 200:
+                if forzar:
+                    self.save_cookies()
+                else:
+                    self.marcar_validada()
             return True
         except Exception:
             return False
-        
\ No newline at end of file
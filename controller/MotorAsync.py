@@ -0,0 +1,433 @@
+# controller/MotorAsync.py
+from asyncio import Semaphore, TimeoutError as AsyncTimeoutError, gather, new_event_loop, sleep, to_thread
+from email.utils import formatdate, parsedate_to_datetime
+from http.cookies import SimpleCookie
+from time import time
+from traceback import print_exc
+
+from aiohttp import ClientError, ClientSession, ClientTimeout, CookieJar, TCPConnector
+from yarl import URL
+
+from controller.Login import Login
+from controller.Ejecucion import Ejecuciones
+from controller.ExtractorCalendario import ExtractorCalendario
+
+class LoginAsync:
+    """
+    Contraparte asíncrona de Login (aiohttp).
+    Reutiliza headers, payload, marcadores y el almacén de sesiones de Login.
+    """
+
+    def __init__(self, config, contexto, http: ClientSession, puerta: Semaphore):
+        """
+        Constructor
+        Args:
+            config: Instancia de Config compartida
+            contexto: ContextoUsuario del usuario
+            http: ClientSession propia del usuario (cookies aisladas, conector compartido)
+            puerta: Semáforo del event loop con los logins con credenciales en curso (MAX_LOGINS_SIMULTANEOS)
+        """
+        self.config = config
+        self.contexto = contexto
+        self.log = contexto.log
+        self.http = http
+        self.puerta = puerta
+        self.user = contexto.usuario
+        self.password = contexto.password
+        self.validada_en = None
+        # Caducidad absoluta de las cookies con Max-Age, fijada la primera vez que se ven
+        self.caducidades = {}
+
+    def _get_login_payload(self) -> dict:
+        """Payload para el login usando las credenciales del contexto"""
+        return {
+            'DominioLoginAD': '',
+            'UsuarioLogado.Login': self.user,
+            'UsuarioLogado.Password': self.password,
+            'IniciarSesionAD': 'false'
+        }
+
+    def _cargar_cookies(self) -> str:
+        """
+        Carga en el cookie jar las cookies guardadas por Login/LoginAsync.
+        Retorna el estado según Login.estado_cookies ("" si no hay cookies)
+        """
+        cookies, validada_en = self.config.almacen_sesiones.leer(self.user)
+        if not cookies:
+            return ""
+        estado, cookies = Login.estado_cookies(cookies, validada_en, self.config.cookies_validez)
+        if estado == "caducada":
+            return estado
+        self.http.cookie_jar.clear()
+        url_base = URL(self.config.eco_base_url)
+        for cookie in cookies:
+            galletas = SimpleCookie()
+            galletas[cookie['name']] = cookie['value']
+            morsel = galletas[cookie['name']]
+            # Mismo dominio/ruta/caducidad que guardaron Login o LoginAsync
+            dominio = (cookie.get('domain') or '').lstrip('.')
+            if dominio and (dominio == url_base.host or url_base.host.endswith(f".{dominio}")):
+                morsel['domain'] = dominio
+            morsel['path'] = cookie.get('path') or '/'
+            if cookie.get('expires') is not None:
+                morsel['expires'] = formatdate(cookie['expires'], usegmt=True)
+            if cookie.get('secure') and url_base.scheme == 'https':
+                morsel['secure'] = True
+            self.http.cookie_jar.update_cookies(galletas, response_url=url_base)
+        self.validada_en = validada_en
+        return estado
+
+    def _caducidad(self, morsel) -> float:
+        """Caducidad (epoch) de una cookie del jar según Max-Age o Expires; None si es de sesión"""
+        if morsel['max-age']:
+            try:
+                clave = (morsel.key, morsel.value, morsel['domain'], morsel['path'])
+                return self.caducidades.setdefault(clave, int(time()) + int(morsel['max-age']))
+            except ValueError:
+                return None
+        if morsel['expires']:
+            try:
+                return parsedate_to_datetime(morsel['expires']).timestamp()
+            except (TypeError, ValueError):
+                return None
+        return None
+
+    def save_cookies(self):
+        """Guarda las cookies del jar en el mismo formato que Login.save_cookies"""
+        try:
+            dominio = URL(self.config.eco_base_url).host
+            cookies = [{
+                'name': morsel.key,
+                'value': morsel.value,
+                'domain': morsel['domain'] or dominio,
+                'path': morsel['path'] or '/',
+                'expires': self._caducidad(morsel),
+                'secure': bool(morsel['secure']),
+            } for morsel in self.http.cookie_jar]
+            self.validada_en = time()
+            self.config.almacen_sesiones.guardar(self.user, cookies, self.validada_en)
+        except Exception as e:
+            self.log.error(str(e), "SAVE COOKIES ASYNC")
+
+    def marcar_validada(self):
+        """Igual que Login.marcar_validada: el API aceptó la sesión"""
+        if self.validada_en is None or time() - self.validada_en > self.config.cookies_validez / 2:
+            self.save_cookies()
+
+    def clear_session(self):
+        """Descarta cookies en memoria y guardadas para forzar un login fresco"""
+        self.http.cookie_jar.clear()
+        self.config.clear_session(self.user)
+
+    async def _sonda_html_logueado(self, response) -> bool:
+        """Contraparte de Login._sonda_html_logueado: lee por trozos hasta un marcador o SONDA_BYTES"""
+        cola, leidos = b"", 0
+        async for trozo in response.content.iter_chunked(Login.TROZO_SONDA):
+            encontrado, cola = Login.marcador_en_trozo(cola, trozo)
+            leidos += len(trozo)
+            if encontrado:
+                return True
+            if leidos >= self.config.sonda_bytes:
+                break
+        return False
+
+    async def _try_cookies_login(self) -> bool:
+        """Intenta login con las cookies guardadas (validándolas contra la página de turnos si hace falta)"""
+        try:
+            estado = self._cargar_cookies()
+            if not estado:
+                self.log.comentario("INFO", f"No existen cookies para {self.user}")
+                return False
+            if estado == "caducada":
+                self.log.comentario("INFO", "Cookies expiradas según su fecha de caducidad, se hará login fresco")
+                return False
+            if estado == "confiable":
+                self.log.comentario("SUCCESS", "Cookies validadas recientemente, se omite la validación")
+                return True
+            await sleep(self.config.limitador_tokens.reservar("api"))
+            async with self.http.get(self.config.eco_turnos_url) as response:
+                self.config.politica_reintentos.registrar_respuesta(self.contexto, response.status, response.headers)
+                if response.status == 200 and await self._sonda_html_logueado(response):
+                    self.log.comentario("SUCCESS", "Login con cookies válido")
+                    self.save_cookies()
+                    return True
+            self.log.comentario("WARNING", "Cookies inválidas o expiradas")
+            return False
+        except Exception as e:
+            self.log.error(str(e), "LOGIN COOKIES ASYNC")
+            return False
+
+    async def login(self, use_cookies: bool = True) -> bool:
+        """Login asíncrono con el mismo flujo que Login.login"""
+        politica = self.config.politica_reintentos
+        if not politica.permitir():
+            self.log.error(f"Circuito abierto por bloqueos de Cloudflare ({politica.segundos_restantes():.0f}s restantes)", "Login async")
+            return False
+        try:
+            if use_cookies and await self._try_cookies_login():
+                return True
+
+            # Login con credenciales: cola FIFO de logins en curso (asyncio.Semaphore)
+            inicio = time()
+            self.config.puerta_login.anotar_cola(1)
+            try:
+                await self.puerta.acquire()
+            finally:
+                self.config.puerta_login.anotar_cola(-1)
+            self.config.puerta_login.registrar_espera(time() - inicio)
+            try:
+                # Re-comprobación tras la cola: el titular de la prueba del semiabierto sigue teniendo paso
+                if not politica.permitir():
+                    self.log.error("Circuito abierto mientras se esperaba turno de login", "Login async")
+                    return False
+
+                headers = Login.HEADERS_RELOGIN if not use_cookies else {}
+
+                # Presupuesto de logins (token bucket compartido), sin bloquear el event loop
+                await sleep(self.config.limitador_tokens.reservar("login"))
+
+                async with self.http.get(self.config.eco_login_url, headers=headers) as response:
+                    await response.read()
+                    politica.registrar_respuesta(self.contexto, response.status, response.headers)
+                    if response.status != 200:
+                        self.log.error(f"Error en GET inicial: {response.status}", "Login async")
+                        return False
+
+                politica.registrar_login(self.contexto)
+                async with self.http.post(self.config.eco_login_url, data=self._get_login_payload(), headers=headers) as response:
+                    html = await response.text()
+                    politica.registrar_respuesta(self.contexto, response.status, response.headers)
+                    if response.status == 403:
+                        self.log.error("Cloudflare bloqueó el POST (403)", "POST login async")
+                        return False
+                    if "Usuario o contraseña incorrectos" in html:
+                        self.log.error("Credenciales incorrectas", "POST login async")
+                        return False
+                    if Login.es_html_logueado(html):
+                        self.log.comentario("SUCCESS", "Login exitoso (async)")
+                        self.save_cookies()
+                        return True
+
+                self.log.error("Login fallido (respuesta inesperada)", "POST login async")
+                return False
+            finally:
+                self.puerta.release()
+        except (ClientError, AsyncTimeoutError) as e:
+            # Fallo de red: el bucle de ejecutar_usuario reintenta con login fresco y backoff
+            self.log.error(f"Error de conexión: {type(e).__name__} {e}", "LOGIN ASYNC")
+            return False
+        except Exception as e:
+            self.log.error(str(e), "LOGIN ASYNC")
+            return False
+
+
+class MotorAsync:
+    """
+    Motor de ejecución asyncio: login, ObtenerTurnos y Telegram sin bloquear,
+    con todos los usuarios sobre un único event loop.
+    - MAX_WORKERS limita los usuarios en curso a la vez.
+    - MAX_CONEXIONES_HOST se aplica con el límite por host del conector compartido.
+    El procesamiento (comparación y guardado) reutiliza Ejecuciones.procesar_datos_extraidos
+    y se ejecuta en un hilo (asyncio.to_thread) para no bloquear el event loop.
+    Como EjecutorUsuarios, conserva entre llamadas a ejecutar() (modo demonio) los contextos,
+    las Ejecuciones con su calendario en memoria, la ClientSession de cada usuario, el
+    conector con sus conexiones keep-alive y el propio event loop. cerrar() los libera.
+    """
+
+    def __init__(self, config):
+        """Constructor con inyección de config"""
+        self.config = config
+        self.contextos = config.contextos()
+        self.ejecuciones = {}
+        self.sesiones = {}
+        self.loop = new_event_loop()
+        # Se crean dentro del event loop en la primera llamada a ejecutar()
+        self.conector = None
+        self.semaforo = None
+        self.puerta = None
+
+    def _ejecuciones_de(self, contexto) -> Ejecuciones:
+        """
+        Ejecuciones residente del usuario con su ExtractorCalendario (se crean en el primer ciclo).
+        En ciclos siguientes recarga calendario.json solo si cambió en disco.
+        """
+        ejecutor = self.ejecuciones.get(contexto.usuario)
+        if ejecutor is None:
+            ejecutor = Ejecuciones(self.config, contexto)
+            ejecutor.extractor_instance = ExtractorCalendario(None, self.config, contexto)
+            self.ejecuciones[contexto.usuario] = ejecutor
+        elif ejecutor.extractor_instance.nombre_usuario:
+            if ejecutor.extractor_instance.documento_usuario().sincronizar():
+                ejecutor.log.comentario("INFO", "calendario.json cambió en disco, se recargará")
+        return ejecutor
+
+    def _sesion_de(self, contexto) -> tuple:
+        """ClientSession (cookies propias sobre el conector compartido) y LoginAsync residentes del usuario"""
+        if contexto.usuario not in self.sesiones:
+            http = ClientSession(
+                connector=self.conector,
+                connector_owner=False,
+                cookie_jar=CookieJar(unsafe=True),
+                headers=Login.headers_base(self.config),
+                timeout=ClientTimeout(total=self.config.timeout)
+            )
+            self.sesiones[contexto.usuario] = (http, LoginAsync(self.config, contexto, http, self.puerta))
+        return self.sesiones[contexto.usuario]
+
+    async def _obtener_turnos(self, http: ClientSession, extractor: ExtractorCalendario):
+        """Contraparte asíncrona de ExtractorCalendario.extraer_turnos_api (sin re-login)"""
+        politica = self.config.politica_reintentos
+        if not politica.permitir():
+            extractor.log.error(f"Circuito abierto por bloqueos de Cloudflare ({politica.segundos_restantes():.0f}s restantes)", "API async")
+            return None
+        fecha_inicio, fecha_fin = extractor.rango_fechas_api()
+        extractor.log.comentario("INFO", f"📡 Consultando API de turnos (async): {fecha_inicio} a {fecha_fin}")
+        extractor.contexto.contar("peticiones_api")
+        await sleep(self.config.limitador_tokens.reservar("api"))
+        try:
+            async with http.post(
+                self.config.eco_api_turnos,
+                json={"fechaInicio": fecha_inicio, "fechaFin": fecha_fin},
+                headers=extractor.headers_api()
+            ) as response:
+                politica.registrar_respuesta(extractor.contexto, response.status, response.headers)
+                content_type = response.headers.get('Content-Type', '')
+                if not extractor.respuesta_en_streaming(response.status, content_type):
+                    texto = await response.text()
+                    return extractor.interpretar_respuesta_api(response.status, content_type, texto)
+
+                # ⚡ Cada turno se procesa según llega (ver ExtractorCalendario.lector_respuesta_api)
+                lector, turnos_por_dia = extractor.lector_respuesta_api()
+                async for trozo in response.content.iter_chunked(extractor.TROZO_API):
+                    lector.alimentar(trozo)
+                return extractor.resultado_lectura_api(lector, turnos_por_dia)
+        except (ClientError, AsyncTimeoutError) as e:
+            # Igual que extraer_turnos_api: el fallo de red se reintenta con login fresco y backoff
+            extractor.log.error(f"Error extrayendo turnos del API: {type(e).__name__} {e}", "API async")
+            return None
+
+    async def _enviar_telegram(self, http: ClientSession, ejecutor: Ejecuciones, mensaje: str, formato: str = 'Markdown'):
+        """Contraparte asíncrona de NotificadorTelegram.enviar_mensaje"""
+        notificador = ejecutor.notificador
+        try:
+            datos = {k: str(v) for k, v in notificador.datos_mensaje(mensaje, formato).items()}
+            async with http.post(notificador.url_metodo('sendMessage'), data=datos) as response:
+                response.raise_for_status()
+                self.config.log.comentario("SUCCESS", "✅ Mensaje de Telegram enviado")
+                return await response.json()
+        except Exception as e:
+            self.config.log.error(f"Error enviando mensaje a Telegram: {str(e)}", "Telegram")
+            return None
+
+    async def ejecutar_usuario(self, contexto) -> dict:
+        """Flujo completo de UN usuario: login, extracción, procesamiento y notificación"""
+        async with self.semaforo:
+            inicio = time()
+            contexto.reiniciar_metricas()
+            try:
+                ejecutor = self._ejecuciones_de(contexto)
+                extractor = ejecutor.extractor_instance
+                http, login = self._sesion_de(contexto)
+                politica = self.config.politica_reintentos
+
+                # Único bucle de reintentos (PoliticaReintentos): login + extracción,
+                # con login fresco y backoff tras cada fallo
+                resultado = {"exito": False, "error": "No se pudo hacer login"}
+                for intento in range(politica.max_intentos):
+                    await sleep(politica.espera(intento))
+                    if politica.circuito_abierto():
+                        resultado = {"exito": False, "error": "Circuito abierto por bloqueos de Cloudflare"}
+                        break
+                    if intento > 0:
+                        login.clear_session()
+
+                    # 1. Login (cookies guardadas solo en el primer intento)
+                    if not await login.login(use_cookies=intento == 0):
+                        resultado = {"exito": False, "error": "No se pudo hacer login"}
+                        continue
+
+                    # 2. Extraer
+                    data_api = await self._obtener_turnos(http, extractor)
+                    datos = await to_thread(extractor.procesar_respuesta_api, data_api) if data_api else None
+                    if not datos or datos.get("_error_session"):
+                        resultado = {"exito": False, "error": "No se pudieron obtener datos del API (sesión)"}
+                        continue
+
+                    # 3. Comparar y guardar (CPU/disco, compartido con el motor sync) en un hilo
+                    # para no frenar el event loop de los demás usuarios
+                    resultado = await to_thread(ejecutor.procesar_datos_extraidos, datos)
+                    if resultado.get("exito"):
+                        login.marcar_validada()
+                    break
+
+                # 4. Notificar por Telegram
+                if resultado.get("exito"):
+                    json_data = await to_thread(lambda: extractor.documento_usuario().datos)
+                    if json_data:
+                        await self._enviar_telegram(http, ejecutor, ejecutor.construir_mensaje_telegram(
+                            json_data,
+                            resultado["cambios_detectados"],
+                            resultado["total_cambios"],
+                            resultado["dias_con_cambios"],
+                            ejecutor.json_eliminado_por_mes,
+                            ejecutor.json_fue_eliminado
+                        ))
+                else:
+                    await self._enviar_telegram(http, ejecutor, *ejecutor.notificacion_error_proceso(contexto.usuario))
+            except Exception as e:
+                print(f"💥 Error procesando {contexto.usuario}: {e}")
+                print_exc()
+                resultado = {"exito": False, "error": str(e)}
+
+            resultado["duracion_segundos"] = round(time() - inicio, 2)
+            resultado["peticiones_api"] = contexto.peticiones_api
+            resultado["peticiones_http"] = contexto.peticiones_http
+            resultado["logins"] = contexto.logins
+            print(f"✅ {contexto.usuario}: EXITOSO" if resultado.get("exito") else f"❌ {contexto.usuario}: FALLIDO")
+            return resultado
+
+    async def ejecutar_async(self, usuarios=None) -> dict:
+        """Ejecuta todos los usuarios (o solo los indicados) en el event loop y devuelve el resumen"""
+        inicio = time()
+        if self.conector is None:
+            self.conector = TCPConnector(limit_per_host=self.config.max_conexiones_host)
+            self.semaforo = Semaphore(self.config.max_workers)
+            self.puerta = Semaphore(self.config.max_logins_simultaneos)
+        contextos = [c for c in self.contextos if usuarios is None or c.usuario in usuarios]
+        resultados = await gather(*(self.ejecutar_usuario(c) for c in contextos))
+
+        resultados = {c.usuario: r for c, r in zip(contextos, resultados)}
+        exitosos = [u for u, r in resultados.items() if r.get("exito")]
+        return {
+            "total": len(contextos),
+            "exitosos": exitosos,
+            "fallidos": [u for u in resultados if u not in exitosos],
+            "duracion_segundos": round(time() - inicio, 2),
+            "peticiones_api": sum(r.get("peticiones_api", 0) for r in resultados.values()),
+            "peticiones_http": sum(r.get("peticiones_http", 0) for r in resultados.values()),
+            "logins": sum(r.get("logins", 0) for r in resultados.values()),
+            "resultados": resultados
+        }
+
+    def ejecutar(self, usuarios=None) -> dict:
+        """Punto de entrada síncrono (misma interfaz que EjecutorUsuarios.ejecutar), sobre el event loop residente"""
+        print(f"⚡ Motor async: {self.config.max_workers} usuario(s) a la vez, máx. {self.config.max_conexiones_host} conexión(es) por host")
+        return self.loop.run_until_complete(self.ejecutar_async(usuarios))
+
+    async def _cerrar_async(self):
+        """Cierra las ClientSession de los usuarios y el conector compartido"""
+        for http, _ in self.sesiones.values():
+            await http.close()
+        self.sesiones.clear()
+        if self.conector is not None:
+            await self.conector.close()
+            self.conector = None
+
+    def cerrar(self):
+        """Libera sesiones, conexiones keep-alive y el event loop (al terminar el proceso)"""
+        if self.loop.is_closed():
+            return
+        try:
+            self.loop.run_until_complete(self._cerrar_async())
+        finally:
+            self.loop.close()
@@ -38,10 +38,7 @@ class NotificadorTelegram:
         Returns:
             dict: Respuesta de la API
         """
-        if not self.token:
-            raise Exception("❌ Token de Telegram no configurado")
-            
-        url = f"{self.api_url}{self.token}/{metodo}"
+        url = self.url_metodo(metodo)
         
         try:
             response = post(url, data=datos, timeout=30)
@@ -50,6 +47,24 @@ class NotificadorTelegram:
         except exceptions.RequestException as e:
             raise Exception(f"❌ Error en petición a Telegram: {str(e)}")
     
+    def url_metodo(self, metodo: str) -> str:
+        """URL de un método de la API de Telegram (compartida con el motor async)"""
+        if not self.token:
+            raise Exception("❌ Token de Telegram no configurado")
+        return f"{self.api_url}{self.token}/{metodo}"
+
+    def datos_mensaje(self, mensaje: str, formato: str = 'HTML', silencioso: bool = False) -> dict:
+        """Datos de la petición sendMessage (compartidos con el motor async)"""
+        if not self.chat_id:  
+            raise Exception("❌ Chat ID de Telegram no configurado")
+        
+        return {
+            'chat_id': self.chat_id,  
+            'text': mensaje,
+            'parse_mode': formato,
+            'disable_notification': silencioso
+        }
+
     def enviar_mensaje(self, mensaje: str, formato: str = 'HTML', silencioso: bool = False):
         """
         Envía un mensaje de texto a Telegram
@@ -62,15 +77,7 @@ class NotificadorTelegram:
         Returns:
             dict: Respuesta de la API
         """
-        if not self.chat_id:  
-            raise Exception("❌ Chat ID de Telegram no configurado")
-        
-        datos = {
-            'chat_id': self.chat_id,  
-            'text': mensaje,
-            'parse_mode': formato,
-            'disable_notification': silencioso
-        }
+        datos = self.datos_mensaje(mensaje, formato, silencioso)
         
         try:
             respuesta = self.__enviar_peticion('sendMessage', datos)
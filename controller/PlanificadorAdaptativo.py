@@ -0,0 +1,95 @@
+# controller/PlanificadorAdaptativo.py
+from datetime import datetime, timedelta
+from calendar import monthrange
+
+class PlanificadorAdaptativo:
+    """
+    Calcula cada cuánto consultar a UN usuario a partir del historial de cambios de su
+    calendario.json: con qué frecuencia cambia, hace cuánto fue el último cambio,
+    si los días modificados están cerca de hoy y en qué momento del mes estamos.
+    Usuarios volátiles se consultan a menudo (hasta INTERVALO_MIN) y los estables
+    rara vez (hasta INTERVALO_MAX), reduciendo las peticiones contra EcoDigital.
+    """
+
+    # Cuántas consultas se quieren, en promedio, entre dos cambios consecutivos
+    CONSULTAS_POR_CAMBIO = 4
+
+    # (horas desde el último cambio, tope como fracción de INTERVALO_MAX)
+    TOPES_RECIENTES = ((6, 0.1), (24, 0.25), (72, 0.5))
+
+    # Días que se consideran "cerca de hoy" para un cambio
+    DIAS_CERCANOS = 3
+
+    # Fin e inicio de mes: se publica/reconstruye el calendario del mes siguiente
+    DIAS_FIN_MES = 5
+    DIAS_INICIO_MES = 2
+
+    def __init__(self, config):
+        """
+        Constructor
+        Args:
+            config: Instancia de Config (intervalo, intervalo_min, intervalo_max)
+        """
+        self.config = config
+        self.intervalo_min = config.intervalo_min
+        self.intervalo_max = max(config.intervalo_max, self.intervalo_min)
+
+    @staticmethod
+    def _fechas_cambios(historial_cambios: list):
+        """Convierte el historial [{dia, fecha}] en [(dia, datetime)] descartando fechas inválidas"""
+        cambios = []
+        for entrada in historial_cambios or []:
+            try:
+                cambios.append((entrada["dia"], datetime.strptime(entrada["fecha"], "%Y-%m-%dT%H:%M:%SZ")))
+            except (KeyError, TypeError, ValueError):
+                continue
+        return cambios
+
+    def factor_mes(self, ahora: datetime) -> float:
+        """Más frecuencia al final y al inicio del mes"""
+        ultimo_dia = monthrange(ahora.year, ahora.month)[1]
+        if ahora.day > ultimo_dia - self.DIAS_FIN_MES or ahora.day <= self.DIAS_INICIO_MES:
+            return 0.5
+        return 1.0
+
+    def intervalo(self, resultado: dict, ahora: datetime = None) -> int:
+        """
+        Segundos hasta la próxima consulta del usuario.
+        Args:
+            resultado: Resultado de la última ejecución del usuario (usa exito e historial_cambios)
+            ahora: Momento de referencia (por defecto datetime.now())
+        """
+        ahora = ahora or datetime.now()
+
+        # Fallos: no alargar, reintentar al ritmo normal del demonio
+        if not resultado or not resultado.get("exito"):
+            return self._acotar(self.config.intervalo)
+
+        cambios = self._fechas_cambios(resultado.get("historial_cambios"))
+        if not cambios:
+            return self._acotar(self.intervalo_max * self.factor_mes(ahora))
+
+        # 1. Frecuencia observada: cambios por día desde el inicio del mes (el historial es mensual)
+        dias_observados = max(1.0, (ahora - ahora.replace(day=1, hour=0, minute=0, second=0, microsecond=0)).total_seconds() / 86400)
+        cambios_por_dia = len(cambios) / dias_observados
+        intervalo = 86400 / cambios_por_dia / self.CONSULTAS_POR_CAMBIO
+
+        # 2. Cambios recientes: el calendario del usuario se está moviendo ahora mismo
+        horas_ultimo_cambio = (ahora - max(fecha for _, fecha in cambios)) / timedelta(hours=1)
+        for horas, fraccion in self.TOPES_RECIENTES:
+            if horas_ultimo_cambio <= horas:
+                intervalo = min(intervalo, self.intervalo_max * fraccion)
+                break
+
+        # 3. Cambios sobre días próximos (hoy y los siguientes): son los que más importan
+        if any(0 <= dia - ahora.day <= self.DIAS_CERCANOS for dia, _ in cambios):
+            intervalo *= 0.5
+
+        # 4. Momento del mes
+        intervalo *= self.factor_mes(ahora)
+
+        return self._acotar(intervalo)
+
+    def _acotar(self, segundos: float) -> int:
+        """Limita el intervalo a [INTERVALO_MIN, INTERVALO_MAX]"""
+        return int(min(self.intervalo_max, max(self.intervalo_min, segundos)))
@@ -0,0 +1,146 @@
+# controller/PoliticaReintentos.py
+from asyncio import current_task
+from random import uniform
+from threading import Lock, get_ident
+from time import monotonic, sleep
+
+class PoliticaReintentos:
+    """
+    Política única de reintentos contra EcoDigital, compartida entre todos los usuarios
+    a través de Config:
+    - Backoff exponencial con jitter (entre la mitad y el total del tope) entre intentos.
+    - Circuit breaker global: tras N bloqueos seguidos (403/Cloudflare) deja de enviar
+      peticiones al host durante un enfriamiento; después deja pasar una de prueba y
+      solo la respuesta de esa prueba puede volver a cerrarlo.
+    - Contabiliza peticiones HTTP y logins por usuario (ContextoUsuario) para calcular
+      el factor de amplificación de cada ejecución.
+    """
+
+    ESTADOS_BLOQUEO = (403,)
+    ESTADOS_CLOUDFLARE = (429, 503)
+
+    def __init__(self, max_intentos: int = 3, espera_base: float = 5.0, espera_maxima: float = 60.0,
+                 umbral_bloqueos: int = 3, enfriamiento: float = 300.0):
+        """
+        Constructor
+        Args:
+            max_intentos: Intentos totales (login + extracción) por usuario y ejecución
+            espera_base: Segundos base del backoff (se duplica en cada intento)
+            espera_maxima: Tope de la espera entre intentos
+            umbral_bloqueos: Bloqueos seguidos que abren el circuito
+            enfriamiento: Segundos que el circuito permanece abierto
+        """
+        self.max_intentos = max(1, int(max_intentos))
+        self.espera_base = max(0.0, float(espera_base))
+        self.espera_maxima = max(self.espera_base, float(espera_maxima))
+        self.umbral_bloqueos = max(1, int(umbral_bloqueos))
+        self.enfriamiento = max(0.0, float(enfriamiento))
+
+        self.__lock = Lock()
+        self.__bloqueos_seguidos = 0
+        self.__abierto_hasta = 0.0
+        # Hilo/tarea asyncio que recibió la petición de prueba del semiabierto
+        self.__prueba = None
+        self.aperturas = 0
+
+    @staticmethod
+    def _llamador() -> tuple:
+        """Identifica al hilo (y a la tarea asyncio, si la hay) que hace la llamada"""
+        try:
+            tarea = current_task()
+        except RuntimeError:
+            tarea = None
+        return get_ident(), tarea
+
+    def espera(self, intento: int) -> float:
+        """Segundos a esperar antes del intento `intento` (0 = primero, sin espera)"""
+        if intento <= 0:
+            return 0.0
+        tope = min(self.espera_maxima, self.espera_base * (2 ** (intento - 1)))
+        return uniform(tope / 2, tope)
+
+    def esperar(self, intento: int, log=None) -> bool:
+        """
+        Duerme el backoff del intento. Retorna False si el circuito sigue abierto
+        (no tiene sentido reintentar todavía). No consume la petición de prueba.
+        """
+        segundos = self.espera(intento)
+        if segundos:
+            if log:
+                log.comentario("INFO", f"⏳ Reintento {intento + 1}/{self.max_intentos} en {segundos:.1f}s")
+            sleep(segundos)
+        return not self.circuito_abierto()
+
+    def permitir(self) -> bool:
+        """
+        True si se pueden enviar peticiones al host (circuito cerrado o en prueba).
+        Quien recibió la petición de prueba sigue teniendo paso mientras no llegue su
+        respuesta: un login con cookies confiables no envía nada y la prueba es la extracción.
+        """
+        with self.__lock:
+            if self.__abierto_hasta == 0.0:
+                return True
+            if monotonic() < self.__abierto_hasta:
+                return self.__prueba is not None and self.__prueba == self._llamador()
+            # Semiabierto: deja pasar una única petición de prueba y rearma el enfriamiento;
+            # si la prueba responde bien, registrar_respuesta cierra el circuito
+            self.__abierto_hasta = monotonic() + self.enfriamiento
+            self.__prueba = self._llamador()
+            return True
+
+    def circuito_abierto(self) -> bool:
+        """True si el circuito está abierto y aún en enfriamiento"""
+        with self.__lock:
+            return self.__abierto_hasta != 0.0 and monotonic() < self.__abierto_hasta
+
+    def segundos_restantes(self) -> float:
+        """Segundos de enfriamiento que le quedan al circuito abierto"""
+        with self.__lock:
+            return max(0.0, self.__abierto_hasta - monotonic())
+
+    @classmethod
+    def es_bloqueo(cls, status_code: int, headers=None) -> bool:
+        """403, o 429/503 servidos por Cloudflare (challenge / rate limit)"""
+        if status_code in cls.ESTADOS_BLOQUEO:
+            return True
+        if status_code in cls.ESTADOS_CLOUDFLARE and headers is not None:
+            servidor = str(headers.get('Server', '') or headers.get('server', '')).lower()
+            return 'cloudflare' in servidor or 'cf-mitigated' in {k.lower() for k in headers.keys()}
+        return False
+
+    def registrar_respuesta(self, contexto, status_code: int, headers=None) -> bool:
+        """
+        Registra una respuesta de EcoDigital: cuenta la petición del usuario y alimenta
+        el circuit breaker. Con el circuito abierto, una respuesta correcta solo lo cierra
+        si es la de la petición de prueba (no una tardía enviada antes de abrirse).
+        Retorna True si la respuesta fue un bloqueo.
+        """
+        if contexto is not None:
+            contexto.contar("peticiones_http")
+        bloqueo = self.es_bloqueo(status_code, headers)
+        llamador = self._llamador()
+        with self.__lock:
+            es_prueba = self.__prueba is not None and self.__prueba == llamador
+            if es_prueba:
+                self.__prueba = None
+            if not bloqueo:
+                if self.__abierto_hasta == 0.0 or es_prueba:
+                    self.__bloqueos_seguidos = 0
+                    self.__abierto_hasta = 0.0
+                return False
+            self.__bloqueos_seguidos += 1
+            if self.__bloqueos_seguidos >= self.umbral_bloqueos:
+                self.__abierto_hasta = monotonic() + self.enfriamiento
+                self.aperturas += 1
+                print(f"🚧 Circuito abierto: {self.__bloqueos_seguidos} bloqueo(s) seguidos, pausa de {self.enfriamiento:.0f}s")
+            return True
+
+    def registrar_login(self, contexto):
+        """Cuenta un login con credenciales (POST) del usuario"""
+        if contexto is not None:
+            contexto.contar("logins")
+
+    @staticmethod
+    def amplificacion(peticiones_http: int, usuarios: int) -> float:
+        """Peticiones HTTP reales por cada petición útil (1 ObtenerTurnos por usuario)"""
+        return peticiones_http / usuarios if usuarios else 0.0
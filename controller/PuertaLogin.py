@@ -0,0 +1,83 @@
+# controller/PuertaLogin.py
+from collections import deque
+from contextlib import contextmanager
+from threading import Condition
+from time import monotonic
+
+class PuertaLogin:
+    """
+    Limita cuántos logins con credenciales (GET + POST) hay en curso a la vez,
+    independiente del tráfico normal del API.
+    Los hilos esperan en una cola FIFO: tras una caducidad masiva (cambio de mes,
+    reinicio de EcoDigital) los logins salen como un goteo constante en lugar de una
+    ráfaga que dispare los 403 de Cloudflare. Se comparte entre hilos a través de Config.
+    """
+
+    def __init__(self, max_simultaneos: int = 1):
+        """
+        Constructor
+        Args:
+            max_simultaneos: Logins con credenciales en curso a la vez
+        """
+        self.max_simultaneos = max(1, int(max_simultaneos))
+        self.__condicion = Condition()
+        self.__cola = deque()
+        self.__en_curso = 0
+        self.__en_espera_async = 0
+        self.logins = 0
+        self.esperas = 0
+        self.segundos_esperados = 0.0
+        self.espera_maxima = 0.0
+        self.cola_maxima = 0
+
+    def anotar_cola(self, delta: int):
+        """Ajusta los logins en espera (+1 al llegar, -1 al pasar) del motor async"""
+        with self.__condicion:
+            self.__en_espera_async += delta
+            self.cola_maxima = max(self.cola_maxima, self.__en_espera_async)
+
+    def registrar_espera(self, segundos: float):
+        """Acumula la espera de un login (la usa también el motor async con su propio semáforo)"""
+        with self.__condicion:
+            self.logins += 1
+            if segundos > 0.001:
+                self.esperas += 1
+                self.segundos_esperados += segundos
+                self.espera_maxima = max(self.espera_maxima, segundos)
+
+    @contextmanager
+    def pasar(self, log=None):
+        """
+        Bloquea hasta que sea el turno de este login (orden de llegada).
+        Uso:
+            with config.puerta_login.pasar(log):
+                ... GET + POST de login ...
+        """
+        inicio = monotonic()
+        turno = object()
+        with self.__condicion:
+            self.__cola.append(turno)
+            self.cola_maxima = max(self.cola_maxima, len(self.__cola))
+            if log and (self.__en_curso >= self.max_simultaneos or self.__cola[0] is not turno):
+                log.comentario("INFO", f"🚪 En cola para login ({len(self.__cola) - 1} por delante)")
+            while self.__en_curso >= self.max_simultaneos or self.__cola[0] is not turno:
+                self.__condicion.wait()
+            self.__cola.popleft()
+            self.__en_curso += 1
+            # El siguiente de la cola puede tener cupo también
+            self.__condicion.notify_all()
+        self.registrar_espera(monotonic() - inicio)
+        try:
+            yield
+        finally:
+            with self.__condicion:
+                self.__en_curso -= 1
+                self.__condicion.notify_all()
+
+    def resumen(self) -> str:
+        """Texto breve con los logins y las esperas en la puerta"""
+        media = self.segundos_esperados / self.esperas if self.esperas else 0.0
+        return (
+            f"{self.logins} login(s), {self.esperas} en cola, espera media {media:.1f}s, "
+            f"máx. {self.espera_maxima:.1f}s, cola máx. {self.cola_maxima}"
+        )
@@ -0,0 +1,128 @@
+# controller/RefrescadorSesiones.py
+from datetime import datetime
+from time import time
+from traceback import print_exc
+
+from controller.Login import Login
+
+class RefrescadorSesiones:
+    """
+    Renovación proactiva de sesiones en modo demonio.
+    Aprovecha el tiempo libre entre ciclos para revalidar (y, si murieron, volver a
+    loguear) las sesiones que caducarían antes del próximo ciclo: validación más antigua
+    que COOKIES_VALIDEZ o cookies a punto de vencer. Las renovaciones se reparten a lo
+    largo de la espera, así la extracción programada casi siempre encuentra una sesión
+    válida y no paga el NOSESS + login fresco en el camino crítico.
+    """
+
+    # Segundos libres que se dejan antes del próximo ciclo (no renovar encima de él)
+    RESERVA_SEGUNDOS = 10
+
+    def __init__(self, config):
+        """
+        Constructor
+        Args:
+            config: Instancia de Config (almacen_sesiones, gestor_sesiones, cookies_validez, refresco_margen)
+        """
+        self.config = config
+        self.contextos = {c.usuario: c for c in config.contextos()}
+        self.revalidadas = 0
+        self.relogueadas = 0
+        self.fallidas = 0
+
+    def caducidad(self, usuario: str):
+        """
+        Momento (epoch) en que la sesión guardada del usuario deja de servir sin revalidar.
+        None si no tiene sesión guardada (la creará el propio ciclo).
+        """
+        almacen = self.config.almacen_sesiones
+        cookies, validada_en = almacen.leer(usuario)
+        if not cookies:
+            return None
+        vence = (validada_en or 0) + self.config.cookies_validez
+        expiracion = almacen.expiracion(cookies)
+        return min(vence, expiracion) if expiracion is not None else vence
+
+    def pendientes(self, horizonte: float, excluir=()) -> list:
+        """Contextos cuya sesión caducará antes de `horizonte` (epoch) más el margen"""
+        limite = horizonte + self.config.refresco_margen
+        pendientes = []
+        for usuario, contexto in self.contextos.items():
+            if usuario in excluir:
+                continue
+            caducidad = self.caducidad(usuario)
+            if caducidad is not None and caducidad <= limite:
+                pendientes.append(contexto)
+        return pendientes
+
+    def refrescar(self, contexto) -> bool:
+        """
+        Revalida la sesión del usuario; si ya no sirve hace login fresco.
+        La sesión resultante queda en el GestorSesiones para el próximo ciclo.
+        """
+        gestor = self.config.gestor_sesiones
+        usuario = contexto.usuario
+        try:
+            login = gestor.obtener(usuario)
+            if login is not None and login.get_session().cookies:
+                # Sesión caliente: sonda barata contra el API. Forzada: la validación en caché
+                # daría True sin petición y la sesión caducaría igualmente antes del ciclo
+                if login.validar_sesion_api(forzar=True):
+                    self.revalidadas += 1
+                    return True
+                ok = login.login(use_cookies=False)
+            else:
+                # Sin sesión en memoria: cookies guardadas (se validan) o login fresco
+                login = Login(self.config, contexto)
+                ok = login.login(use_cookies=True)
+
+            if ok and contexto.logins:
+                self.relogueadas += 1
+            elif ok:
+                self.revalidadas += 1
+            if ok:
+                gestor.guardar(usuario, login)
+            else:
+                gestor.descartar(usuario)
+                self.fallidas += 1
+            return ok
+        except Exception as e:
+            print(f"💥 Error renovando la sesión de {usuario}: {e}")
+            print_exc()
+            self.fallidas += 1
+            return False
+
+    def refrescar_hasta(self, proxima: datetime, detener, excluir=()) -> bool:
+        """
+        Espera hasta 'proxima' renovando por el camino las sesiones que caducarían antes,
+        repartidas uniformemente en el tiempo libre.
+        Args:
+            proxima: Inicio del próximo ciclo
+            detener: Event de parada del demonio
+            excluir: Usuarios que se ejecutan en el próximo ciclo de todos modos
+        Retorna: False si se pidió detener durante la espera
+        """
+        pendientes = self.pendientes(proxima.timestamp(), excluir)
+        if pendientes:
+            print(f"🔄 {len(pendientes)} sesión(es) se renovarán antes del próximo ciclo")
+
+        for i, contexto in enumerate(pendientes):
+            libre = (proxima - datetime.now()).total_seconds() - self.RESERVA_SEGUNDOS
+            if libre <= 0:
+                break
+            if detener.wait(libre / (len(pendientes) - i + 1)):
+                return False
+            if self.config.politica_reintentos.circuito_abierto():
+                print("🚧 Circuito abierto - se pospone la renovación de sesiones")
+                break
+            contexto.reiniciar_metricas()
+            inicio = time()
+            ok = self.refrescar(contexto)
+            print(f"{'🔑' if ok else '⚠️ '} Sesión de {contexto.usuario} {'renovada' if ok else 'sin renovar'} ({time() - inicio:.1f}s)")
+
+        espera = (proxima - datetime.now()).total_seconds()
+        return not (espera > 0 and detener.wait(espera))
+
+    def resumen(self) -> str:
+        """Texto breve con las renovaciones acumuladas"""
+        return f"{self.revalidadas} revalidada(s), {self.relogueadas} con login fresco, {self.fallidas} fallida(s)"
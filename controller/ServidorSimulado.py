@@ -0,0 +1,286 @@
+# controller/ServidorSimulado.py
+from datetime import datetime, timedelta
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from json import dumps, loads
+from random import Random
+from secrets import token_hex
+from threading import Lock, Thread
+from time import monotonic, sleep
+from urllib.parse import parse_qs, urlsplit
+
+class ServidorSimulado(ThreadingHTTPServer):
+    """
+    Servidor HTTP local que imita a EcoDigital para pruebas de carga sin red:
+    página de login de /WebEcoPresencia/, POST de credenciales, página Master y
+    Asesor/ObtenerTurnos con turnos sintéticos por usuario.
+    Permite inyectar latencia, respuestas NOSESS, bloqueos 403 de "Cloudflare",
+    caducidad de sesiones y cambios de turnos. Apuntando ECO_BASE_URL a él se
+    ejercitan Login, ExtractorCalendario y los reintentos con login fresco.
+    """
+
+    daemon_threads = True
+
+    RUTA_BASE = "/WebEcoPresencia/"
+    RUTA_MASTER = "/WebEcoPresencia/Master"
+    RUTA_API = "/WebEcoPresencia/Asesor/ObtenerTurnos"
+
+    HTML_LOGIN = (
+        '<html><head><title>EcoPresencia</title></head><body>'
+        '<form method="post"><input name="UsuarioLogado.Login"><input name="UsuarioLogado.Password"></form>'
+        '</body></html>'
+    )
+    HTML_MASTER = (
+        '<html><head><title>EcoPresencia</title><base href="/WebEcoPresencia/Master#/TurnosAsesor"></head><body>'
+        '<div id="fc-btnVerCalendarioTurnos-button"></div>{relleno}</body></html>'
+    )
+    HTML_CREDENCIALES = '<html><body><div class="error">Usuario o contraseña incorrectos</div></body></html>'
+
+    # Horas de entrada y duraciones posibles de los turnos sintéticos
+    ENTRADAS = (6, 7, 8, 9, 10, 14)
+    DURACIONES = (6, 8)
+
+    def __init__(self, puerto: int = 8700, host: str = "127.0.0.1", usuarios: int = 10,
+                 latencia_ms: float = 0.0, tasa_nosess: float = 0.0, tasa_bloqueo: float = 0.0,
+                 vida_sesion: float = 0.0, tasa_cambios: float = 0.0, relleno_kb: int = 0, semilla: int = 0):
+        """
+        Constructor
+        Args:
+            puerto: Puerto de escucha (0 = uno libre)
+            host: Interfaz de escucha
+            usuarios: Usuarios sintéticos (asesorN@eco.local / claveN)
+            latencia_ms: Latencia añadida a cada respuesta (con ±25% de variación)
+            tasa_nosess: Probabilidad de que ObtenerTurnos responda NOSESS (invalida la sesión)
+            tasa_bloqueo: Probabilidad de responder 403 de Cloudflare a cualquier petición
+            vida_sesion: Segundos de vida de una sesión desde el login (0 = sin caducidad)
+            tasa_cambios: Probabilidad por consulta de que cambie un turno del usuario
+            relleno_kb: KB de relleno tras el marcador en la página Master (páginas pesadas)
+            semilla: Semilla de los turnos y de las inyecciones de fallos
+        """
+        super().__init__((host, puerto), ManejadorEco)
+        self.usuarios = {f"asesor{i}@eco.local": f"clave{i}" for i in range(1, max(1, int(usuarios)) + 1)}
+        self.latencia = max(0.0, float(latencia_ms)) / 1000
+        self.tasa_nosess = float(tasa_nosess)
+        self.tasa_bloqueo = float(tasa_bloqueo)
+        self.vida_sesion = float(vida_sesion)
+        self.tasa_cambios = float(tasa_cambios)
+        self.html_master = self.HTML_MASTER.format(relleno="<!-- " + "x" * (int(relleno_kb) * 1024) + " -->" if relleno_kb else "")
+        self.semilla = semilla
+        self.__azar = Random(semilla)
+        self.__lock = Lock()
+        self.__sesiones = {}   # token -> (usuario, creada)
+        self.__cambios = {}    # (usuario, fecha) -> desplazamiento en horas
+        self.contadores = {
+            "login_get": 0, "login_post": 0, "master": 0, "api": 0,
+            "nosess": 0, "bloqueos": 0, "credenciales_invalidas": 0, "cambios": 0,
+        }
+
+    @property
+    def url_base(self) -> str:
+        """URL para ECO_BASE_URL"""
+        host, puerto = self.server_address[:2]
+        return f"http://{host}:{puerto}"
+
+    def credenciales_env(self) -> dict:
+        """USERS_ECO y PASSWDS_ECO para los usuarios sintéticos"""
+        return {
+            "USERS_ECO": ",".join(self.usuarios),
+            "PASSWDS_ECO": ",".join(self.usuarios.values()),
+        }
+
+    def iniciar(self) -> Thread:
+        """Arranca el servidor en un hilo en segundo plano"""
+        hilo = Thread(target=self.serve_forever, name="servidor-simulado", daemon=True)
+        hilo.start()
+        return hilo
+
+    def detener(self):
+        """Detiene el servidor y libera el puerto"""
+        self.shutdown()
+        self.server_close()
+
+    def contar(self, clave: str):
+        """Incrementa un contador de peticiones"""
+        with self.__lock:
+            self.contadores[clave] += 1
+
+    def azar(self, probabilidad: float) -> bool:
+        """True con la probabilidad indicada"""
+        if probabilidad <= 0:
+            return False
+        with self.__lock:
+            return self.__azar.random() < probabilidad
+
+    def esperar_latencia(self):
+        """Duerme la latencia configurada"""
+        if self.latencia:
+            with self.__lock:
+                factor = self.__azar.uniform(0.75, 1.25)
+            sleep(self.latencia * factor)
+
+    def crear_sesion(self, usuario: str) -> str:
+        """Registra una sesión nueva y devuelve su token"""
+        token = token_hex(16)
+        with self.__lock:
+            self.__sesiones[token] = (usuario, monotonic())
+        return token
+
+    def usuario_sesion(self, token: str):
+        """Usuario de una sesión vigente o None"""
+        with self.__lock:
+            sesion = self.__sesiones.get(token)
+            if not sesion:
+                return None
+            usuario, creada = sesion
+            if self.vida_sesion and monotonic() - creada > self.vida_sesion:
+                del self.__sesiones[token]
+                return None
+            return usuario
+
+    def invalidar_sesion(self, token: str):
+        """Descarta una sesión (el siguiente uso recibe NOSESS)"""
+        with self.__lock:
+            self.__sesiones.pop(token, None)
+
+    def _turno(self, usuario: str, fecha: datetime) -> dict:
+        """Turno sintético (determinista por usuario y día, más los cambios inyectados)"""
+        azar = Random(f"{self.semilla}|{usuario}|{fecha:%Y-%m-%d}")
+        numero = usuario.split("@")[0].replace("asesor", "")
+        libres = {int(numero or 0) % 7, (int(numero or 0) + 3) % 7}
+        with self.__lock:
+            desplazamiento = self.__cambios.get((usuario, fecha.date()), 0)
+        entrada = fecha.replace(hour=azar.choice(self.ENTRADAS), minute=0) + timedelta(hours=desplazamiento)
+        salida = entrada + timedelta(hours=azar.choice(self.DURACIONES))
+        descanso = entrada + (salida - entrada) / 2
+        return {
+            "Asesor": {"NombreCompleto": f"Asesor Simulado {numero}"},
+            "FechaHoraEntradaString": entrada.strftime("%Y-%m-%d %H:%M"),
+            "FechaHoraSalidaString": salida.strftime("%Y-%m-%d %H:%M"),
+            "HoraDescanso1Entrada": f"/Date({int(descanso.timestamp() * 1000)})/",
+            "HoraDescanso1Salida": f"/Date({int((descanso + timedelta(minutes=20)).timestamp() * 1000)})/",
+            "Novedad": {"Codigo": "LIBRE"} if fecha.weekday() in libres else None,
+        }
+
+    def turnos(self, usuario: str, fecha_inicio: str, fecha_fin: str) -> dict:
+        """Cuerpo de ObtenerTurnos para el rango (fechas d/m/aaaa, ambos extremos incluidos)"""
+        inicio = datetime.strptime(fecha_inicio, "%d/%m/%Y")
+        fin = datetime.strptime(fecha_fin, "%d/%m/%Y")
+        if self.azar(self.tasa_cambios) and fin >= inicio:
+            with self.__lock:
+                dia = (inicio + timedelta(days=self.__azar.randrange((fin - inicio).days + 1))).date()
+                self.__cambios[(usuario, dia)] = self.__cambios.get((usuario, dia), 0) + 1
+            self.contar("cambios")
+        turnos = []
+        fecha = inicio
+        while fecha <= fin:
+            turnos.append(self._turno(usuario, fecha))
+            fecha += timedelta(days=1)
+        return {"turnos": turnos, "eventos": []}
+
+    def resumen(self) -> str:
+        """Texto con los contadores de peticiones"""
+        return ", ".join(f"{clave}: {valor}" for clave, valor in self.contadores.items())
+
+
+class ManejadorEco(BaseHTTPRequestHandler):
+    """Atiende las rutas de EcoDigital sobre el estado de ServidorSimulado"""
+
+    protocol_version = "HTTP/1.1"
+    server: ServidorSimulado
+
+    def log_message(self, formato, *args):
+        """Sin log por petición (ensuciaría las pruebas de carga)"""
+
+    def _responder(self, estado: int, cuerpo: str, tipo: str = "text/html; charset=utf-8", cookies: dict = None, cabeceras: dict = None):
+        """Envía la respuesta con Content-Length (keep-alive)"""
+        datos = cuerpo.encode("utf-8")
+        self.send_response(estado)
+        self.send_header("Content-Type", tipo)
+        self.send_header("Content-Length", str(len(datos)))
+        for nombre, valor in (cookies or {}).items():
+            self.send_header("Set-Cookie", f"{nombre}={valor}; Path=/; HttpOnly")
+        for nombre, valor in (cabeceras or {}).items():
+            self.send_header(nombre, valor)
+        self.end_headers()
+        self.wfile.write(datos)
+
+    def _cuerpo(self) -> bytes:
+        """Lee el cuerpo de la petición"""
+        longitud = int(self.headers.get("Content-Length") or 0)
+        return self.rfile.read(longitud) if longitud else b""
+
+    def _token(self) -> str:
+        """Token de sesión de la cookie ASP.NET_SessionId"""
+        for parte in (self.headers.get("Cookie") or "").split(";"):
+            nombre, _, valor = parte.strip().partition("=")
+            if nombre == "ASP.NET_SessionId":
+                return valor
+        return ""
+
+    def _bloqueado(self) -> bool:
+        """Inyecta un 403 de Cloudflare según tasa_bloqueo"""
+        if not self.server.azar(self.server.tasa_bloqueo):
+            return False
+        self.server.contar("bloqueos")
+        self._responder(403, "<html><body>Attention Required! | Cloudflare</body></html>",
+                        cabeceras={"Server": "cloudflare", "cf-mitigated": "challenge"})
+        return True
+
+    def do_GET(self):
+        """Página de login y página Master"""
+        self.server.esperar_latencia()
+        ruta = urlsplit(self.path).path
+        if self._bloqueado():
+            return
+        if ruta == self.server.RUTA_BASE:
+            self.server.contar("login_get")
+            self._responder(200, self.server.HTML_LOGIN, cookies={"__cf_bm": token_hex(8)})
+        elif ruta == self.server.RUTA_MASTER:
+            self.server.contar("master")
+            logueado = self.server.usuario_sesion(self._token())
+            self._responder(200, self.server.html_master if logueado else self.server.HTML_LOGIN)
+        else:
+            self._responder(404, "Not Found")
+
+    def do_POST(self):
+        """POST de credenciales y Asesor/ObtenerTurnos"""
+        self.server.esperar_latencia()
+        ruta = urlsplit(self.path).path
+        cuerpo = self._cuerpo()
+        if self._bloqueado():
+            return
+        if ruta == self.server.RUTA_BASE:
+            self._login(cuerpo)
+        elif ruta == self.server.RUTA_API:
+            self._obtener_turnos(cuerpo)
+        else:
+            self._responder(404, "Not Found")
+
+    def _login(self, cuerpo: bytes):
+        """Valida las credenciales del formulario y abre sesión"""
+        self.server.contar("login_post")
+        formulario = {k: v[0] for k, v in parse_qs(cuerpo.decode("utf-8")).items()}
+        usuario = formulario.get("UsuarioLogado.Login", "")
+        if self.server.usuarios.get(usuario) != formulario.get("UsuarioLogado.Password"):
+            self.server.contar("credenciales_invalidas")
+            self._responder(200, self.server.HTML_CREDENCIALES)
+            return
+        token = self.server.crear_sesion(usuario)
+        self._responder(200, self.server.html_master, cookies={"ASP.NET_SessionId": token})
+
+    def _obtener_turnos(self, cuerpo: bytes):
+        """Turnos del usuario de la sesión, o NOSESS si no hay sesión (o se inyecta)"""
+        self.server.contar("api")
+        token = self._token()
+        usuario = self.server.usuario_sesion(token)
+        if not usuario or self.server.azar(self.server.tasa_nosess):
+            self.server.invalidar_sesion(token)
+            self.server.contar("nosess")
+            self._responder(200, "NOSESS", tipo="text/plain; charset=utf-8")
+            return
+        try:
+            peticion = loads(cuerpo or b"{}")
+            datos = self.server.turnos(usuario, peticion["fechaInicio"], peticion["fechaFin"])
+        except (KeyError, ValueError) as e:
+            self._responder(500, f"Petición inválida: {e}", tipo="text/plain; charset=utf-8")
+            return
+        self._responder(200, dumps(datos), tipo="application/json; charset=utf-8")
@@ -0,0 +1,87 @@
+# controller/TransporteHttp.py
+from threading import Lock
+
+from requests import Session
+from requests.adapters import HTTPAdapter
+
+from controller.GrabacionHttp import AdaptadorGrabacion, AdaptadorReproduccion
+
+class SesionUsuario(Session):
+    """
+    Session de requests con cookies propias de UN usuario montada sobre el
+    adaptador (pool de conexiones) compartido de TransporteHttp.
+    close() libera solo lo del usuario: el pool compartido sigue vivo.
+    """
+
+    def close(self):
+        """Descarta las cookies del usuario sin cerrar las conexiones compartidas"""
+        self.cookies.clear()
+
+
+class TransporteHttp:
+    """
+    Capa de transporte HTTP compartida por todos los usuarios.
+    Un único HTTPAdapter mantiene el pool de conexiones keep-alive (DNS, TCP y TLS
+    se pagan una vez por conexión, no por usuario ni por reintento) y cada usuario
+    recibe una SesionUsuario con su propio cookie jar.
+    Los reintentos a nivel de adaptador están desactivados: los decide PoliticaReintentos.
+    Con MODO_HTTP=grabar las respuestas de cada usuario se guardan en FIXTURES_DIR (sin
+    credenciales) y con MODO_HTTP=reproducir se sirven desde ahí sin red (GrabacionHttp).
+    """
+
+    MODOS = ("", "grabar", "reproducir")
+
+    def __init__(self, max_conexiones_host: int = 4, max_hosts: int = 4, modo: str = "", directorio_grabaciones: str = "./fixtures"):
+        """
+        Constructor
+        Args:
+            max_conexiones_host: Conexiones keep-alive que se conservan por host
+            max_hosts: Hosts distintos con pool propio
+            modo: "" (red), "grabar" o "reproducir"
+            directorio_grabaciones: Carpeta de las grabaciones por usuario
+        """
+        if modo not in self.MODOS:
+            raise ValueError(f"MODO_HTTP inválido: {modo!r} (opciones: grabar, reproducir)")
+        self.modo = modo
+        self.directorio_grabaciones = directorio_grabaciones
+        # Un adaptador de grabación/reproducción por usuario: conserva el orden entre sesiones
+        self.__adaptadores_usuario = {}
+        self.__lock = Lock()
+        self.adaptador = HTTPAdapter(
+            pool_connections=max(1, int(max_hosts)),
+            pool_maxsize=max(1, int(max_conexiones_host)),
+            max_retries=0,
+            pool_block=False
+        )
+        self.sesiones_creadas = 0
+
+    def _adaptador_de(self, contexto):
+        """Adaptador para las sesiones del usuario según el modo"""
+        if not self.modo or contexto is None:
+            return self.adaptador
+        with self.__lock:
+            if contexto.usuario not in self.__adaptadores_usuario:
+                if self.modo == "grabar":
+                    adaptador = AdaptadorGrabacion(self.adaptador, self.directorio_grabaciones, contexto.usuario, contexto.password)
+                else:
+                    adaptador = AdaptadorReproduccion(self.directorio_grabaciones, contexto.usuario)
+                self.__adaptadores_usuario[contexto.usuario] = adaptador
+            return self.__adaptadores_usuario[contexto.usuario]
+
+    def nueva_sesion(self, headers: dict = None, contexto=None) -> SesionUsuario:
+        """
+        Crea una sesión con cookies aisladas que reutiliza las conexiones del pool
+        (o graba/reproduce las respuestas del usuario del contexto según MODO_HTTP)
+        """
+        adaptador = self._adaptador_de(contexto)
+        sesion = SesionUsuario()
+        sesion.mount("https://", adaptador)
+        sesion.mount("http://", adaptador)
+        if headers:
+            sesion.headers.update(headers)
+        self.sesiones_creadas += 1
+        return sesion
+
+    def cerrar(self):
+        """Cierra todas las conexiones del pool (al terminar el proceso)"""
+        self.adaptador.close()
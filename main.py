@@ -1,63 +1,127 @@
 # main.py
+from argparse import ArgumentParser, ArgumentTypeError
+from calendar import monthrange
+from datetime import date, datetime
+
 from controller.Config import Config
-from controller.Ejecucion import Ejecuciones
-from time import sleep
-from random import uniform
-from traceback import print_exc
+from controller.Demonio import Demonio
+from controller.EjecutorUsuarios import EjecutorUsuarios
+
+def fecha_argumento(texto: str) -> date:
+    """Fecha de --desde/--hasta: AAAA-MM-DD o AAAA-MM (el mes completo)"""
+    for formato in ("%Y-%m-%d", "%Y-%m"):
+        try:
+            return datetime.strptime(texto, formato).date()
+        except ValueError:
+            continue
+    raise ArgumentTypeError(f"Fecha inválida: {texto!r} (usa AAAA-MM-DD o AAAA-MM)")
+
+def parsear_argumentos(config):
+    """Argumentos de línea de comandos (sobrescriben las variables de entorno)"""
+    parser = ArgumentParser(description="Extractor de turnos EcoDigital")
+    parser.add_argument(
+        "--motor",
+        choices=("hilos", "async"),
+        default=config.motor,
+        help="Motor de ejecución: hilos (requests + pool de hilos) o async (asyncio + aiohttp)"
+    )
+    parser.add_argument(
+        "--daemon",
+        action="store_true",
+        help="Mantener el proceso vivo y repetir la ejecución periódicamente"
+    )
+    parser.add_argument(
+        "--intervalo",
+        type=int,
+        default=config.intervalo,
+        help="Segundos entre ciclos en modo demonio (INTERVALO)"
+    )
+    parser.add_argument(
+        "--cron",
+        default=config.cron,
+        help="Expresión cron de 5 campos para el modo demonio (CRON), p. ej. '*/15 6-22 * * *'"
+    )
+    parser.add_argument(
+        "--adaptativo",
+        action="store_true",
+        default=config.adaptativo,
+        help="Modo demonio con intervalo propio por usuario según su historial de cambios (ADAPTATIVO)"
+    )
+    parser.add_argument(
+        "--desde",
+        type=fecha_argumento,
+        help="Extraer un rango de fechas (AAAA-MM o AAAA-MM-DD) en un calendario_AAAA_MM.json por mes"
+    )
+    parser.add_argument(
+        "--hasta",
+        type=fecha_argumento,
+        help="Fin del rango de --desde (por defecto, el mes actual)"
+    )
+    argumentos = parser.parse_args()
+    if argumentos.desde or argumentos.hasta:
+        if argumentos.daemon:
+            parser.error("--desde/--hasta no se combinan con --daemon")
+        hoy = date.today()
+        argumentos.desde = argumentos.desde or hoy.replace(day=1)
+        argumentos.hasta = argumentos.hasta or hoy.replace(day=monthrange(hoy.year, hoy.month)[1])
+        if argumentos.hasta < argumentos.desde:
+            parser.error("--hasta es anterior a --desde")
+    return argumentos
 
 def main():
     # 1. Cargar configuración base
     config = Config()
-    
+    argumentos = parsear_argumentos(config)
+
     # 2. Verificar usuarios
     if not config.users_eco:
         print("❌ No hay usuarios configurados")
         return
-    
+
     total_usuarios = len(config.users_eco)
     print(f"\n{'='*60}")
     print(f"🚀 INICIANDO EJECUCIÓN PARA {total_usuarios} USUARIO(S)")
     print(f"{'='*60}")
-  
-    # 3. Iterar sobre cada usuario
-    for i in range(total_usuarios):
-        # Obtener credenciales de este usuario
-        usuario = config.users_eco[i]
-        password = config.passwds_eco[i]
-        
-        # ASIGNAR ESTE USUARIO COMO ACTUAL
-        config.user_eco = usuario
-        config.ps_eco = password
-        
-        try:
-            # Ejecutar el flujo para ESTE usuario
-            ejecutor = Ejecuciones(config)
-            resultado = ejecutor.ejecutar_flujo_completo()
-            # 🔥 Si falla por sesión, intentar una vez más con login fresco
-            if not resultado.get("exito"):
-                error_msg = str(resultado.get("error", ""))
-                if "NOSESS" in error_msg or "sesión" in error_msg.lower() or "login" in error_msg.lower():
-                    if hasattr(ejecutor, 'login_instance') and ejecutor.login_instance:
-                        ejecutor.login_instance.session.cookies.clear()
-                    resultado_reintento = ejecutor.ejecuta_login_y_extraccion()
-                    # Normalizar también el reintento
-                    if isinstance(resultado_reintento, bool):
-                        resultado = {"exito": resultado_reintento, "error": None if resultado_reintento else "Reintento fallido"}
-                    else:
-                        resultado = resultado_reintento
-            
-            print(f"✅ {usuario}: EXITOSO" if resultado and resultado.get("exito") else f"❌ {usuario}: FALLIDO")
-            
-        except Exception as e:
-            print(f"💥 Error procesando {usuario}: {e}")
-            print_exc()
-        
-        # Pausa entre usuarios (excepto el último)
-        if i < total_usuarios - 1:
-            pausa = uniform(3, 6)
-            print(f"⏳ Esperando {pausa:.1f}s antes del siguiente usuario...")
-            sleep(pausa)
-    
+
+    # 3. Ejecutar el flujo para cada usuario (secuencial o concurrente según MAX_WORKERS)
+    ejecutor = EjecutorUsuarios(config)
+    motor_async = None
+    if argumentos.motor == "async" and not argumentos.desde:
+        # aiohttp solo se importa si se elige el motor async
+        from controller.MotorAsync import MotorAsync
+        motor_async = MotorAsync(config)
+        ejecutar_ciclo = motor_async.ejecutar
+    else:
+        ejecutar_ciclo = ejecutor.ejecutar
+
+    try:
+        if argumentos.desde:
+            # Rango de fechas: meses en paralelo sobre la sesión de cada usuario (motor hilos)
+            if argumentos.motor == "async":
+                print("ℹ️  --desde/--hasta usa el motor de hilos")
+            ejecutor.mostrar_resumen(ejecutor.ejecutar(rango=(argumentos.desde, argumentos.hasta)))
+            return
+
+        if argumentos.daemon:
+            Demonio(
+                config,
+                ejecutar_ciclo,
+                ejecutor.mostrar_resumen,
+                argumentos.intervalo,
+                argumentos.cron,
+                argumentos.adaptativo
+            ).ejecutar()
+            return
+
+        ejecutor.mostrar_resumen(ejecutar_ciclo())
+    finally:
+        # Cerrar sesiones y las conexiones keep-alive del pool compartido
+        if motor_async:
+            motor_async.cerrar()
+        config.gestor_sesiones.cerrar_todas()
+        config.transporte_http.cerrar()
+        config.almacen_sesiones.cerrar()
+
     print(f"\n{'='*60}")
     print("✅ PROCESO COMPLETADO PARA TODOS LOS USUARIOS")
     print(f"{'='*60}")
@@ -0,0 +1,51 @@
+# simulador.py
+from argparse import ArgumentParser
+
+from controller.ServidorSimulado import ServidorSimulado
+
+def parsear_argumentos():
+    """Argumentos del servidor simulado de EcoDigital"""
+    parser = ArgumentParser(description="Servidor local que simula EcoDigital para pruebas de carga sin red")
+    parser.add_argument("--puerto", type=int, default=8700, help="Puerto de escucha")
+    parser.add_argument("--host", default="127.0.0.1", help="Interfaz de escucha")
+    parser.add_argument("--usuarios", type=int, default=10, help="Usuarios sintéticos (asesorN@eco.local / claveN)")
+    parser.add_argument("--latencia-ms", type=float, default=0.0, help="Latencia añadida a cada respuesta")
+    parser.add_argument("--tasa-nosess", type=float, default=0.0, help="Probabilidad de NOSESS en ObtenerTurnos (0-1)")
+    parser.add_argument("--tasa-bloqueo", type=float, default=0.0, help="Probabilidad de 403 de Cloudflare por petición (0-1)")
+    parser.add_argument("--vida-sesion", type=float, default=0.0, help="Segundos de vida de una sesión (0 = sin caducidad)")
+    parser.add_argument("--tasa-cambios", type=float, default=0.0, help="Probabilidad por consulta de que cambie un turno (0-1)")
+    parser.add_argument("--relleno-kb", type=int, default=0, help="KB de relleno en la página Master")
+    parser.add_argument("--semilla", type=int, default=0, help="Semilla de turnos y fallos inyectados")
+    return parser.parse_args()
+
+def main():
+    argumentos = parsear_argumentos()
+    servidor = ServidorSimulado(
+        argumentos.puerto,
+        argumentos.host,
+        argumentos.usuarios,
+        argumentos.latencia_ms,
+        argumentos.tasa_nosess,
+        argumentos.tasa_bloqueo,
+        argumentos.vida_sesion,
+        argumentos.tasa_cambios,
+        argumentos.relleno_kb,
+        argumentos.semilla
+    )
+
+    print(f"🧪 EcoDigital simulado en {servidor.url_base} ({len(servidor.usuarios)} usuario(s))")
+    print("   Variables para apuntar el scraper al simulador:")
+    print(f"   ECO_BASE_URL={servidor.url_base}")
+    for clave, valor in servidor.credenciales_env().items():
+        print(f"   {clave}={valor}")
+
+    try:
+        servidor.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        servidor.server_close()
+        print(f"\n📊 Peticiones atendidas: {servidor.resumen()}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,53 @@
+# tests/conftest.py
+from os import path as os_path
+from sys import path as sys_path
+
+from pytest import fixture
+
+# Los módulos se importan como en main.py (from controller.X import X) desde la raíz del repo
+RAIZ = os_path.dirname(os_path.dirname(os_path.abspath(__file__)))
+if RAIZ not in sys_path:
+    sys_path.insert(0, RAIZ)
+
+
+@fixture
+def servidor_simulado():
+    """ServidorSimulado en un puerto libre (se detiene al terminar)"""
+    from controller.ServidorSimulado import ServidorSimulado
+    servidor = ServidorSimulado(puerto=0, usuarios=2)
+    servidor.iniciar()
+    yield servidor
+    servidor.detener()
+
+
+@fixture
+def config_simulada(servidor_simulado, tmp_path, monkeypatch):
+    """
+    Config real apuntando al servidor simulado, con datos, cookies y logs en un
+    directorio temporal, sin límites de ritmo y sin Telegram.
+    """
+    monkeypatch.chdir(tmp_path)
+    for clave, valor in servidor_simulado.credenciales_env().items():
+        monkeypatch.setenv(clave, valor)
+    variables = {
+        "ECO_BASE_URL": servidor_simulado.url_base,
+        "RETRY_DELAY": "0",
+        "CIRCUITO_UMBRAL": "1",
+        "CIRCUITO_ENFRIAMIENTO": "60",
+        "TURNOS_STREAM": "1",
+        "TELEGRAM_TOKEN": "",
+        "TELEGRAM_CHAT": "pruebas",
+        "LIMITE_LOGINS_MINUTO": "1000000", "RAFAGA_LOGINS": "1000000",
+        "LIMITE_API_MINUTO": "1000000", "RAFAGA_API": "1000000",
+    }
+    for clave, valor in variables.items():
+        monkeypatch.setenv(clave, valor)
+    for clave in ("SESIONES_DB", "DATA_PATH", "LOGS_PATH", "MODO_HTTP", "LIMITADOR_ARCHIVO", "COOKIES_VALIDEZ"):
+        monkeypatch.delenv(clave, raising=False)
+
+    from controller.Config import Config
+    config = Config()
+    yield config
+    config.gestor_sesiones.cerrar_todas()
+    config.transporte_http.cerrar()
+    config.almacen_sesiones.cerrar()
@@ -0,0 +1,113 @@
+# tests/test_almacen_sesiones.py
+from json import dump
+from threading import Thread
+from time import time
+
+import pytest
+
+from controller.AlmacenSesiones import AlmacenSesiones
+
+
+@pytest.fixture
+def almacen(tmp_path):
+    almacen = AlmacenSesiones(str(tmp_path / "sesiones" / "sesiones.db"))
+    yield almacen
+    almacen.cerrar()
+
+
+def cookie(nombre: str, expires=None) -> dict:
+    return {"name": nombre, "value": "v", "domain": "eco.local", "path": "/", "expires": expires}
+
+
+def test_leer_sin_sesion(almacen):
+    assert almacen.leer("nadie") == ([], None)
+
+
+def test_guardar_y_leer(almacen):
+    cookies = [cookie("ASP.NET_SessionId"), cookie("token", 2000000000)]
+    almacen.guardar("a@eco.local", cookies, 1700000000.5)
+    assert almacen.leer("a@eco.local") == (cookies, 1700000000.5)
+    assert almacen.total() == 1
+
+
+def test_guardar_es_upsert(almacen):
+    almacen.guardar("a", [cookie("uno")], 1.0)
+    almacen.guardar("a", [cookie("dos")])
+    assert almacen.leer("a") == ([cookie("dos")], None)
+    assert almacen.total() == 1
+
+
+def test_expiracion():
+    assert AlmacenSesiones.expiracion([]) is None
+    assert AlmacenSesiones.expiracion([cookie("a", 10), cookie("b", 30)]) == 30
+    # Una cookie de sesión (sin fecha) hace que la sesión no tenga caducidad conocida
+    assert AlmacenSesiones.expiracion([cookie("a", 10), cookie("b")]) is None
+
+
+def test_purgar_caducadas(almacen):
+    ahora = time()
+    almacen.guardar("caducada", [cookie("a", ahora - 60)])
+    almacen.guardar("vigente", [cookie("a", ahora + 3600)])
+    almacen.guardar("de_sesion", [cookie("a")])
+    assert almacen.purgar_caducadas() == 1
+    assert almacen.leer("caducada") == ([], None)
+    assert almacen.total() == 2
+
+
+def test_borrar(almacen):
+    almacen.guardar("a", [cookie("a")])
+    assert almacen.borrar("a") is True
+    assert almacen.borrar("a") is False
+
+
+def test_migrar_archivo_con_validacion(almacen, tmp_path):
+    ruta = tmp_path / "a_cookies.json"
+    with open(ruta, "w") as f:
+        dump({"validada_en": 123.0, "cookies": [cookie("a")]}, f)
+    assert almacen.migrar_archivo("a", str(ruta)) is True
+    assert almacen.leer("a") == ([cookie("a")], 123.0)
+    assert not ruta.exists()
+
+
+def test_migrar_archivo_antiguo_no_pisa_la_base(almacen, tmp_path):
+    almacen.guardar("a", [cookie("nueva")], 5.0)
+    ruta = tmp_path / "a_cookies.json"
+    with open(ruta, "w") as f:
+        dump([cookie("vieja")], f)
+    assert almacen.migrar_archivo("a", str(ruta)) is False
+    assert almacen.leer("a") == ([cookie("nueva")], 5.0)
+    assert not ruta.exists()
+
+
+def test_migrar_archivo_inexistente_o_corrupto(almacen, tmp_path):
+    assert almacen.migrar_archivo("a", str(tmp_path / "no_existe.json")) is False
+    ruta = tmp_path / "roto.json"
+    ruta.write_text("{no json")
+    assert almacen.migrar_archivo("a", str(ruta)) is False
+    assert not ruta.exists()
+
+
+def test_persistente_y_compartido_entre_conexiones(tmp_path):
+    """Dos instancias sobre el mismo archivo (como dos procesos) ven los mismos datos"""
+    ruta = str(tmp_path / "sesiones.db")
+    primero, segundo = AlmacenSesiones(ruta), AlmacenSesiones(ruta)
+    try:
+        primero.guardar("a", [cookie("a")], 1.0)
+        assert segundo.leer("a") == ([cookie("a")], 1.0)
+    finally:
+        primero.cerrar()
+        segundo.cerrar()
+
+
+def test_escrituras_desde_varios_hilos(almacen):
+    def escribir(indice: int):
+        for vuelta in range(20):
+            almacen.guardar(f"usuario{indice}", [cookie(str(vuelta))], float(vuelta))
+
+    hilos = [Thread(target=escribir, args=(i,)) for i in range(8)]
+    for hilo in hilos:
+        hilo.start()
+    for hilo in hilos:
+        hilo.join()
+    assert almacen.total() == 8
+    assert all(almacen.leer(f"usuario{i}") == ([cookie("19")], 19.0) for i in range(8))
@@ -0,0 +1,117 @@
+# tests/test_calendario_documento.py
+from json import dump, load
+from os import utime
+
+import pytest
+
+from controller.CalendarioDocumento import CalendarioDocumento
+
+
+@pytest.fixture
+def ruta(tmp_path):
+    return str(tmp_path / "usuario" / "calendario.json")
+
+
+def escribir(ruta: str, datos: dict, mtime: float = None):
+    """Escribe el calendario como lo haría otro proceso"""
+    with open(ruta, "w", encoding="utf-8") as f:
+        dump(datos, f)
+    if mtime is not None:
+        utime(ruta, (mtime, mtime))
+
+
+def test_sin_archivo(ruta):
+    documento = CalendarioDocumento(ruta)
+    assert documento.datos is None
+    assert not documento.existe()
+    assert not documento.existe_en_disco()
+    assert documento.lecturas == 0
+
+
+def test_lee_de_disco_una_sola_vez(ruta):
+    documento = CalendarioDocumento(ruta)
+    documento.guardar({"mes": 6})
+    documento = CalendarioDocumento(ruta)
+    for _ in range(5):
+        assert documento.datos == {"mes": 6}
+        assert documento.existe()
+    assert documento.lecturas == 1
+
+
+def test_guardar_deja_el_contenido_en_memoria(ruta):
+    documento = CalendarioDocumento(ruta)
+    assert documento.guardar({"mes": 6}) is True
+    assert documento.datos == {"mes": 6}
+    assert documento.lecturas == 0 and documento.escrituras == 1
+    with open(ruta, encoding="utf-8") as f:
+        assert load(f) == {"mes": 6}
+
+
+def test_json_corrupto_se_trata_como_inexistente(ruta, tmp_path):
+    (tmp_path / "usuario").mkdir()
+    with open(ruta, "w") as f:
+        f.write("{roto")
+    documento = CalendarioDocumento(ruta)
+    assert documento.datos is None
+    assert documento.existe_en_disco()
+
+
+def test_descartar_no_toca_el_disco_ni_hace_backup(ruta, tmp_path):
+    documento = CalendarioDocumento(ruta)
+    documento.guardar({"mes": 5})
+    documento.descartar()
+    assert not documento.existe()
+    assert documento.existe_en_disco()
+    documento.guardar({"mes": 6}, backup=True)
+    assert not list((tmp_path / "usuario").glob("*_backup_*.json"))
+
+
+def test_backup_de_la_version_vigente(ruta, tmp_path):
+    documento = CalendarioDocumento(ruta)
+    documento.guardar({"version": 1})
+    documento.guardar({"version": 2}, backup=True)
+    backups = list((tmp_path / "usuario").glob("calendario_backup_*.json"))
+    assert len(backups) == 1
+    with open(backups[0], encoding="utf-8") as f:
+        assert load(f) == {"version": 1}
+    assert not list((tmp_path / "usuario").glob("*.tmp"))
+
+
+def test_sincronizar_sin_cambios_en_disco(ruta):
+    documento = CalendarioDocumento(ruta)
+    assert documento.sincronizar() is False
+    documento.guardar({"mes": 6})
+    assert documento.sincronizar() is False
+    assert documento.datos == {"mes": 6}
+    assert documento.lecturas == 0
+
+
+def test_sincronizar_relee_si_otro_proceso_escribio(ruta):
+    documento = CalendarioDocumento(ruta)
+    documento.guardar({"mes": 6})
+    escribir(ruta, {"mes": 7}, mtime=1_000_000_000)
+    assert documento.sincronizar() is True
+    assert documento.datos == {"mes": 7}
+    assert documento.lecturas == 1
+
+
+def test_sincronizar_si_el_archivo_desaparece(ruta, tmp_path):
+    documento = CalendarioDocumento(ruta)
+    documento.guardar({"mes": 6})
+    (tmp_path / "usuario" / "calendario.json").unlink()
+    assert documento.sincronizar() is True
+    assert documento.datos is None
+
+
+def test_sincronizar_tras_descartar_sin_guardar(ruta):
+    """Un descarte que no llegó a guardarse no debe durar más allá del ciclo"""
+    documento = CalendarioDocumento(ruta)
+    documento.guardar({"mes": 6})
+    documento.descartar()
+    assert documento.sincronizar() is True
+    assert not documento.descartado
+    assert documento.datos == {"mes": 6}
+
+
+def test_guardar_sin_ruta():
+    assert CalendarioDocumento(None).guardar({"mes": 6}) is False
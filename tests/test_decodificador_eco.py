@@ -0,0 +1,109 @@
+# tests/test_decodificador_eco.py
+from datetime import date, datetime
+
+import pytest
+
+from controller.DecodificadorEco import DecodificadorEco
+
+
+def turno(entrada="2025-06-02 08:00", salida="2025-06-02 16:00", **campos):
+    """Turno con el formato de ObtenerTurnos"""
+    return {"FechaHoraEntradaString": entrada, "FechaHoraSalidaString": salida, **campos}
+
+
+@pytest.mark.parametrize("entrada, salida, horas", [
+    ("08:00", "16:00", 8.0),
+    ("08:00", "14:30", 6.5),
+    ("22:00", "06:00", 8.0),
+    ("23:30", "00:15", 0.8),
+    ("18:00", "02:00", 8.0),
+    ("08:00", "08:00", 0.0),
+    (" 8:00", "16:00", 8.0),
+])
+def test_duracion_horas(entrada, salida, horas):
+    """Si la salida es anterior a la entrada el turno cruza la medianoche"""
+    assert DecodificadorEco.duracion_horas(entrada, salida) == horas
+
+
+@pytest.mark.parametrize("entrada, salida", [
+    ("08:00", "25:00"),
+    ("8h", "16:00"),
+    ("08:00", "16:60"),
+])
+def test_duracion_horas_ilegible_es_none(entrada, salida):
+    assert DecodificadorEco.duracion_horas(entrada, salida) is None
+
+
+def test_duracion_horas_sin_hora():
+    assert DecodificadorEco.duracion_horas("", "16:00") == 0
+    assert DecodificadorEco.duracion_horas("08:00", None) == 0
+
+
+def test_fecha_rapida_y_lenta():
+    assert DecodificadorEco.fecha("2025-06-02") == date(2025, 6, 2)
+    assert DecodificadorEco.fecha("2025-6-2") == date(2025, 6, 2)
+    with pytest.raises(ValueError):
+        DecodificadorEco.fecha("2025-02-30")
+    with pytest.raises(ValueError):
+        DecodificadorEco.fecha("02/06/2025")
+
+
+@pytest.mark.parametrize("valor, esperado", [
+    ("/Date(1735722000000)/", 1735722000000),
+    ("x /Date(5)/ y", 5),
+    ("/Date(-5)/", None),
+    ("2025-06-02", None),
+    (None, None),
+])
+def test_milisegundos(valor, esperado):
+    assert DecodificadorEco.milisegundos(valor) == esperado
+
+
+def test_descanso():
+    entrada_ms, salida_ms = 1735722000000, 1735722000000 + 45 * 60000
+    inicio, fin = (datetime.fromtimestamp(ms / 1000) for ms in (entrada_ms, salida_ms))
+    descanso = DecodificadorEco.descanso(f"/Date({entrada_ms})/", f"/Date({salida_ms})/")
+    assert descanso == {
+        "horario": f"{inicio:%H:%M} - {fin:%H:%M}",
+        "duracion_minutos": 45,
+    }
+    assert DecodificadorEco.descanso(None, f"/Date({salida_ms})/") is None
+    assert DecodificadorEco.descanso("12:00", "12:45") is None
+
+
+def test_decodificar_turno_nocturno():
+    decodificado = DecodificadorEco.decodificar_turno(turno("2025-06-07 22:00", "2025-06-08 06:00"))
+    assert decodificado["fecha"] == "2025-06-07"
+    assert (decodificado["dia"], decodificado["mes"], decodificado["año"]) == (7, 6, 2025)
+    assert decodificado["dia_semana"] == "Sábado"
+    assert decodificado["horario"] == "22:00 - 06:00"
+    assert decodificado["duracion_horas"] == 8.0
+    assert decodificado["es_dia_libre"] is False
+    assert decodificado["break"] is None
+
+
+def test_decodificar_turno_libre_y_sin_salida():
+    decodificado = DecodificadorEco.decodificar_turno(turno(salida="", Novedad={"Codigo": "LIBRE"}))
+    assert decodificado["es_dia_libre"] is True
+    assert decodificado["horario"] == ""
+    assert decodificado["duracion_horas"] == 0
+
+
+def test_decodificar_turno_sin_fecha():
+    assert DecodificadorEco.decodificar_turno({}) is None
+    assert DecodificadorEco.decodificar_turno(turno(entrada="2025-06-02")) is None
+
+
+def test_decodificar_turnos_en_columnas():
+    columnas, errores = DecodificadorEco.decodificar_turnos([
+        turno(),
+        {},
+        turno("2025-02-30 08:00", "2025-02-30 16:00"),
+        "no es un turno",
+        turno("2025-06-03 22:00", "2025-06-04 06:00"),
+    ])
+    assert columnas["fecha"] == ["2025-06-02", "2025-06-03"]
+    assert columnas["duracion_horas"] == [8.0, 8.0]
+    assert all(len(valores) == 2 for valores in columnas.values())
+    assert [texto for texto, _ in errores] == ["2025-02-30 08:00", ""]
+    assert DecodificadorEco.decodificar_turnos(None) == ({nombre: [] for nombre in DecodificadorEco.COLUMNAS}, [])
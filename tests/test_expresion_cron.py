@@ -0,0 +1,89 @@
+# tests/test_expresion_cron.py
+from datetime import datetime
+
+import pytest
+
+from controller.ExpresionCron import ExpresionCron
+
+# 2025-06-02 es lunes
+LUNES = datetime(2025, 6, 2, 10, 30)
+
+
+def test_domingo_es_cero_y_siete():
+    """cron 0 y 7 son domingo (weekday() == 6 en Python); 1 es lunes"""
+    assert ExpresionCron("0 0 * * 0").dias_semana == {6}
+    assert ExpresionCron("0 0 * * 7").dias_semana == {6}
+    assert ExpresionCron("0 0 * * 1").dias_semana == {0}
+    assert ExpresionCron("0 0 * * 1-5").dias_semana == {0, 1, 2, 3, 4}
+
+
+@pytest.mark.parametrize("expresion", ["0 9 * * 0", "0 9 * * 7"])
+def test_siguiente_domingo(expresion):
+    siguiente = ExpresionCron(expresion).siguiente(LUNES)
+    assert siguiente == datetime(2025, 6, 8, 9, 0)
+    assert siguiente.weekday() == 6
+
+
+def test_siguiente_lunes_a_viernes_salta_fin_de_semana():
+    viernes_noche = datetime(2025, 6, 6, 23, 0)
+    assert ExpresionCron("0 8 * * 1-5").siguiente(viernes_noche) == datetime(2025, 6, 9, 8, 0)
+
+
+def test_dia_del_mes_o_dia_de_la_semana():
+    """Con ambos campos restringidos basta con que coincida uno (regla OR de cron)"""
+    cron = ExpresionCron("0 0 15 * 5")
+    # Viernes 6 de junio (coincide el día de la semana) antes que el día 15
+    assert cron.siguiente(LUNES) == datetime(2025, 6, 6, 0, 0)
+    # Domingo 15 de junio (coincide el día del mes aunque no sea viernes)
+    assert cron.siguiente(datetime(2025, 6, 13, 1, 0)) == datetime(2025, 6, 15, 0, 0)
+
+
+def test_dia_del_mes_libre_exige_dia_de_la_semana():
+    """Si uno de los dos campos es '*', manda el otro (regla AND)"""
+    assert ExpresionCron("0 0 * * 5").siguiente(LUNES) == datetime(2025, 6, 6, 0, 0)
+    assert ExpresionCron("0 0 15 * *").siguiente(LUNES) == datetime(2025, 6, 15, 0, 0)
+
+
+def test_paso_sobre_asterisco_cuenta_como_libre():
+    """Como en cron, '*/2' en el día del mes no activa la regla OR con el día de la semana"""
+    # Días impares que además sean lunes: el 2 es par, el 9 es impar
+    assert ExpresionCron("0 0 */2 * 1").siguiente(LUNES) == datetime(2025, 6, 9, 0, 0)
+
+
+def test_pasos_rangos_y_listas():
+    cron = ExpresionCron("*/15 6-22/4 1,15 * *")
+    assert cron.minutos == {0, 15, 30, 45}
+    assert cron.horas == {6, 10, 14, 18, 22}
+    assert cron.dias == {1, 15}
+    assert ExpresionCron("5/20 * * * *").minutos == {5, 25, 45}
+
+
+def test_siguiente_es_estrictamente_posterior():
+    cron = ExpresionCron("30 10 * * *")
+    assert cron.siguiente(LUNES) == datetime(2025, 6, 3, 10, 30)
+    assert cron.siguiente(datetime(2025, 6, 2, 10, 29, 59)) == LUNES
+
+
+def test_siguiente_cruza_fin_de_año():
+    assert ExpresionCron("0 0 1 1 *").siguiente(datetime(2025, 12, 31, 23, 59)) == datetime(2026, 1, 1, 0, 0)
+
+
+def test_expresion_imposible():
+    with pytest.raises(ValueError):
+        ExpresionCron("0 0 31 2 *").siguiente(LUNES)
+
+
+@pytest.mark.parametrize("expresion", [
+    "* * * *",
+    "60 * * * *",
+    "* 24 * * *",
+    "* * 0 * *",
+    "* * * 13 *",
+    "* * * * 8",
+    "*/0 * * * *",
+    "10-5 * * * *",
+    "a * * * *",
+])
+def test_expresiones_invalidas(expresion):
+    with pytest.raises(ValueError):
+        ExpresionCron(expresion)
@@ -0,0 +1,99 @@
+# tests/test_extractor_calendario.py
+from json import dumps
+
+import pytest
+
+from controller.ExtractorCalendario import ExtractorCalendario
+
+USUARIO = "asesor1@eco.local"
+
+
+@pytest.fixture
+def extractor(config_simulada):
+    return ExtractorCalendario(None, config_simulada, config_simulada.contextos()[0])
+
+
+def leer_en_streaming(extractor, payload: dict, trozo: int = 512) -> dict:
+    """Pasa el payload por el lector incremental como lo haría extraer_turnos_api"""
+    cuerpo = dumps(payload).encode("utf-8")
+    lector, turnos_por_dia = extractor.lector_respuesta_api()
+    for i in range(0, len(cuerpo), trozo):
+        lector.alimentar(cuerpo[i:i + trozo])
+    return extractor.procesar_datos_api(extractor.resultado_lectura_api(lector, turnos_por_dia))
+
+
+@pytest.mark.parametrize("streaming", [False, True])
+def test_meses_vecinos_no_pisan_el_mes(extractor, servidor_simulado, streaming):
+    """El rango por defecto (mes ±5 días) trae días con el mismo número de septiembre y noviembre"""
+    payload = servidor_simulado.turnos(USUARIO, "26/09/2026", "06/11/2026")
+    turnos_por_dia = leer_en_streaming(extractor, payload) if streaming else extractor.procesar_datos_api(payload)
+    assert len(turnos_por_dia) == 42
+
+    octubre = extractor.generar_estructura_compatible(turnos_por_dia, 2026, 10)
+    assert [d['dia'] for d in octubre['dias']] == list(range(1, 32))
+    assert all(d['registro'] and (d['registro']['año'], d['registro']['mes']) == (2026, 10) for d in octubre['dias'])
+    assert [d['registro']['dia'] for d in octubre['dias']] == list(range(1, 32))
+    # Cada día conserva su propio turno del API
+    entradas = {t["FechaHoraEntradaString"][:10]: t["FechaHoraEntradaString"][11:16] for t in payload["turnos"]}
+    for dia in octubre['dias']:
+        horario = dia['registro']['turno']['horario']
+        assert horario.startswith(entradas[dia['registro']['fecha']])
+
+    noviembre = extractor.generar_estructura_compatible(turnos_por_dia, 2026, 11)
+    presentes = [d['dia'] for d in noviembre['dias'] if d['registro']]
+    assert presentes == [1, 2, 3, 4, 5, 6]
+    assert all(d['registro']['mes'] == 11 for d in noviembre['dias'] if d['registro'])
+
+
+def test_calendario_del_mes_sin_dias_vecinos(extractor, servidor_simulado):
+    payload = servidor_simulado.turnos(USUARIO, "26/09/2026", "06/11/2026")
+    estructura = extractor.generar_estructura_compatible(extractor.procesar_datos_api(payload), 2026, 10)
+    calendario = extractor.generar_json_calendario(estructura)
+    assert [dia['dia'] for dia in calendario['calendario']] == list(range(1, 32))
+    # Los horarios persistidos son los de octubre, no los de los días 1-6 de noviembre
+    octubre = {
+        int(t["FechaHoraEntradaString"][8:10]): f'{t["FechaHoraEntradaString"][11:16]}:00'
+        for t in payload["turnos"] if t["FechaHoraEntradaString"].startswith("2026-10")
+    }
+    for dia in calendario['calendario']:
+        if not dia['es_dia_libre']:
+            assert dia['turno']['horario'].startswith(octubre[dia['dia']])
+
+
+@pytest.mark.parametrize("horario, horas", [
+    ("22:00 - 06:00", 8.0),
+    ("08:00 - 14:30", 6.5),
+    ("", 0),
+    ("25:00 - 06:00", None),
+    ("22:00 06:00", None),
+])
+def test_calcular_duracion_horas(extractor, horario, horas):
+    assert extractor._calcular_duracion_horas(horario) == horas
+
+
+def test_duraciones_persistidas(extractor):
+    """Nocturno, hora ilegible y día libre tal como quedan en calendario.json"""
+    def turno(entrada, salida, novedad=None):
+        return {
+            "Asesor": {"NombreCompleto": "Asesor Simulado 1"},
+            "FechaHoraEntradaString": entrada,
+            "FechaHoraSalidaString": salida,
+            "Novedad": novedad,
+        }
+
+    payload = {"turnos": [
+        turno("2026-10-01 22:00", "2026-10-02 06:00"),
+        turno("2026-10-02 25:00", "2026-10-02 06:00"),
+        turno("2026-10-03 08:00", "2026-10-03 16:00", {"Codigo": "LIBRE"}),
+        turno("2026-10-04 08:00", ""),
+    ], "eventos": []}
+    estructura = extractor.generar_estructura_compatible(extractor.procesar_datos_api(payload), 2026, 10)
+    dias = {dia['dia']: dia for dia in extractor.generar_json_calendario(estructura)['calendario']}
+
+    assert dias[1]['turno'] == {"horario": "22:00:00 - 06:00:00", "tipo": "Dimensionado", "duracion_horas": 8.0}
+    # Hora ilegible: se conserva el día pero no se inventa la duración
+    assert dias[2]['turno']['tipo'] == "Dimensionado"
+    assert dias[2]['turno']['duracion_horas'] is None
+    assert dias[3]['es_dia_libre'] is True
+    assert dias[3]['turno'] == {"horario": None, "tipo": "Día Libre", "duracion_horas": 0}
+    assert dias[4]['turno'] == {"horario": None, "tipo": "Dimensionado", "duracion_horas": 0}
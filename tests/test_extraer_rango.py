@@ -0,0 +1,121 @@
+# tests/test_extraer_rango.py
+from calendar import monthrange
+from datetime import date
+from json import load
+from sys import getswitchinterval, setswitchinterval
+from threading import Barrier, Thread
+
+import pytest
+
+from controller.ContextoUsuario import ContextoUsuario
+from controller.Ejecucion import Ejecuciones
+from controller.ExtractorCalendario import ExtractorCalendario
+from controller.Login import Login
+
+USUARIO = "asesor1@eco.local"
+MESES = [(2026, 8), (2026, 9), (2026, 10), (2026, 11), (2026, 12)]
+
+
+@pytest.fixture
+def cambios_de_hilo_frecuentes():
+    """Fuerza cambios de hilo frecuentes para que una carrera en los contadores se note"""
+    anterior = getswitchinterval()
+    setswitchinterval(1e-6)
+    yield
+    setswitchinterval(anterior)
+
+
+def test_contar_es_seguro_entre_hilos(config_simulada, cambios_de_hilo_frecuentes):
+    contexto = ContextoUsuario(config_simulada, USUARIO, "clave1")
+    hilos, vueltas = 8, 5000
+    salida = Barrier(hilos)
+
+    def sumar():
+        salida.wait()
+        for _ in range(vueltas):
+            contexto.contar("peticiones_api")
+            contexto.contar("peticiones_http", 2)
+
+    trabajadores = [Thread(target=sumar) for _ in range(hilos)]
+    for hilo in trabajadores:
+        hilo.start()
+    for hilo in trabajadores:
+        hilo.join()
+    assert contexto.peticiones_api == hilos * vueltas
+    assert contexto.peticiones_http == 2 * hilos * vueltas
+    assert contexto.logins == 0
+
+
+@pytest.fixture
+def extractor(config_simulada):
+    contexto = config_simulada.contextos()[0]
+    login = Login(config_simulada, contexto)
+    assert login.login()
+    return ExtractorCalendario(login.get_session(), config_simulada, contexto)
+
+
+def leer(ruta: str) -> dict:
+    with open(ruta, encoding="utf-8") as f:
+        return load(f)
+
+
+def test_meses_en_paralelo(extractor, servidor_simulado, cambios_de_hilo_frecuentes):
+    assert extractor.config.max_conexiones_host > 1
+    api = servidor_simulado.contadores["api"]
+    peticiones = extractor.contexto.peticiones_api
+
+    resultado = extractor.extraer_rango(date(2026, 8, 10), date(2026, 12, 3))
+    assert resultado["fallidos"] == [] and "_error_session" not in resultado
+    assert sorted(resultado["meses"]) == [f"{a}_{m:02d}" for a, m in MESES]
+    # Una petición por mes, contada sin perder ninguna aunque vayan en paralelo
+    assert extractor.contexto.peticiones_api - peticiones == len(MESES)
+    assert servidor_simulado.contadores["api"] - api == len(MESES)
+
+    huellas = set()
+    for año, mes in MESES:
+        calendario = leer(resultado["meses"][f"{año}_{mes:02d}"])
+        assert resultado["meses"][f"{año}_{mes:02d}"] == extractor.ruta_calendario_mes(año, mes)
+        huellas.add(calendario["metadata"]["huella_respuesta"])
+        # Cada archivo tiene los turnos de su propio mes, no los de otro hilo
+        ultimo = monthrange(año, mes)[1]
+        payload = servidor_simulado.turnos(USUARIO, f"01/{mes:02d}/{año}", f"{ultimo}/{mes:02d}/{año}")
+        entradas = {
+            int(t["FechaHoraEntradaString"][8:10]): f'{t["FechaHoraEntradaString"][11:16]}:00'
+            for t in payload["turnos"]
+        }
+        assert [dia["dia"] for dia in calendario["calendario"]] == list(range(1, ultimo + 1))
+        for dia in calendario["calendario"]:
+            if not dia["es_dia_libre"]:
+                assert dia["turno"]["horario"].startswith(entradas[dia["dia"]])
+    # Cada mes guarda la huella de su propia respuesta
+    assert None not in huellas and len(huellas) == len(MESES)
+    # calendario.json no se toca
+    assert not extractor.documento_usuario().existe_en_disco()
+
+
+def test_repetir_el_rango_conserva_huellas_y_no_marca_cambios(extractor, cambios_de_hilo_frecuentes):
+    primero = extractor.extraer_rango(date(2026, 8, 1), date(2026, 12, 31))
+    huellas = {clave: leer(ruta)["metadata"]["huella_respuesta"] for clave, ruta in primero["meses"].items()}
+
+    segundo = extractor.extraer_rango(date(2026, 8, 1), date(2026, 12, 31))
+    assert segundo["meses"] == primero["meses"]
+    for clave, ruta in segundo["meses"].items():
+        calendario = leer(ruta)
+        assert calendario["metadata"]["huella_respuesta"] == huellas[clave]
+        assert not calendario["resumen_cambios"]["se_detectaron_cambios"]
+
+
+def test_extraer_y_guardar_rango(config_simulada):
+    """Por Ejecuciones: las peticiones del resultado son las del contexto (una por mes)"""
+    contexto = config_simulada.contextos()[0]
+    ejecutor = Ejecuciones(config_simulada, contexto)
+    login = Login(config_simulada, contexto)
+    assert login.login()
+    ejecutor.login_instance = login
+    ejecutor._preparar_extractor()
+    contexto.reiniciar_metricas()
+
+    resultado = ejecutor.extraer_y_guardar_rango(date(2026, 9, 1), date(2026, 11, 30))
+    assert resultado["exito"]
+    assert resultado["meses"] == ["2026_09", "2026_10", "2026_11"]
+    assert resultado["peticiones_api"] == 3
@@ -0,0 +1,99 @@
+# tests/test_gestor_sesiones.py
+import pytest
+
+import controller.GestorSesiones as modulo
+from controller.GestorSesiones import GestorSesiones
+
+
+class LoginFalso:
+    """Sustituto de Login: solo importa si se cerró"""
+
+    def __init__(self, nombre: str):
+        self.nombre = nombre
+        self.cerrado = False
+
+    def close(self):
+        self.cerrado = True
+
+
+class Reloj:
+    def __init__(self):
+        self.ahora = 100.0
+
+    def __call__(self) -> float:
+        return self.ahora
+
+
+@pytest.fixture
+def reloj(monkeypatch):
+    reloj = Reloj()
+    monkeypatch.setattr(modulo, "monotonic", reloj)
+    return reloj
+
+
+def test_acierto_y_fallo(reloj):
+    gestor = GestorSesiones()
+    login = LoginFalso("a")
+    assert gestor.obtener("a") is None
+    gestor.guardar("a", login)
+    assert gestor.obtener("a") is login
+    assert gestor.estadisticas() == {"vivas": 1, "aciertos": 1, "fallos": 1, "expulsadas": 0}
+
+
+def test_expulsa_la_menos_usada_recientemente(reloj):
+    gestor = GestorSesiones(max_sesiones=2)
+    a, b, c = LoginFalso("a"), LoginFalso("b"), LoginFalso("c")
+    gestor.guardar("a", a)
+    gestor.guardar("b", b)
+    gestor.obtener("a")  # "b" pasa a ser la menos usada
+    gestor.guardar("c", c)
+    assert b.cerrado and not a.cerrado and not c.cerrado
+    assert gestor.obtener("b") is None
+    assert gestor.obtener("a") is a
+    assert gestor.estadisticas()["expulsadas"] == 1
+
+
+def test_ttl_de_inactividad(reloj):
+    gestor = GestorSesiones(ttl_segundos=60)
+    viejo, nuevo = LoginFalso("viejo"), LoginFalso("nuevo")
+    gestor.guardar("viejo", viejo)
+    reloj.ahora += 30
+    gestor.guardar("nuevo", nuevo)
+    reloj.ahora += 30
+    assert gestor.obtener("nuevo") is nuevo
+    assert viejo.cerrado
+    assert gestor.obtener("viejo") is None
+    # Cada uso renueva el TTL
+    reloj.ahora += 59
+    assert gestor.obtener("nuevo") is nuevo
+    assert not nuevo.cerrado
+
+
+def test_guardar_otra_sesion_cierra_la_anterior(reloj):
+    gestor = GestorSesiones()
+    anterior, nueva = LoginFalso("1"), LoginFalso("2")
+    gestor.guardar("a", anterior)
+    gestor.guardar("a", anterior)
+    assert not anterior.cerrado
+    gestor.guardar("a", nueva)
+    assert anterior.cerrado and not nueva.cerrado
+    assert gestor.obtener("a") is nueva
+
+
+def test_descartar_y_cerrar_todas(reloj):
+    gestor = GestorSesiones()
+    a, b = LoginFalso("a"), LoginFalso("b")
+    gestor.guardar("a", a)
+    gestor.guardar("b", b)
+    gestor.descartar("a")
+    gestor.descartar("desconocido")
+    assert a.cerrado and not b.cerrado
+    gestor.cerrar_todas()
+    assert b.cerrado
+    assert gestor.estadisticas()["vivas"] == 0
+
+
+def test_limites_minimos():
+    gestor = GestorSesiones(max_sesiones=0, ttl_segundos=0)
+    assert gestor.max_sesiones == 1
+    assert gestor.ttl_segundos == 1.0
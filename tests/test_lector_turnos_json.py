@@ -0,0 +1,163 @@
+# tests/test_lector_turnos_json.py
+from hashlib import sha256
+from json import dumps, loads
+
+import pytest
+
+from controller.LectorTurnosJson import LectorTurnosJson
+
+CUERPO = dumps({
+    "eventos": [{"Id": 7, "Nombre": "Reunión \\ \"{[\" ]}", "Datos": [[], {}, [1.5, None, True]]}],
+    "titulo": "Turnos \"junio\"",
+    "turnos": [
+        {"FechaHoraEntradaString": "2025-06-02 08:00", "Horas": 8, "Factor": 1.25, "Libre": False},
+        {"FechaHoraEntradaString": "2025-06-03 22:00", "Horas": 12345, "Factor": -0.5e-3, "Novedad": None},
+        17,
+        -3.75,
+        "Año",
+    ],
+    "total": 1024,
+    "ratio": 0.125,
+}, ensure_ascii=False).encode("utf-8")
+
+
+def leer(trozos):
+    """Alimenta el lector con los trozos y devuelve (lector, turnos entregados)"""
+    turnos = []
+    lector = LectorTurnosJson(turnos.append)
+    for trozo in trozos:
+        lector.alimentar(trozo)
+    lector.finalizar()
+    return lector, turnos
+
+
+def partir(cuerpo: bytes, tamaño: int):
+    return [cuerpo[i:i + tamaño] for i in range(0, len(cuerpo), tamaño)]
+
+
+def test_cuerpo_entero():
+    lector, turnos = leer([CUERPO])
+    assert lector.error is None
+    assert lector.tiene_clave
+    assert turnos == loads(CUERPO)["turnos"]
+    assert lector.turnos == 5
+    assert lector.bytes_leidos == len(CUERPO)
+
+
+def test_todos_los_puntos_de_corte():
+    """Cortar el cuerpo en cualquier byte (a mitad de número, literal o carácter UTF-8) da lo mismo"""
+    esperado = loads(CUERPO)["turnos"]
+    for corte in range(1, len(CUERPO)):
+        lector, turnos = leer([CUERPO[:corte], CUERPO[corte:]])
+        assert lector.error is None, corte
+        assert turnos == esperado, corte
+
+
+@pytest.mark.parametrize("tamaño", [1, 2, 3, 7, 64])
+def test_trozos_pequeños(tamaño):
+    lector, turnos = leer(partir(CUERPO, tamaño))
+    assert lector.error is None
+    assert turnos == loads(CUERPO)["turnos"]
+
+
+@pytest.mark.parametrize("trozos, esperado", [
+    ([b'{"turnos": [1', b'2, 3.', b'5]}'], [12, 3.5]),
+    ([b'{"turnos": [1e', b'3, -', b'0]}'], [1000.0, 0]),
+    ([b'{"turnos": [12', b']}'], [12]),
+    ([b'{"turnos": [tr', b'ue, nu', b'll]}'], [True, None]),
+])
+def test_numeros_y_literales_partidos(trozos, esperado):
+    """Un número al final del trozo no se entrega hasta ver el delimitador siguiente"""
+    lector, turnos = leer(trozos)
+    assert lector.error is None
+    assert turnos == esperado
+
+
+def test_numero_al_final_sin_delimitador_espera_mas_datos():
+    turnos = []
+    lector = LectorTurnosJson(turnos.append)
+    lector.alimentar(b'{"turnos": [12')
+    assert turnos == []
+    lector.alimentar(b'3]}')
+    lector.finalizar()
+    assert turnos == [123]
+
+
+def test_huella_igual_a_sha256_del_cuerpo():
+    lector, _ = leer(partir(CUERPO, 5))
+    assert lector.huella == sha256(CUERPO).hexdigest()
+    assert lector.inicio == CUERPO[:64]
+
+
+def test_turnos_nulo_o_vacio():
+    lector, turnos = leer([b'{"turnos": null, "eventos": []}'])
+    assert lector.error is None and lector.tiene_clave and turnos == []
+    lector, turnos = leer([b'{"turnos": [], "otro": {"turnos": [1]}}'])
+    assert lector.error is None and turnos == []
+
+
+def test_sin_clave_turnos():
+    lector, turnos = leer([b'{"eventos": [1, 2]}'])
+    assert lector.error is None
+    assert not lector.tiene_clave
+    assert turnos == []
+
+
+@pytest.mark.parametrize("cuerpo", [
+    b"NOSESS",
+    b"<html><body>Login</body></html>",
+    b'{"turnos": [1, 2',
+    b'{"turnos": [1 2]}',
+    b'{"turnos": [1]} basura',
+    b"",
+])
+def test_cuerpos_invalidos_quedan_en_error(cuerpo):
+    """Nunca lanza: el error queda en `error` y el inicio sirve para detectar NOSESS"""
+    lector, _ = leer([cuerpo])
+    assert lector.error is not None
+    assert lector.inicio == cuerpo[:64]
+
+
+def test_no_sigue_tras_un_error():
+    turnos = []
+    lector = LectorTurnosJson(turnos.append)
+    lector.alimentar(b'{"turnos" [')
+    error = lector.error
+    assert error is not None
+    lector.alimentar(b'1]}')
+    lector.finalizar()
+    assert lector.error is error
+    assert turnos == []
+    assert lector.bytes_leidos == len(b'{"turnos" [1]}')
+
+
+def test_recorte_del_buffer_con_muchos_turnos():
+    """Con más de RECORTE caracteres se descarta lo ya leído sin perder turnos"""
+    esperado = [{"Id": i, "Texto": "x" * 50} for i in range(3000)]
+    cuerpo = dumps({"turnos": esperado}).encode("utf-8")
+    lector, turnos = leer(partir(cuerpo, 4096))
+    assert lector.error is None
+    assert turnos == esperado
+    assert lector.huella == sha256(cuerpo).hexdigest()
+
+
+def test_valores_ajenos_grandes_no_cuentan_para_max_pendiente(monkeypatch):
+    """Lo que no es "turnos" se salta sin acumularlo: no lo limita MAX_PENDIENTE"""
+    monkeypatch.setattr(LectorTurnosJson, "MAX_PENDIENTE", 1024)
+    eventos = [{"Id": i, "Texto": "x\\\"}" * 40} for i in range(2000)]
+    cuerpo = dumps({"eventos": eventos, "nota": "y" * 50000, "turnos": [{"Id": 1}]}).encode("utf-8")
+    lector, turnos = leer(partir(cuerpo, 4096))
+    assert lector.error is None
+    assert turnos == [{"Id": 1}]
+
+
+@pytest.mark.parametrize("cuerpo", [
+    b'{"eventos": [1, 2}, "turnos": []}',
+    b'{"eventos": {"a": [}]}, "turnos": []}',
+    b'{"eventos": "sin cerrar',
+    b'{"eventos": [{"a": 1}',
+    b'{"eventos": tru, "turnos": []}',
+])
+def test_valores_ajenos_invalidos(cuerpo):
+    lector, _ = leer(partir(cuerpo, 3))
+    assert lector.error is not None
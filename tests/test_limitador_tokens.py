@@ -0,0 +1,85 @@
+# tests/test_limitador_tokens.py
+import pytest
+
+import controller.LimitadorTokens as modulo
+from controller.LimitadorTokens import LimitadorTokens
+
+
+class Reloj:
+    """Reloj manual para no depender del tiempo real"""
+
+    def __init__(self, ahora: float = 1000.0):
+        self.ahora = ahora
+
+    def __call__(self) -> float:
+        return self.ahora
+
+
+@pytest.fixture
+def reloj(monkeypatch):
+    reloj = Reloj()
+    monkeypatch.setattr(modulo, "time", reloj)
+    return reloj
+
+
+def test_rafaga_hasta_la_capacidad(reloj):
+    limitador = LimitadorTokens({"api": (60, 3)})
+    assert [limitador.reservar("api") for _ in range(3)] == [0.0, 0.0, 0.0]
+    assert limitador.esperas["api"] == 0
+
+
+def test_reservas_pendientes_se_esperan_en_orden(reloj):
+    """60/min = 1 token por segundo: sin tiempo transcurrido cada reserva espera uno más"""
+    limitador = LimitadorTokens({"api": (60, 2)})
+    limitador.reservar("api")
+    limitador.reservar("api")
+    assert limitador.reservar("api") == pytest.approx(1.0)
+    assert limitador.reservar("api") == pytest.approx(2.0)
+    assert limitador.esperas["api"] == 2
+    assert limitador.segundos_esperados["api"] == pytest.approx(3.0)
+
+
+def test_relleno_con_el_tiempo_sin_pasar_la_capacidad(reloj):
+    limitador = LimitadorTokens({"api": (60, 2)})
+    limitador.reservar("api")
+    limitador.reservar("api")
+    reloj.ahora += 1.5
+    assert limitador.reservar("api") == 0.0
+    # Una hora de inactividad no acumula más de `capacidad` tokens
+    reloj.ahora += 3600
+    assert [limitador.reservar("api") for _ in range(2)] == [0.0, 0.0]
+    assert limitador.reservar("api") == pytest.approx(1.0)
+
+
+def test_cubetas_independientes(reloj):
+    limitador = LimitadorTokens({"login": (6, 1), "api": (60, 1)})
+    limitador.reservar("login")
+    assert limitador.reservar("api") == 0.0
+    assert limitador.reservar("login") == pytest.approx(10.0)
+
+
+def test_cubeta_desconocida_no_limita(reloj):
+    limitador = LimitadorTokens({"api": (60, 1)})
+    assert [limitador.reservar("otra") for _ in range(5)] == [0.0] * 5
+
+
+def test_adquirir_duerme_la_espera(reloj, monkeypatch):
+    dormido = []
+    monkeypatch.setattr(modulo, "sleep", dormido.append)
+    limitador = LimitadorTokens({"api": (30, 1)})
+    assert limitador.adquirir("api") == 0.0
+    assert limitador.adquirir("api") == pytest.approx(2.0)
+    assert dormido == [pytest.approx(2.0)]
+    assert limitador.resumen() == "api: 1 espera(s) / 2.0s"
+
+
+@pytest.mark.skipif(modulo.flock is None, reason="sin fcntl")
+def test_estado_compartido_entre_instancias(reloj, tmp_path):
+    """Dos limitadores sobre el mismo archivo consumen del mismo presupuesto (como dos procesos)"""
+    archivo = str(tmp_path / "estado" / "limitador.json")
+    primero = LimitadorTokens({"api": (60, 2)}, archivo=archivo)
+    segundo = LimitadorTokens({"api": (60, 2)}, archivo=archivo)
+    assert primero.reservar("api") == 0.0
+    assert segundo.reservar("api") == 0.0
+    assert primero.reservar("api") == pytest.approx(1.0)
+    assert segundo.reservar("api") == pytest.approx(2.0)
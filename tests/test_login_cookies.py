@@ -0,0 +1,47 @@
+# tests/test_login_cookies.py
+from time import time
+
+import pytest
+
+from controller.Login import Login
+
+VALIDEZ = 1800
+
+
+def cookie(nombre: str, expires=None) -> dict:
+    return {"name": nombre, "value": "v", "domain": "eco.local", "path": "/", "expires": expires}
+
+
+@pytest.fixture
+def ahora():
+    return time()
+
+
+def test_todas_caducadas(ahora):
+    cookies = [cookie("a", ahora - 10), cookie("b", ahora - 1)]
+    assert Login.estado_cookies(cookies, ahora - 5, VALIDEZ) == ("caducada", [])
+
+
+def test_sin_cookies():
+    assert Login.estado_cookies([], None, VALIDEZ) == ("caducada", [])
+
+
+def test_confiable_si_se_validaron_hace_poco(ahora):
+    cookies = [cookie("ASP.NET_SessionId"), cookie("token", ahora + 3600)]
+    assert Login.estado_cookies(cookies, ahora - 60, VALIDEZ) == ("confiable", cookies)
+
+
+@pytest.mark.parametrize("validada_en", [None, 0, "antigua", "futura"])
+def test_validar_si_la_validacion_no_sirve(ahora, validada_en):
+    """Sin validación, validación antigua o con reloj adelantado: hay que comprobarlas"""
+    validada_en = {"antigua": ahora - VALIDEZ - 1, "futura": ahora + 600}.get(validada_en, validada_en)
+    cookies = [cookie("token", ahora + 3600)]
+    assert Login.estado_cookies(cookies, validada_en, VALIDEZ) == ("validar", cookies)
+
+
+def test_validar_si_alguna_caduco(ahora):
+    """Con parte de las cookies vencidas se validan solo las vigentes aunque la validación sea reciente"""
+    vigente = cookie("token", ahora + 3600)
+    estado, vigentes = Login.estado_cookies([cookie("viejo", ahora - 1), vigente], ahora - 60, VALIDEZ)
+    assert estado == "validar"
+    assert vigentes == [vigente]
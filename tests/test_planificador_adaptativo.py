@@ -0,0 +1,86 @@
+# tests/test_planificador_adaptativo.py
+from datetime import datetime, timedelta
+from types import SimpleNamespace
+
+import pytest
+
+from controller.PlanificadorAdaptativo import PlanificadorAdaptativo
+
+# Mitad de mes: factor_mes = 1
+AHORA = datetime(2025, 6, 15, 12, 0)
+
+
+@pytest.fixture
+def planificador():
+    return PlanificadorAdaptativo(SimpleNamespace(intervalo=900, intervalo_min=300, intervalo_max=21600))
+
+
+def cambio(dia: int, fecha: datetime) -> dict:
+    """Entrada de historial_cambios como la escribe ExtractorCalendario"""
+    return {"dia": dia, "fecha": fecha.strftime("%Y-%m-%dT%H:%M:%SZ")}
+
+
+def exito(*cambios) -> dict:
+    return {"exito": True, "historial_cambios": list(cambios)}
+
+
+def test_fallo_usa_el_intervalo_normal(planificador):
+    assert planificador.intervalo(None, AHORA) == 900
+    assert planificador.intervalo({"exito": False, "historial_cambios": [cambio(16, AHORA)]}, AHORA) == 900
+
+
+def test_sin_cambios_intervalo_maximo(planificador):
+    assert planificador.intervalo(exito(), AHORA) == 21600
+
+
+@pytest.mark.parametrize("ahora", [datetime(2025, 6, 1, 8), datetime(2025, 6, 2, 8), datetime(2025, 6, 26, 8), datetime(2025, 6, 30, 8)])
+def test_inicio_y_fin_de_mes_a_mitad(planificador, ahora):
+    assert planificador.factor_mes(ahora) == 0.5
+    assert planificador.intervalo(exito(), ahora) == 10800
+
+
+def test_mitad_de_mes(planificador):
+    assert planificador.factor_mes(datetime(2025, 6, 3)) == 1.0
+    assert planificador.factor_mes(datetime(2025, 6, 25)) == 1.0
+
+
+def test_usuario_estable(planificador):
+    """Un cambio antiguo sobre un día pasado: intervalo máximo"""
+    assert planificador.intervalo(exito(cambio(1, datetime(2025, 6, 1, 9))), AHORA) == 21600
+
+
+def test_usuario_volatil_por_frecuencia(planificador):
+    """60 cambios en 14,5 días -> 86400 * 14,5 / 60 / 4 segundos"""
+    cambios = [cambio(1, datetime(2025, 6, 5))] * 60
+    assert planificador.intervalo(exito(*cambios), AHORA) == 5220
+
+
+def test_cambio_reciente_topa_el_intervalo(planificador):
+    assert planificador.intervalo(exito(cambio(28, AHORA - timedelta(hours=2))), AHORA) == 2160
+    assert planificador.intervalo(exito(cambio(28, AHORA - timedelta(hours=12))), AHORA) == 5400
+    assert planificador.intervalo(exito(cambio(28, AHORA - timedelta(hours=48))), AHORA) == 10800
+
+
+def test_cambio_en_dia_cercano_divide_a_la_mitad(planificador):
+    reciente = AHORA - timedelta(hours=2)
+    assert planificador.intervalo(exito(cambio(16, reciente)), AHORA) == 1080
+    assert planificador.intervalo(exito(cambio(15, reciente)), AHORA) == 1080
+    # Días ya pasados o demasiado lejanos no cuentan como cercanos
+    assert planificador.intervalo(exito(cambio(14, reciente)), AHORA) == 2160
+    assert planificador.intervalo(exito(cambio(19, reciente)), AHORA) == 2160
+
+
+def test_acotado_al_minimo(planificador):
+    cambios = [cambio(16, AHORA - timedelta(minutes=5))] * 1000
+    assert planificador.intervalo(exito(*cambios), AHORA) == 300
+
+
+def test_historial_invalido_se_ignora(planificador):
+    historial = [{"dia": 16}, {"dia": 16, "fecha": "ayer"}, {"fecha": "2025-06-15T10:00:00Z"}, None]
+    assert planificador.intervalo(exito(*historial), AHORA) == 21600
+
+
+def test_maximo_no_menor_que_minimo():
+    planificador = PlanificadorAdaptativo(SimpleNamespace(intervalo=60, intervalo_min=600, intervalo_max=300))
+    assert planificador.intervalo_max == 600
+    assert planificador.intervalo({"exito": False}, AHORA) == 600
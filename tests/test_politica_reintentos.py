@@ -0,0 +1,210 @@
+# tests/test_politica_reintentos.py
+from asyncio import run, gather
+from threading import Thread
+
+import pytest
+
+import controller.PoliticaReintentos as modulo
+from controller.PoliticaReintentos import PoliticaReintentos
+
+CLOUDFLARE = {"Server": "cloudflare"}
+
+
+class Reloj:
+    def __init__(self):
+        self.ahora = 1000.0
+
+    def __call__(self) -> float:
+        return self.ahora
+
+
+class ContextoFalso:
+    """Sustituto de ContextoUsuario: solo cuenta"""
+
+    def __init__(self):
+        self.contadores = {}
+
+    def contar(self, metrica: str, cantidad: int = 1):
+        self.contadores[metrica] = self.contadores.get(metrica, 0) + cantidad
+
+
+@pytest.fixture
+def reloj(monkeypatch):
+    reloj = Reloj()
+    monkeypatch.setattr(modulo, "monotonic", reloj)
+    return reloj
+
+
+@pytest.fixture
+def politica(reloj):
+    return PoliticaReintentos(umbral_bloqueos=2, enfriamiento=60)
+
+
+def en_otro_hilo(funcion):
+    """Ejecuta `funcion` en un hilo aparte (otro llamador) y devuelve su resultado"""
+    resultado = []
+    hilo = Thread(target=lambda: resultado.append(funcion()))
+    hilo.start()
+    hilo.join()
+    return resultado[0]
+
+
+def abrir(politica):
+    for _ in range(politica.umbral_bloqueos):
+        politica.registrar_respuesta(None, 403)
+    assert politica.circuito_abierto()
+
+
+@pytest.mark.parametrize("status, headers, bloqueo", [
+    (403, None, True),
+    (429, CLOUDFLARE, True),
+    (503, {"server": "Cloudflare"}, True),
+    (503, {"CF-Mitigated": "challenge"}, True),
+    (429, {"Server": "nginx"}, False),
+    (503, None, False),
+    (200, CLOUDFLARE, False),
+    (500, CLOUDFLARE, False),
+])
+def test_es_bloqueo(status, headers, bloqueo):
+    assert PoliticaReintentos.es_bloqueo(status, headers) is bloqueo
+
+
+def test_espera_exponencial_con_tope():
+    politica = PoliticaReintentos(espera_base=5, espera_maxima=12)
+    assert politica.espera(0) == 0.0
+    for intento, tope in ((1, 5), (2, 10), (3, 12), (8, 12)):
+        assert tope / 2 <= politica.espera(intento) <= tope
+
+
+def test_cuenta_peticiones_y_logins(politica):
+    contexto = ContextoFalso()
+    politica.registrar_respuesta(contexto, 200)
+    politica.registrar_respuesta(contexto, 403)
+    politica.registrar_login(contexto)
+    assert contexto.contadores == {"peticiones_http": 2, "logins": 1}
+    assert PoliticaReintentos.amplificacion(6, 4) == 1.5
+    assert PoliticaReintentos.amplificacion(6, 0) == 0.0
+
+
+def test_bloqueos_seguidos_abren_el_circuito(politica, reloj):
+    assert politica.registrar_respuesta(None, 403) is True
+    assert politica.registrar_respuesta(None, 200) is False
+    assert politica.registrar_respuesta(None, 403) is True
+    assert not politica.circuito_abierto()
+    politica.registrar_respuesta(None, 429, CLOUDFLARE)
+    assert politica.circuito_abierto()
+    assert politica.aperturas == 1
+    assert politica.permitir() is False
+    assert politica.segundos_restantes() == 60
+
+
+def test_semiabierto_deja_pasar_una_sola_prueba(politica, reloj):
+    abrir(politica)
+    reloj.ahora += 61
+    assert politica.permitir() is True
+    # El enfriamiento se rearma: el resto de llamadores siguen esperando
+    assert en_otro_hilo(politica.permitir) is False
+    assert politica.circuito_abierto()
+
+
+def test_la_prueba_correcta_cierra_el_circuito(politica, reloj):
+    abrir(politica)
+    reloj.ahora += 61
+    assert politica.permitir() is True
+    politica.registrar_respuesta(None, 200)
+    assert not politica.circuito_abierto()
+    assert politica.permitir() is True
+    # Cerrado de verdad: vuelve a hacer falta el umbral completo para abrir
+    politica.registrar_respuesta(None, 403)
+    assert not politica.circuito_abierto()
+
+
+def test_respuesta_tardia_no_cierra_el_circuito(politica, reloj):
+    """Un 200 de una petición enviada antes de abrirse (otro hilo) no cierra el circuito"""
+    abrir(politica)
+    en_otro_hilo(lambda: politica.registrar_respuesta(None, 200))
+    assert politica.circuito_abierto()
+    reloj.ahora += 61
+    assert politica.permitir() is True
+    en_otro_hilo(lambda: politica.registrar_respuesta(None, 200))
+    assert politica.circuito_abierto()
+    politica.registrar_respuesta(None, 200)
+    assert not politica.circuito_abierto()
+
+
+def test_la_prueba_bloqueada_reabre_el_circuito(politica, reloj):
+    abrir(politica)
+    reloj.ahora += 61
+    assert politica.permitir() is True
+    assert politica.registrar_respuesta(None, 403) is True
+    assert politica.circuito_abierto()
+    assert politica.aperturas == 2
+    # La prueba ya se consumió: un 200 posterior del mismo hilo no cierra el circuito
+    politica.registrar_respuesta(None, 200)
+    assert politica.circuito_abierto()
+
+
+def test_la_prueba_es_por_tarea_asyncio(politica, reloj):
+    """En el motor async todas las tareas comparten hilo: solo la tarea de prueba cierra"""
+    abrir(politica)
+    reloj.ahora += 61
+
+    async def prueba():
+        assert politica.permitir() is True
+
+    async def tardia():
+        politica.registrar_respuesta(None, 200)
+
+    async def escenario():
+        await gather(prueba())
+        await gather(tardia())
+        assert politica.circuito_abierto()
+
+    run(escenario())
+
+    async def prueba_completa():
+        assert politica.permitir() is True
+        politica.registrar_respuesta(None, 200)
+
+    reloj.ahora += 61
+    run(prueba_completa())
+    assert not politica.circuito_abierto()
+
+
+def test_la_prueba_pasa_de_un_login_con_cookies_a_la_extraccion(config_simulada, servidor_simulado, reloj):
+    """
+    Un login con cookies confiables no envía nada: la petición de prueba es la extracción,
+    y quien recibió la prueba debe poder enviarla (y con ella cerrar el circuito).
+    """
+    from controller.ExtractorCalendario import ExtractorCalendario
+    from controller.Login import Login
+
+    politica = config_simulada.politica_reintentos
+    contexto = config_simulada.contextos()[0]
+    assert Login(config_simulada, contexto).login()
+
+    politica.registrar_respuesta(None, 403)
+    assert politica.circuito_abierto()
+    reloj.ahora += politica.enfriamiento + 1
+    peticiones = dict(servidor_simulado.contadores)
+
+    login = Login(config_simulada, contexto)
+    assert login.login(use_cookies=True)
+    assert servidor_simulado.contadores == peticiones
+    assert politica.permitir()
+
+    datos = ExtractorCalendario(login.get_session(), config_simulada, contexto).extraer_turnos_api()
+    assert datos and not datos.get("_error_session")
+    assert servidor_simulado.contadores["api"] == peticiones["api"] + 1
+    assert not politica.circuito_abierto()
+
+
+def test_solo_el_titular_de_la_prueba_tiene_paso(politica, reloj):
+    abrir(politica)
+    reloj.ahora += 61
+    assert politica.permitir() is True
+    assert politica.permitir() is True
+    assert en_otro_hilo(politica.permitir) is False
+    # Respondida la prueba (bloqueo), el titular pierde el paso
+    politica.registrar_respuesta(None, 403)
+    assert politica.permitir() is False
@@ -0,0 +1,144 @@
+# tests/test_puerta_login.py
+from threading import Lock, Thread
+from time import sleep
+
+import pytest
+
+import controller.PoliticaReintentos as modulo_politica
+from controller.PuertaLogin import PuertaLogin
+
+
+def esperar_hasta(condicion, segundos: float = 5.0):
+    """Sondea `condicion` hasta que se cumpla (para sincronizar con los hilos)"""
+    for _ in range(int(segundos / 0.005)):
+        if condicion():
+            return
+        sleep(0.005)
+    pytest.fail("la condición no se cumplió a tiempo")
+
+
+class LogFalso:
+    """Recoge los comentarios de la puerta ("En cola para login")"""
+
+    def __init__(self):
+        self.comentarios = []
+
+    def comentario(self, nivel: str, mensaje: str):
+        self.comentarios.append(mensaje)
+
+
+def test_orden_de_llegada():
+    puerta = PuertaLogin(1)
+    log = LogFalso()
+    orden = []
+
+    def login(numero: int):
+        with puerta.pasar(log):
+            orden.append(numero)
+
+    hilos = []
+    with puerta.pasar():
+        for numero in range(5):
+            hilo = Thread(target=login, args=(numero,))
+            hilo.start()
+            hilos.append(hilo)
+            # El siguiente hilo no arranca hasta que este esté en la cola
+            esperar_hasta(lambda: len(log.comentarios) == numero + 1)
+        assert log.comentarios[-1] == "🚪 En cola para login (4 por delante)"
+        sleep(0.01)
+    for hilo in hilos:
+        hilo.join()
+    assert orden == [0, 1, 2, 3, 4]
+    assert puerta.logins == 6
+    assert puerta.esperas == 5
+    assert puerta.cola_maxima == 5
+
+
+def test_limite_de_logins_en_curso():
+    puerta = PuertaLogin(2)
+    lock = Lock()
+    en_curso = [0]
+    maximo = [0]
+
+    def login():
+        with puerta.pasar():
+            with lock:
+                en_curso[0] += 1
+                maximo[0] = max(maximo[0], en_curso[0])
+            sleep(0.02)
+            with lock:
+                en_curso[0] -= 1
+
+    hilos = [Thread(target=login) for _ in range(8)]
+    for hilo in hilos:
+        hilo.start()
+    for hilo in hilos:
+        hilo.join()
+    assert maximo[0] == 2
+    assert puerta.logins == 8
+    assert puerta.espera_maxima > 0
+
+
+def test_libera_el_cupo_si_el_login_falla():
+    puerta = PuertaLogin(1)
+    with pytest.raises(RuntimeError):
+        with puerta.pasar():
+            raise RuntimeError("timeout")
+    hilo = Thread(target=lambda: puerta.pasar().__enter__())
+    hilo.start()
+    hilo.join(2)
+    assert not hilo.is_alive()
+
+
+def test_metricas_del_motor_async():
+    """El motor async usa su propio semáforo y anota la cola y las esperas en la puerta"""
+    puerta = PuertaLogin(1)
+    for _ in range(3):
+        puerta.anotar_cola(1)
+    puerta.anotar_cola(-1)
+    puerta.registrar_espera(0.0)
+    puerta.registrar_espera(1.5)
+    puerta.registrar_espera(0.5)
+    assert puerta.cola_maxima == 3
+    assert (puerta.logins, puerta.esperas) == (3, 2)
+    assert puerta.segundos_esperados == pytest.approx(2.0)
+    assert puerta.espera_maxima == 1.5
+    assert puerta.resumen() == "3 login(s), 2 en cola, espera media 1.0s, máx. 1.5s, cola máx. 3"
+
+
+@pytest.fixture
+def circuito_recuperable(config_simulada, monkeypatch):
+    """Circuito abierto cuyo enfriamiento ya pasó: el siguiente login es la prueba"""
+    reloj = [1000.0]
+    monkeypatch.setattr(modulo_politica, "monotonic", lambda: reloj[0])
+    politica = config_simulada.politica_reintentos
+    politica.registrar_respuesta(None, 403)
+    assert politica.circuito_abierto()
+    reloj[0] += politica.enfriamiento + 1
+    return politica
+
+
+def test_login_con_credenciales_cierra_el_circuito(config_simulada, circuito_recuperable):
+    """Tras un bloqueo (cookies borradas) la recuperación es un login con credenciales tras la puerta"""
+    from controller.Login import Login
+
+    login = Login(config_simulada, config_simulada.contextos()[0])
+    assert login.login(use_cookies=False)
+    assert config_simulada.puerta_login.logins == 1
+    assert not circuito_recuperable.circuito_abierto()
+
+
+def test_login_async_cierra_el_circuito(config_simulada, circuito_recuperable, monkeypatch):
+    from controller.MotorAsync import MotorAsync
+
+    monkeypatch.setattr(config_simulada, "max_logins_simultaneos", 1)
+    motor = MotorAsync(config_simulada)
+    try:
+        resumen = motor.ejecutar()
+    finally:
+        motor.cerrar()
+    assert len(resumen["exitosos"]) == 2
+    assert not circuito_recuperable.circuito_abierto()
+    puerta = config_simulada.puerta_login
+    assert puerta.logins == 2
+    assert puerta.cola_maxima >= 1
@@ -0,0 +1,233 @@
+# tests/test_refrescador_sesiones.py
+from datetime import datetime, timedelta
+from time import time
+from types import SimpleNamespace
+
+import pytest
+
+import controller.RefrescadorSesiones as modulo
+from controller.AlmacenSesiones import AlmacenSesiones
+from controller.GestorSesiones import GestorSesiones
+from controller.RefrescadorSesiones import RefrescadorSesiones
+
+VALIDEZ = 1800
+MARGEN = 60
+
+
+class ContextoFalso:
+    def __init__(self, usuario: str):
+        self.usuario = usuario
+        self.logins = 0
+        self.reinicios = 0
+
+    def reiniciar_metricas(self):
+        self.logins = 0
+        self.reinicios += 1
+
+
+class LoginFalso:
+    """Sustituto de Login: la sonda y el login devuelven lo indicado"""
+
+    def __init__(self, contexto, sonda: bool = True, login_ok: bool = True, cookies=("ASP.NET_SessionId",)):
+        self.contexto = contexto
+        self.sonda = sonda
+        self.login_ok = login_ok
+        self.cookies = list(cookies)
+        self.logins = []
+        self.cerrado = False
+
+    def get_session(self):
+        return SimpleNamespace(cookies=self.cookies)
+
+    def validar_sesion_api(self, forzar: bool = False) -> bool:
+        self.forzada = forzar
+        return self.sonda
+
+    def login(self, use_cookies: bool = True) -> bool:
+        self.logins.append(use_cookies)
+        if self.login_ok and not use_cookies:
+            self.contexto.logins += 1
+        return self.login_ok
+
+    def close(self):
+        self.cerrado = True
+
+
+class EventoFalso:
+    """Event de parada que no duerme: registra las esperas"""
+
+    def __init__(self, detenido: bool = False):
+        self.detenido = detenido
+        self.esperas = []
+
+    def wait(self, segundos: float) -> bool:
+        self.esperas.append(segundos)
+        return self.detenido
+
+
+@pytest.fixture
+def config(tmp_path):
+    contextos = [ContextoFalso(f"asesor{i}@eco.local") for i in range(1, 4)]
+    config = SimpleNamespace(
+        almacen_sesiones=AlmacenSesiones(str(tmp_path / "sesiones.db")),
+        gestor_sesiones=GestorSesiones(),
+        politica_reintentos=SimpleNamespace(circuito_abierto=lambda: False),
+        cookies_validez=VALIDEZ,
+        refresco_margen=MARGEN,
+        contextos=lambda: contextos,
+    )
+    yield config
+    config.almacen_sesiones.cerrar()
+
+
+def cookie(expires=None) -> dict:
+    return {"name": "ASP.NET_SessionId", "value": "v", "domain": "eco.local", "path": "/", "expires": expires}
+
+
+def test_caducidad(config):
+    refrescador = RefrescadorSesiones(config)
+    almacen = config.almacen_sesiones
+    assert refrescador.caducidad("asesor1@eco.local") is None
+    almacen.guardar("asesor1@eco.local", [cookie()], 1000.0)
+    assert refrescador.caducidad("asesor1@eco.local") == 1000.0 + VALIDEZ
+    # Las cookies que vencen antes que la validación mandan
+    almacen.guardar("asesor1@eco.local", [cookie(1500.0)], 1000.0)
+    assert refrescador.caducidad("asesor1@eco.local") == 1500.0
+    almacen.guardar("asesor1@eco.local", [cookie()], None)
+    assert refrescador.caducidad("asesor1@eco.local") == VALIDEZ
+
+
+def test_pendientes(config):
+    ahora = time()
+    almacen = config.almacen_sesiones
+    almacen.guardar("asesor1@eco.local", [cookie()], ahora - VALIDEZ + 300)    # vence en 5 min
+    almacen.guardar("asesor2@eco.local", [cookie()], ahora)                     # vence en 30 min
+    almacen.guardar("asesor3@eco.local", [cookie(ahora + 600)], ahora)          # la cookie vence en 10 min
+    refrescador = RefrescadorSesiones(config)
+    horizonte = ahora + 600 - MARGEN
+    assert [c.usuario for c in refrescador.pendientes(horizonte)] == ["asesor1@eco.local", "asesor3@eco.local"]
+    assert [c.usuario for c in refrescador.pendientes(horizonte, excluir={"asesor1@eco.local"})] == ["asesor3@eco.local"]
+    assert refrescador.pendientes(ahora - 3600) == []
+
+
+def test_sesion_caliente_valida_solo_se_revalida(config):
+    refrescador = RefrescadorSesiones(config)
+    contexto = refrescador.contextos["asesor1@eco.local"]
+    login = LoginFalso(contexto)
+    config.gestor_sesiones.guardar(contexto.usuario, login)
+    assert refrescador.refrescar(contexto) is True
+    assert login.logins == []
+    assert login.forzada
+    assert (refrescador.revalidadas, refrescador.relogueadas, refrescador.fallidas) == (1, 0, 0)
+
+
+def test_sesion_caliente_muerta_hace_login_fresco(config):
+    refrescador = RefrescadorSesiones(config)
+    contexto = refrescador.contextos["asesor1@eco.local"]
+    login = LoginFalso(contexto, sonda=False)
+    config.gestor_sesiones.guardar(contexto.usuario, login)
+    assert refrescador.refrescar(contexto) is True
+    assert login.logins == [False]
+    assert refrescador.relogueadas == 1
+    assert config.gestor_sesiones.obtener(contexto.usuario) is login
+
+
+def test_sin_sesion_en_memoria_usa_las_cookies_guardadas(config, monkeypatch):
+    creados = []
+    monkeypatch.setattr(modulo, "Login", lambda cfg, contexto: creados.append(LoginFalso(contexto)) or creados[-1])
+    refrescador = RefrescadorSesiones(config)
+    contexto = refrescador.contextos["asesor2@eco.local"]
+    assert refrescador.refrescar(contexto) is True
+    assert creados[0].logins == [True]
+    assert refrescador.revalidadas == 1
+    assert config.gestor_sesiones.obtener(contexto.usuario) is creados[0]
+
+
+def test_fallo_descarta_la_sesion(config):
+    refrescador = RefrescadorSesiones(config)
+    contexto = refrescador.contextos["asesor1@eco.local"]
+    login = LoginFalso(contexto, sonda=False, login_ok=False)
+    config.gestor_sesiones.guardar(contexto.usuario, login)
+    assert refrescador.refrescar(contexto) is False
+    assert login.cerrado
+    assert config.gestor_sesiones.obtener(contexto.usuario) is None
+    assert refrescador.fallidas == 1
+
+
+def test_excepcion_cuenta_como_fallida(config, monkeypatch):
+    def explota(cfg, contexto):
+        raise RuntimeError("sin red")
+
+    monkeypatch.setattr(modulo, "Login", explota)
+    refrescador = RefrescadorSesiones(config)
+    assert refrescador.refrescar(refrescador.contextos["asesor1@eco.local"]) is False
+    assert refrescador.fallidas == 1
+
+
+def test_refrescar_hasta_reparte_las_renovaciones(config, monkeypatch):
+    ahora = time()
+    for usuario in ("asesor1@eco.local", "asesor2@eco.local"):
+        config.almacen_sesiones.guardar(usuario, [cookie()], ahora - VALIDEZ)
+    refrescados = []
+    refrescador = RefrescadorSesiones(config)
+    monkeypatch.setattr(refrescador, "refrescar", lambda contexto: refrescados.append(contexto.usuario) or True)
+    detener = EventoFalso()
+    assert refrescador.refrescar_hasta(datetime.now() + timedelta(seconds=300), detener) is True
+    assert refrescados == ["asesor1@eco.local", "asesor2@eco.local"]
+    assert all(refrescador.contextos[u].reinicios == 1 for u in refrescados)
+    # Dos esperas repartidas antes de cada renovación y la espera final hasta el ciclo
+    assert len(detener.esperas) == 3
+    assert detener.esperas[0] < detener.esperas[1] < 300
+
+
+def test_refrescar_hasta_respeta_la_parada_y_el_circuito(config, monkeypatch):
+    config.almacen_sesiones.guardar("asesor1@eco.local", [cookie()], time() - VALIDEZ)
+    refrescador = RefrescadorSesiones(config)
+    monkeypatch.setattr(refrescador, "refrescar", lambda contexto: pytest.fail("no debía renovar"))
+    proxima = datetime.now() + timedelta(seconds=300)
+    assert refrescador.refrescar_hasta(proxima, EventoFalso(detenido=True)) is False
+    config.politica_reintentos.circuito_abierto = lambda: True
+    assert refrescador.refrescar_hasta(proxima, EventoFalso()) is True
+
+
+def test_revalida_de_verdad_una_sesion_real(config_simulada, servidor_simulado):
+    """
+    Con el Login real y una validación todavía vigente la sonda no puede salir de caché:
+    tiene que consultar el API y renovar validada_en en el almacén.
+    """
+    from controller.Login import Login
+
+    refrescador = RefrescadorSesiones(config_simulada)
+    contexto = refrescador.contextos["asesor1@eco.local"]
+    login = Login(config_simulada, contexto)
+    assert login.login()
+    config_simulada.gestor_sesiones.guardar(contexto.usuario, login)
+    _, validada_antes = config_simulada.almacen_sesiones.leer(contexto.usuario)
+    caducidad_antes = refrescador.caducidad(contexto.usuario)
+    api_antes = servidor_simulado.contadores["api"]
+
+    assert refrescador.refrescar(contexto) is True
+    assert servidor_simulado.contadores["api"] == api_antes + 1
+    _, validada_despues = config_simulada.almacen_sesiones.leer(contexto.usuario)
+    assert validada_despues > validada_antes
+    assert refrescador.caducidad(contexto.usuario) > caducidad_antes
+    assert refrescador.revalidadas == 1
+
+
+def test_sesion_real_muerta_se_reloguea(config_simulada, servidor_simulado):
+    from controller.Login import Login
+
+    refrescador = RefrescadorSesiones(config_simulada)
+    contexto = refrescador.contextos["asesor1@eco.local"]
+    login = Login(config_simulada, contexto)
+    assert login.login()
+    config_simulada.gestor_sesiones.guardar(contexto.usuario, login)
+    contexto.reiniciar_metricas()
+
+    # EcoDigital invalidó la sesión aunque la validación local siga vigente
+    servidor_simulado.tasa_nosess = 1.0
+    logins_antes = servidor_simulado.contadores["login_post"]
+    assert refrescador.refrescar(contexto) is True
+    assert servidor_simulado.contadores["nosess"] == 1
+    assert servidor_simulado.contadores["login_post"] == logins_antes + 1
+    assert refrescador.relogueadas == 1
@@ -0,0 +1,114 @@
+# tests/test_respuesta_sin_cambios.py
+from datetime import datetime, timedelta
+from json import dumps, loads
+
+import pytest
+
+from controller.Ejecucion import Ejecuciones
+from controller.ExtractorCalendario import ExtractorCalendario
+
+USUARIO = "asesor1@eco.local"
+
+
+@pytest.fixture
+def ejecutor(config_simulada):
+    """Como lo deja el motor async: Ejecuciones residente con su extractor"""
+    contexto = config_simulada.contextos()[0]
+    ejecutor = Ejecuciones(config_simulada, contexto)
+    ejecutor.extractor_instance = ExtractorCalendario(None, config_simulada, contexto)
+    return ejecutor
+
+
+@pytest.fixture
+def texto_api(servidor_simulado):
+    """Cuerpo de ObtenerTurnos para el rango por defecto (mes actual ±5 días)"""
+    hoy = datetime.now()
+    primer_dia = hoy.replace(day=1)
+    siguiente = (hoy.replace(day=28) + timedelta(days=4)).replace(day=1)
+    payload = servidor_simulado.turnos(
+        USUARIO,
+        (primer_dia - timedelta(days=5)).strftime("%d/%m/%Y"),
+        (siguiente + timedelta(days=5)).strftime("%d/%m/%Y"),
+    )
+    return dumps(payload)
+
+
+def ciclo(ejecutor, texto: str):
+    """Un ciclo del motor: interpretar la respuesta, procesarla y guardar"""
+    extractor = ejecutor.extractor_instance
+    datos = extractor.procesar_respuesta_api(extractor.interpretar_respuesta_api(200, "application/json", texto))
+    return datos, ejecutor.procesar_datos_extraidos(datos)
+
+
+def test_misma_huella_hoy_no_procesa_ni_escribe(ejecutor, texto_api):
+    datos, resultado = ciclo(ejecutor, texto_api)
+    assert "_sin_cambios" not in datos
+    assert resultado["exito"] and not resultado["respuesta_identica"]
+    documento = ejecutor.extractor_instance.documento_usuario()
+    assert documento.escrituras == 1
+    huella = documento.datos["metadata"]["huella_respuesta"]
+    assert huella
+
+    datos, resultado = ciclo(ejecutor, texto_api)
+    assert datos == {"_sin_cambios": True, "nombre_usuario": ejecutor.extractor_instance.nombre_usuario}
+    assert resultado["exito"] and resultado["respuesta_identica"]
+    assert not resultado["cambios_detectados"]
+    assert resultado["fecha_generacion"] == datetime.now().strftime("%Y-%m-%d")
+    assert resultado["ruta_json"] == documento.ruta
+    assert documento.escrituras == 1
+    assert documento.datos["metadata"]["huella_respuesta"] == huella
+
+
+def test_misma_huella_de_otro_dia_reescribe(ejecutor, texto_api):
+    ciclo(ejecutor, texto_api)
+    documento = ejecutor.extractor_instance.documento_usuario()
+    ayer = (datetime.now() - timedelta(days=1)).strftime("%Y-%m-%d")
+    calendario = dict(documento.datos)
+    calendario["periodo"] = dict(calendario["periodo"], fecha_generacion=ayer)
+    documento.guardar(calendario)
+    escrituras = documento.escrituras
+
+    extractor = ejecutor.extractor_instance
+    assert not extractor.respuesta_sin_cambios(extractor.interpretar_respuesta_api(200, "application/json", texto_api))
+
+    # El primer ciclo del día reescribe el calendario aunque la respuesta sea la misma
+    datos, resultado = ciclo(ejecutor, texto_api)
+    assert "_sin_cambios" not in datos
+    assert resultado["exito"] and not resultado["respuesta_identica"]
+    assert documento.escrituras == escrituras + 1
+    assert documento.datos["periodo"]["fecha_generacion"] == datetime.now().strftime("%Y-%m-%d")
+
+    # Y a partir de ahí el atajo vuelve a aplicar
+    _, resultado = ciclo(ejecutor, texto_api)
+    assert resultado["respuesta_identica"]
+    assert documento.escrituras == escrituras + 1
+
+
+def test_huella_distinta_procesa_completo(ejecutor, texto_api):
+    ciclo(ejecutor, texto_api)
+    documento = ejecutor.extractor_instance.documento_usuario()
+    huella = documento.datos["metadata"]["huella_respuesta"]
+
+    # Mismo contenido con otro formato: otra huella, se procesa completo aunque no haya cambios
+    datos, resultado = ciclo(ejecutor, texto_api.replace(", ", ","))
+    assert "_sin_cambios" not in datos and datos["dias"]
+    assert resultado["exito"] and not resultado["respuesta_identica"]
+    assert not resultado["cambios_detectados"]
+    assert documento.escrituras == 2
+    assert documento.datos["metadata"]["huella_respuesta"] not in (None, huella)
+
+
+def test_huella_distinta_con_turno_cambiado(ejecutor, texto_api):
+    ciclo(ejecutor, texto_api)
+    payload = loads(texto_api)
+    hoy = datetime.now().strftime("%Y-%m-%d")
+    turno = next(t for t in payload["turnos"] if t["FechaHoraEntradaString"].startswith(hoy[:8]) and not t["Novedad"])
+    entrada = datetime.strptime(turno["FechaHoraEntradaString"], "%Y-%m-%d %H:%M") + timedelta(hours=1)
+    turno["FechaHoraEntradaString"] = entrada.strftime("%Y-%m-%d %H:%M")
+
+    datos, resultado = ciclo(ejecutor, dumps(payload))
+    assert "_sin_cambios" not in datos
+    assert resultado["exito"] and not resultado["respuesta_identica"]
+    assert resultado["cambios_detectados"]
+    assert resultado["dias_con_cambios"] == [entrada.day]
+    assert ejecutor.extractor_instance.documento_usuario().escrituras == 2
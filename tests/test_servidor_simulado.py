@@ -0,0 +1,169 @@
+# tests/test_servidor_simulado.py
+from http.client import HTTPConnection
+from json import dumps, loads
+from urllib.parse import urlencode
+
+import pytest
+
+import controller.ServidorSimulado as modulo
+from controller.DecodificadorEco import DecodificadorEco
+from controller.PoliticaReintentos import PoliticaReintentos
+from controller.ServidorSimulado import ServidorSimulado
+
+RANGO = {"fechaInicio": "01/06/2025", "fechaFin": "30/06/2025"}
+
+
+@pytest.fixture
+def arrancar():
+    """Arranca servidores en un puerto libre y los detiene al terminar"""
+    servidores = []
+
+    def arrancar(**opciones):
+        servidor = ServidorSimulado(puerto=0, usuarios=3, **opciones)
+        servidor.iniciar()
+        servidores.append(servidor)
+        return servidor
+
+    yield arrancar
+    for servidor in servidores:
+        servidor.detener()
+
+
+class Cliente:
+    """Cliente HTTP mínimo con la cookie de sesión"""
+
+    def __init__(self, servidor: ServidorSimulado):
+        host, puerto = servidor.server_address[:2]
+        self.conexion = HTTPConnection(host, puerto, timeout=5)
+        self.servidor = servidor
+        self.sesion = ""
+
+    def pedir(self, metodo: str, ruta: str, cuerpo: str = None, tipo: str = None):
+        cabeceras = {"Cookie": f"ASP.NET_SessionId={self.sesion}"} if self.sesion else {}
+        if tipo:
+            cabeceras["Content-Type"] = tipo
+        self.conexion.request(metodo, ruta, body=cuerpo, headers=cabeceras)
+        respuesta = self.conexion.getresponse()
+        texto = respuesta.read().decode("utf-8")
+        for nombre, valor in respuesta.getheaders():
+            if nombre.lower() == "set-cookie" and valor.startswith("ASP.NET_SessionId="):
+                self.sesion = valor.split(";")[0].partition("=")[2]
+        return respuesta, texto
+
+    def login(self, usuario: str, clave: str):
+        formulario = urlencode({"UsuarioLogado.Login": usuario, "UsuarioLogado.Password": clave})
+        return self.pedir("POST", ServidorSimulado.RUTA_BASE, formulario, "application/x-www-form-urlencoded")
+
+    def turnos(self, rango: dict = RANGO):
+        return self.pedir("POST", ServidorSimulado.RUTA_API, dumps(rango), "application/json")
+
+
+def test_flujo_completo(arrancar):
+    servidor = arrancar()
+    cliente = Cliente(servidor)
+    respuesta, html = cliente.pedir("GET", ServidorSimulado.RUTA_BASE)
+    assert respuesta.status == 200 and "UsuarioLogado.Login" in html
+
+    _, html = cliente.login("asesor1@eco.local", "clave1")
+    assert cliente.sesion and "fc-btnVerCalendarioTurnos-button" in html
+
+    _, html = cliente.pedir("GET", ServidorSimulado.RUTA_MASTER)
+    assert "fc-btnVerCalendarioTurnos-button" in html
+
+    respuesta, cuerpo = cliente.turnos()
+    assert respuesta.status == 200
+    turnos = loads(cuerpo)["turnos"]
+    assert len(turnos) == 30
+    assert turnos[0]["Asesor"]["NombreCompleto"] == "Asesor Simulado 1"
+    assert servidor.contadores["login_post"] == 1 and servidor.contadores["api"] == 1
+
+
+def test_turnos_decodificables_y_deterministas(arrancar):
+    servidor = arrancar(semilla=7)
+    cuerpo = servidor.turnos("asesor2@eco.local", "01/06/2025", "30/06/2025")
+    assert cuerpo == servidor.turnos("asesor2@eco.local", "01/06/2025", "30/06/2025")
+    columnas, errores = DecodificadorEco.decodificar_turnos(cuerpo["turnos"])
+    assert errores == []
+    assert columnas["dia"] == list(range(1, 31))
+    assert set(columnas["duracion_horas"]) <= {6.0, 8.0}
+    assert all(descanso["duracion_minutos"] == 20 for descanso in columnas["break"])
+    assert any(columnas["es_dia_libre"])
+
+
+def test_credenciales_invalidas(arrancar):
+    servidor = arrancar()
+    cliente = Cliente(servidor)
+    _, html = cliente.login("asesor1@eco.local", "mala")
+    assert "incorrectos" in html and not cliente.sesion
+    assert servidor.contadores["credenciales_invalidas"] == 1
+
+
+def test_sin_sesion_responde_nosess(arrancar):
+    servidor = arrancar()
+    cliente = Cliente(servidor)
+    _, cuerpo = cliente.turnos()
+    assert cuerpo == "NOSESS"
+    _, html = cliente.pedir("GET", ServidorSimulado.RUTA_MASTER)
+    assert "fc-btnVerCalendarioTurnos-button" not in html
+
+
+def test_nosess_inyectado_invalida_la_sesion(arrancar):
+    servidor = arrancar(tasa_nosess=1.0)
+    cliente = Cliente(servidor)
+    cliente.login("asesor1@eco.local", "clave1")
+    _, cuerpo = cliente.turnos()
+    assert cuerpo == "NOSESS"
+    servidor.tasa_nosess = 0.0
+    _, cuerpo = cliente.turnos()
+    assert cuerpo == "NOSESS"
+    assert servidor.contadores["nosess"] == 2
+
+
+def test_caducidad_de_sesion(arrancar, monkeypatch):
+    reloj = [100.0]
+    monkeypatch.setattr(modulo, "monotonic", lambda: reloj[0])
+    servidor = arrancar(vida_sesion=60)
+    cliente = Cliente(servidor)
+    cliente.login("asesor1@eco.local", "clave1")
+    reloj[0] += 59
+    assert cliente.turnos()[1] != "NOSESS"
+    reloj[0] += 2
+    assert cliente.turnos()[1] == "NOSESS"
+
+
+def test_bloqueo_cloudflare(arrancar):
+    servidor = arrancar(tasa_bloqueo=1.0)
+    respuesta, _ = Cliente(servidor).pedir("GET", ServidorSimulado.RUTA_BASE)
+    assert respuesta.status == 403
+    assert PoliticaReintentos.es_bloqueo(respuesta.status, dict(respuesta.getheaders()))
+    assert servidor.contadores["bloqueos"] == 1
+
+
+def test_cambios_inyectados(arrancar):
+    servidor = arrancar(tasa_cambios=1.0)
+    antes = servidor.turnos("asesor1@eco.local", "01/06/2025", "30/06/2025")
+    despues = servidor.turnos("asesor1@eco.local", "01/06/2025", "30/06/2025")
+    assert antes != despues
+    assert servidor.contadores["cambios"] == 2
+
+
+def test_peticion_invalida_y_rutas_desconocidas(arrancar):
+    servidor = arrancar()
+    cliente = Cliente(servidor)
+    cliente.login("asesor1@eco.local", "clave1")
+    respuesta, _ = cliente.turnos({"fechaInicio": "2025-06-01"})
+    assert respuesta.status == 500
+    respuesta, _ = cliente.pedir("GET", "/otra")
+    assert respuesta.status == 404
+
+
+def test_credenciales_env():
+    servidor = ServidorSimulado(puerto=0, usuarios=2)
+    try:
+        assert servidor.credenciales_env() == {
+            "USERS_ECO": "asesor1@eco.local,asesor2@eco.local",
+            "PASSWDS_ECO": "clave1,clave2",
+        }
+        assert servidor.url_base.startswith("http://127.0.0.1:")
+    finally:
+        servidor.server_close()
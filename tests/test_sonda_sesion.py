@@ -0,0 +1,96 @@
+# tests/test_sonda_sesion.py
+import pytest
+
+from controller.Login import Login
+
+MARCADOR = Login.MARCADORES_LOGIN[0].encode()
+
+
+class RespuestaFalsa:
+    """Respuesta de requests abierta con stream=True que cuenta lo leído y los cierres"""
+
+    def __init__(self, trozos: list, status_code: int = 200, fallo: Exception = None):
+        self.trozos = trozos
+        self.status_code = status_code
+        self.headers = {}
+        self.fallo = fallo
+        self.leidos = 0
+        self.cierres = 0
+
+    def iter_content(self, tamaño):
+        for trozo in self.trozos:
+            self.leidos += 1
+            yield trozo
+        if self.fallo:
+            raise self.fallo
+
+    def close(self):
+        self.cierres += 1
+
+
+@pytest.fixture
+def login(config_simulada):
+    return Login(config_simulada, config_simulada.contextos()[0])
+
+
+def relleno(n: int = Login.TROZO_SONDA) -> bytes:
+    return b"x" * n
+
+
+def test_marcador_cierra_sin_leer_el_resto(login):
+    respuesta = RespuestaFalsa([relleno(), b"<li>" + MARCADOR + b"</li>", relleno(), relleno()])
+    assert login._sonda_html_logueado(respuesta) is True
+    assert respuesta.leidos == 2
+    assert respuesta.cierres == 1
+
+
+def test_marcador_partido_entre_trozos(login):
+    mitad = len(MARCADOR) // 2
+    respuesta = RespuestaFalsa([relleno() + MARCADOR[:mitad], MARCADOR[mitad:] + relleno()])
+    assert login._sonda_html_logueado(respuesta) is True
+    assert respuesta.cierres == 1
+
+
+def test_limite_de_bytes_cierra(login, monkeypatch):
+    monkeypatch.setattr(login.config, "sonda_bytes", 3 * Login.TROZO_SONDA)
+    respuesta = RespuestaFalsa([relleno() for _ in range(10)] + [MARCADOR])
+    assert login._sonda_html_logueado(respuesta) is False
+    assert respuesta.leidos == 3
+    assert respuesta.cierres == 1
+
+
+def test_respuesta_vacia_cierra(login):
+    respuesta = RespuestaFalsa([])
+    assert login._sonda_html_logueado(respuesta) is False
+    assert respuesta.cierres == 1
+
+
+def test_error_de_lectura_cierra(login):
+    respuesta = RespuestaFalsa([relleno()], fallo=ConnectionError("conexión cortada"))
+    with pytest.raises(ConnectionError):
+        login._sonda_html_logueado(respuesta)
+    assert respuesta.cierres == 1
+
+
+@pytest.mark.parametrize("respuesta, logueado", [
+    (RespuestaFalsa([MARCADOR]), True),
+    (RespuestaFalsa([relleno()]), False),
+    (RespuestaFalsa([MARCADOR], status_code=403), False),
+    (RespuestaFalsa([MARCADOR], status_code=302), False),
+    (RespuestaFalsa([relleno()], fallo=ConnectionError("conexión cortada")), False),
+])
+def test_validacion_de_cookies_cierra_la_respuesta(login, config_simulada, monkeypatch, respuesta, logueado):
+    """También sin sonda (403/redirect): con stream=True la conexión no vuelve al pool hasta cerrar"""
+    config_simulada.almacen_sesiones.guardar(login.user, [
+        {"name": "ASP.NET_SessionId", "value": "v", "domain": "eco.local", "path": "/", "expires": None},
+    ])
+    peticiones = []
+
+    def get(url, **kwargs):
+        peticiones.append(kwargs)
+        return respuesta
+
+    monkeypatch.setattr(login.session, "get", get)
+    assert login._try_cookies_login() is logueado
+    assert [p["stream"] for p in peticiones] == [True]
+    assert respuesta.cierres >= 1